@@ -0,0 +1,58 @@
+import datetime
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from . import conditional
+
+PRICE_CACHE = "prices"
+
+
+def get_cache():
+    """
+    Get the cache backend configured for price responses.
+    """
+    return caches[PRICE_CACHE]
+
+
+def response_key(
+    symbol: str,
+    timeframe: str,
+    start: datetime.date,
+    end: datetime.date,
+    limit: int,
+    cursor: str | None = None,
+) -> str:
+    """
+    Normalized cache key of a price response.
+    """
+    return (
+        f"prices:{symbol.upper()}:{timeframe.lower()}:"
+        f"{start.isoformat()}:{end.isoformat()}:{limit}:{cursor or ''}"
+    )
+
+
+def series_version(symbol: str, timeframe: str) -> int:
+    """
+    Get the write counter of a series, the version of its cached responses.
+    Every ingest that inserts bars bumps it in the DB, which retires the
+    cached pages of the series in every process, stale entries just expire.
+
+    Returns 0 if the series was never written.
+    """
+    state = conditional.series_version(symbol, timeframe)
+    return state[0] if state else 0
+
+
+def get_response(key: str, version: int):
+    return get_cache().get(key, version=version)
+
+
+def set_response(key: str, version: int, end: datetime.date, data):
+    """
+    Cache a response under the version of its series.
+    """
+    if end >= datetime.date.today():
+        timeout = settings.PRICE_CACHE_LIVE_TIMEOUT
+    else:
+        timeout = DEFAULT_TIMEOUT
+    get_cache().set(key, data, timeout=timeout, version=version)
@@ -0,0 +1,68 @@
+import hashlib
+from typing import NamedTuple
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from market_data import registry
+from market_data.models import SeriesState
+
+# Response header carrying the series version, the token of delta requests
+SEQ_HEADER = "X-Seq"
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: int
+    version: int
+
+
+def series_version(symbol: str, timeframe: str) -> tuple[int, object] | None:
+    """
+    Get the write counter of a series.
+
+    Returns (version, updated_at), or None if the series was never written.
+    """
+    stock_id = registry.resolve_id(symbol)
+    if stock_id is None:
+        return None
+    return (
+        SeriesState.objects.filter(stock_id=stock_id, timeframe=timeframe.lower())
+        .values_list("version", "updated_at")
+        .first()
+    )
+
+
+def series_validators(symbol: str, timeframe: str, *variant) -> Validators | None:
+    """
+    Validators of a response over a series, from its write counter. The
+    `variant` (range, page, format...) makes each response's ETag distinct.
+
+    Returns the validators, or None if the series was never written.
+    """
+    state = series_version(symbol, timeframe)
+    if state is None:
+        return None
+    version, updated_at = state
+    token = ":".join(
+        str(part) for part in (symbol.upper(), timeframe.lower(), version, *variant)
+    )
+    digest = hashlib.blake2b(token.encode(), digest_size=12).hexdigest()
+    return Validators(quote_etag(digest), int(updated_at.timestamp()), version)
+
+
+def not_modified(request, validators: Validators | None):
+    """
+    Returns a 304 response if the client's copy is current, else None.
+    """
+    if validators is None:
+        return None
+    return get_conditional_response(
+        request, etag=validators.etag, last_modified=validators.last_modified
+    )
+
+
+def set_validators(response, validators: Validators | None):
+    if validators is not None:
+        response["ETag"] = validators.etag
+        response["Last-Modified"] = http_date(validators.last_modified)
+        response[SEQ_HEADER] = str(validators.version)
+    return response
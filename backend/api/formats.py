@@ -0,0 +1,127 @@
+import csv
+import io
+import itertools
+import json
+import numpy as np
+import pandas as pd
+from typing import Iterable, Iterator
+from market_data import codec
+
+# Column order of the rows read with values_list
+FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+# Rows per chunk yielded by the streaming encoders
+STREAM_BATCH_SIZE = 500
+
+# Layout of the packed NumPy payload, one record per bar
+BAR_DTYPE = np.dtype(
+    [
+        ("timestamp", "<M8[ns]"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<i8"),
+    ]
+)
+
+
+def format_timestamp(value) -> str:
+    # Same output as DRF's DateTimeField with TIME_ZONE = "UTC"
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def to_records(rows: list[tuple]) -> list[dict]:
+    """
+    One object per bar, the default JSON layout.
+    """
+    return [
+        {
+            "timestamp": format_timestamp(timestamp),
+            "open": open,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+        for timestamp, open, high, low, close, volume in rows
+    ]
+
+
+def to_columns(rows: list[tuple]) -> dict[str, list]:
+    """
+    One array per field.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(FIELDS)
+    data = dict(zip(FIELDS, (list(column) for column in columns)))
+    data["timestamp"] = [format_timestamp(value) for value in data["timestamp"]]
+    return data
+
+
+def to_array(rows: list[tuple]) -> np.ndarray:
+    """
+    Pack the bars into a structured array of BAR_DTYPE.
+    """
+    array = np.empty(len(rows), dtype=BAR_DTYPE)
+    if not rows:
+        return array
+    columns = list(zip(*rows))
+    timestamps = pd.to_datetime(list(columns[0]), utc=True).as_unit("ns")
+    array["timestamp"] = timestamps.asi8.view("<M8[ns]")
+    for field, column in zip(FIELDS[1:], columns[1:]):
+        array[field] = column
+    return array
+
+
+def to_npy(array: np.ndarray) -> bytes:
+    """
+    Serialize an array in the .npy format, readable with numpy.load.
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def to_bars(array: np.ndarray) -> bytes:
+    """
+    Serialize an array of BAR_DTYPE with the compact bar codec, readable
+    with market_data.codec.decode.
+    """
+    values = np.column_stack([array[field] for field in FIELDS[1:]])
+    return codec.encode(array["timestamp"].view(np.int64), values)
+
+
+def iter_csv(
+    rows: Iterable[tuple], batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Yield the bars as CSV text, header first, `batch_size` rows at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(FIELDS)
+    for count, (timestamp, *values) in enumerate(rows, 1):
+        writer.writerow((format_timestamp(timestamp), *values))
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_json(
+    rows: Iterable[tuple], batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Yield the bars as a JSON array of records, `batch_size` rows at a time.
+    """
+    rows = iter(rows)
+    separator = "["
+    while batch := list(itertools.islice(rows, batch_size)):
+        yield separator + json.dumps(to_records(batch))[1:-1]
+        separator = ","
+    yield "[]" if separator == "[" else "]"
@@ -0,0 +1,153 @@
+import datetime
+import logging
+import numpy as np
+import pandas as pd
+from data_ingestion.ohlcv import indicators, sessions
+from market_data import barcache, tiers
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+# Columns read for every indicator, `session` is derived from the timestamps
+BAR_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def series_key(symbol: str, timeframe: str, name: str, period: int | None) -> str:
+    return f"indicators:{symbol.upper()}:{timeframe.lower()}:{name}:{period}"
+
+
+def read_bars(PriceModel, stock_id: int, exchange: str | None, **filters):
+    """
+    Read bars of both storage tiers in timestamp order.
+
+    Returns (UTC int64 ns timestamps, dict of float columns plus `session`).
+    """
+    bars = barcache.read(PriceModel, stock_id, **filters)
+    if bars is not None:
+        timestamps = np.asarray(bars["timestamp"])
+        values = np.column_stack([bars[field] for field in BAR_FIELDS[1:]])
+    else:
+        rows = list(
+            PriceModel.objects.filter(stock_id=stock_id, **filters)
+            .order_by("timestamp")
+            .values_list(*BAR_FIELDS)
+        )
+        timestamps, values = tiers.merge_arrays(
+            tiers.read_cold(PriceModel, stock_id, **filters),
+            (
+                pd.to_datetime([row[0] for row in rows], utc=True).as_unit("ns").asi8,
+                np.array([row[1:] for row in rows], dtype=np.float64),
+            ),
+        )
+    if not len(timestamps):
+        columns = {field: np.empty(0) for field in BAR_FIELDS[1:]}
+        columns["session"] = np.empty(0, dtype=np.int64)
+        return np.empty(0, dtype=np.int64), columns
+
+    timestamps = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True))
+    columns = dict(zip(BAR_FIELDS[1:], values.T))
+    # Exchange-local dates, the VWAP anchor
+    local = timestamps.tz_convert(sessions.get_calendar(exchange).tz).normalize()
+    columns["session"] = local.as_unit("ns").asi8
+    return timestamps.as_unit("ns").asi8, columns
+
+
+def warmup_from(PriceModel, stock_id: int, start: datetime.date, bars: int):
+    """
+    Get the timestamp of the earliest of the `bars` stored bars before
+    `start`, or `start` itself.
+    """
+    if bars <= 0:
+        return start
+    before = list(
+        PriceModel.objects.filter(stock_id=stock_id, timestamp__lt=start)
+        .order_by("-timestamp")
+        .values_list("timestamp", flat=True)[:bars]
+    )
+    cold, _ = tiers.read_cold(PriceModel, stock_id, timestamp__lt=start)
+    if len(cold):
+        hot = pd.to_datetime(before, utc=True).as_unit("ns").asi8
+        merged = np.union1d(hot, cold)[-bars:]
+        before = [pd.Timestamp(merged[0], tz="UTC").to_pydatetime()]
+    return before[-1] if before else start
+
+
+def get_series(
+    symbol: str,
+    timeframe: str,
+    name: str,
+    period: int | None,
+    start: datetime.date,
+    end: datetime.date,
+    PriceModel,
+    stock_id: int,
+    exchange: str | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get an indicator over the bars from `start` to `end`. A cached series
+    starting early enough is extended with the bars after its last one,
+    unless bars were inserted inside it since it was computed, otherwise
+    it is computed from scratch after warm-up bars.
+
+    Returns (UTC int64 ns timestamps, values).
+    """
+    indicator = indicators.INDICATORS[name]
+    start_ns = pd.Timestamp(start, tz="UTC").value
+    end_ns = pd.Timestamp(end, tz="UTC").value
+    key = series_key(symbol, timeframe, name, period)
+    # Read before the bars, bars inserted in between count as new next time
+    version = cache.series_version(symbol, timeframe)
+
+    entry = cache.get_cache().get(key)
+    if entry is not None and not (
+        entry["valid_from"] <= start_ns
+        and len(entry["ts"])
+        and is_extendable(PriceModel, stock_id, entry, version)
+    ):
+        entry = None
+    if entry is not None:
+        last = pd.Timestamp(entry["ts"][-1], unit="ns", tz="UTC")
+        timestamps, columns = read_bars(
+            PriceModel, stock_id, exchange, timestamp__gt=last, timestamp__lte=end
+        )
+        if len(timestamps):
+            values, state = indicator.compute(columns, period, entry["state"])
+            entry = {
+                "ts": np.concatenate([entry["ts"], timestamps]),
+                "values": np.concatenate([entry["values"], values]),
+                "state": state,
+                "valid_from": entry["valid_from"],
+                "version": version,
+            }
+            cache.get_cache().set(key, entry)
+            logger.debug(f"Extended {key} by {len(timestamps)} bars")
+    else:
+        first = warmup_from(PriceModel, stock_id, start, indicator.warmup(period))
+        timestamps, columns = read_bars(
+            PriceModel, stock_id, exchange, timestamp__gte=first, timestamp__lte=end
+        )
+        values, state = indicator.compute(columns, period)
+        entry = {"ts": timestamps, "values": values, "state": state}
+        entry["valid_from"] = start_ns
+        entry["version"] = version
+        if len(timestamps):
+            cache.get_cache().set(key, entry)
+
+    ts = entry["ts"]
+    lo = np.searchsorted(ts, start_ns, side="left")
+    hi = np.searchsorted(ts, end_ns, side="right")
+    return ts[lo:hi], entry["values"][lo:hi]
+
+
+def is_extendable(PriceModel, stock_id: int, entry: dict, version: int) -> bool:
+    """
+    Check that no bar was inserted at or before the last bar of a cached
+    series since it was computed, from the series write counter and the
+    (stock, seq) index. Works across processes, unlike a signal.
+    """
+    if entry["version"] == version:
+        return True
+    last = pd.Timestamp(entry["ts"][-1], unit="ns", tz="UTC")
+    return not PriceModel.objects.filter(
+        stock_id=stock_id, seq__gt=entry["version"], timestamp__lte=last
+    ).exists()
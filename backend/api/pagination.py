@@ -0,0 +1,41 @@
+import base64
+import datetime
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_PARAM = "cursor"
+# Rows fetched per round trip by the streaming export
+STREAM_CHUNK_SIZE = 2000
+
+
+def encode_cursor(timestamp: datetime.datetime) -> str:
+    """
+    Opaque cursor pointing after the bar at `timestamp`.
+    """
+    encoded = base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode()
+    # Padding would be percent-encoded in links
+    return encoded.rstrip("=")
+
+
+def decode_cursor(cursor: str) -> datetime.datetime:
+    """
+    Get the timestamp a cursor points after.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = base64.urlsafe_b64decode(padded.encode()).decode()
+        timestamp = datetime.datetime.fromisoformat(value)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+    if timestamp.tzinfo is None:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return timestamp
+
+
+def next_link(request, cursor: str) -> str:
+    """
+    Link header value pointing at the next page.
+    """
+    url = replace_query_param(request.build_absolute_uri(), CURSOR_PARAM, cursor)
+    return f'<{url}>; rel="next"'
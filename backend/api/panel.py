@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from market_data import registry, tiers
+from . import formats
+
+# Fields a panel can carry, one matrix each
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+# Symbols accepted by a single panel request
+MAX_PANEL_SYMBOLS = 50
+
+
+def read_panel(PriceModel, symbols: list[str], start, end, fields: list[str]) -> dict:
+    """
+    Read the bars of many symbols in one `stock_id IN (...)` query, plus
+    their cold partitions, and align them on the union of their timestamps.
+
+    Returns the symbols, timestamps and one (timestamps x symbols) matrix per
+    field, with None where a symbol has no bar.
+    """
+    resolved = [registry.resolve(symbol) for symbol in symbols]
+    stock_ids = {info.id: symbol for symbol, info in zip(symbols, resolved) if info}
+    rows = list(
+        PriceModel.objects.filter(
+            stock_id__in=list(stock_ids),
+            timestamp__gte=start,
+            timestamp__lte=end,
+        ).values_list("stock_id", "timestamp", *fields)
+    )
+
+    # Compacted months, the hot bar wins where both tiers hold one
+    columns = [tiers.COLUMNS.index(field) - 1 for field in fields]
+    cold = []
+    for stock_id in stock_ids:
+        timestamps, values = tiers.read_cold(
+            PriceModel, stock_id, timestamp__gte=start, timestamp__lte=end
+        )
+        if len(timestamps):
+            cold.append(
+                pd.DataFrame(
+                    {
+                        "stock_id": stock_id,
+                        "timestamp": pd.to_datetime(timestamps, utc=True),
+                        **dict(zip(fields, values[:, columns].T)),
+                    }
+                )
+            )
+
+    panel = {"symbols": symbols}
+    if not rows and not cold:
+        panel["timestamps"] = []
+        panel.update({field: [] for field in fields})
+        return panel
+
+    frame = pd.DataFrame(rows, columns=["stock_id", "timestamp", *fields])
+    if cold:
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+        frame = pd.concat([frame, *cold], ignore_index=True).drop_duplicates(
+            ["stock_id", "timestamp"]
+        )
+    frame["symbol"] = frame["stock_id"].map(stock_ids)
+    wide = frame.pivot(index="timestamp", columns="symbol", values=fields)
+    wide = wide.sort_index()
+
+    panel["timestamps"] = [
+        formats.format_timestamp(value) for value in wide.index.to_pydatetime()
+    ]
+    for field in fields:
+        matrix = wide[field].reindex(columns=symbols).to_numpy(dtype=np.float64)
+        panel[field] = to_nullable(matrix)
+    return panel
+
+
+def to_nullable(matrix: np.ndarray) -> list[list]:
+    """
+    Nested lists with NaN replaced by None, JSON has no NaN.
+    """
+    nullable = matrix.astype(object)
+    nullable[np.isnan(matrix)] = None
+    return nullable.tolist()
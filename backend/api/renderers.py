@@ -0,0 +1,68 @@
+import json
+import numpy as np
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from . import formats
+
+
+def render_error(data, renderer_context) -> bytes:
+    """
+    Render non-bar data (errors) as JSON whatever format was negotiated.
+    """
+    response = (renderer_context or {}).get("response")
+    if response is not None:
+        response["Content-Type"] = "application/json"
+    return json.dumps(data).encode()
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    JSON with one array per field, see formats.to_columns.
+    """
+
+    media_type = "application/vnd.ohlcv.columns+json"
+    format = "columns"
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, list):
+            return render_error(data, renderer_context)
+        return "".join(formats.iter_csv(data)).encode(self.charset)
+
+
+class NumpyRenderer(BaseRenderer):
+    """
+    Packed .npy structured array, see formats.BAR_DTYPE.
+    """
+
+    media_type = "application/x-npy"
+    format = "npy"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, np.ndarray):
+            return render_error(data, renderer_context)
+        return formats.to_npy(data)
+
+
+class BarCodecRenderer(BaseRenderer):
+    """
+    Compact bar codec payload, see market_data.codec. Lossless, prices of
+    up to 6 decimals are sent as ticks and others as float64 bit patterns,
+    so it decodes to the same floats as ?format=npy.
+    """
+
+    media_type = "application/x-bars"
+    format = "bars"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, np.ndarray):
+            return render_error(data, renderer_context)
+        return formats.to_bars(data)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from market_data.models import FetchJob
 
 
 class StockPriceSerializer(serializers.Serializer):
@@ -11,3 +12,19 @@ class StockPriceSerializer(serializers.Serializer):
 
     class Meta:
         fields = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+class FetchJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FetchJob
+        fields = [
+            "id",
+            "symbol",
+            "timeframe",
+            "start",
+            "end",
+            "status",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
@@ -1,6 +1,16 @@
 from django.urls import path
-from .views import PriceDataView as data
+from .views import (
+    FetchJobView,
+    IndicatorView,
+    PanelView,
+    PriceDataView as data,
+    price_data_async,
+)
 
 urlpatterns = [
     path("get-ticker/<str:symbol>/", data.as_view(), name="get_ticker"),
+    path("async/get-ticker/<str:symbol>/", price_data_async, name="get_ticker_async"),
+    path("panel/", PanelView.as_view(), name="panel"),
+    path("indicators/<str:symbol>/", IndicatorView.as_view(), name="indicators"),
+    path("jobs/<uuid:job_id>/", FetchJobView.as_view(), name="fetch_job"),
 ]
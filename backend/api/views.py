@@ -1,85 +1,661 @@
+from data_ingestion.ohlcv import jobs, services
 from data_ingestion.ohlcv.services import (
+    aensure_data,
     ensure_data,
+    ensure_data_many,
     get_timeframe,
 )
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework import status
-from .serializers import StockPriceSerializer
+from market_data import barcache, registry, tiers
+from market_data.models import FetchJob
+from .serializers import FetchJobSerializer
+from .renderers import (
+    BarCodecRenderer,
+    ColumnarJSONRenderer,
+    CSVRenderer,
+    NumpyRenderer,
+)
+from . import cache, conditional, formats, indicators, pagination, panel
+from data_ingestion.ohlcv import indicators as indicator_math, sessions
+from typing import NamedTuple
 import datetime
+import itertools
+import pandas as pd
+
+NOT_FOUND_ERROR = (
+    "Data could not be found in the database or fetched from external sources."
+)
+
+
+class PriceQuery(NamedTuple):
+    symbol: str
+    timeframe: str
+    start: datetime.date
+    end: datetime.date
+    limit: int
+    cursor: str | None
+    after: datetime.datetime | None
+    stream: bool
+    wait: bool
+    since: int | None
+
+
+def parse_date_range(start: str, end: str) -> tuple[datetime.date, datetime.date]:
+    """
+    Validate a start/end date pair, clamping the end to today.
+
+    Raises ValueError with the message for the client.
+    """
+    try:
+        end_date = datetime.datetime.fromisoformat(end).date()
+        start_date = datetime.datetime.fromisoformat(start).date()
+    except ValueError:
+        raise ValueError("Invalid date format. (YYYY-MM-DD only)")
+    if start_date > end_date:
+        raise ValueError("Start date must be before end date.")
+    if end_date > datetime.date.today():
+        end_date = datetime.date.today()
+    return start_date, end_date
+
+
+def parse_price_query(symbol: str, params) -> PriceQuery:
+    """
+    Validate the query parameters of the price endpoints.
+
+    Raises ValueError with the message for the client.
+    """
+    symbol = symbol.upper()
+    timeframe = params.get("timeframe")
+    start = params.get("start")
+    end = params.get("end")
+    limit = params.get("limit", "100")
+    cursor = params.get(pagination.CURSOR_PARAM)
+    stream = params.get("stream", "").lower() in ("1", "true")
+    wait = params.get("wait", "").lower() not in ("0", "false")
+    since = params.get("since")
+
+    if not all([symbol, timeframe, start, end]):
+        raise ValueError(
+            "symbol, timeframe, start date, and end date are required parameters."
+        )
+
+    start_date, end_date = parse_date_range(start, end)
+
+    # Limit validation
+    try:
+        limit_query = int(limit)
+    except ValueError:
+        limit_query = 0
+    if limit_query < 1:
+        raise ValueError("Invalid limit value. Must be an integer.")
+    if limit_query > 200:
+        limit_query = 200
+
+    # Cursor validation
+    try:
+        after = pagination.decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise ValueError("Invalid cursor.")
+
+    # Delta token validation
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            since = -1
+        if since < 0:
+            raise ValueError("Invalid since token. Use the last X-Seq header.")
+
+    return PriceQuery(
+        symbol,
+        timeframe,
+        start_date,
+        end_date,
+        limit_query,
+        cursor,
+        after,
+        stream,
+        wait,
+        since,
+    )
+
+
+def price_rows(PriceModel, query: PriceQuery):
+    """
+    Bar rows of a query as values_list tuples in timestamp order.
+    """
+    # Keyset pagination on the (stock, timestamp) index, no OFFSET scans
+    rows = PriceModel.objects.filter(
+        stock_id=registry.resolve_id(query.symbol),
+        timestamp__gte=query.start,
+        timestamp__lte=query.end,
+    )
+    if query.after:
+        rows = rows.filter(timestamp__gt=query.after)
+    if query.since is not None:
+        # Bars ingested after the client's token, from the (stock, seq) index
+        rows = rows.filter(seq__gt=query.since)
+    return rows.order_by("timestamp").values_list(*formats.FIELDS)
+
+
+def tiered_rows(PriceModel, query: PriceQuery, limit: int | None = None):
+    """
+    Bar rows of a query from the bar cache, or from the price table merged
+    with the compacted cold partitions of the range, in timestamp order.
+    """
+    stock_id = registry.resolve_id(query.symbol)
+    filters = {"timestamp__gte": query.start, "timestamp__lte": query.end}
+    if query.after:
+        filters["timestamp__gt"] = query.after
+    # Read-heavy series are sliced out of the shared bar cache
+    bars = barcache.read(PriceModel, stock_id, **filters)
+    if bars is not None:
+        if limit is None:
+            return barcache.iter_rows(bars, pagination.STREAM_CHUNK_SIZE)
+        return iter(barcache.to_rows(bars[:limit]))
+
+    rows = price_rows(PriceModel, query)
+    cold = tiers.read_cold(PriceModel, stock_id, **filters)
+    if limit is None:
+        # The whole range, read through a server-side cursor where the
+        # backend has one
+        hot = rows.iterator(chunk_size=pagination.STREAM_CHUNK_SIZE)
+    else:
+        hot = rows[:limit]
+    if not len(cold[0]):
+        return hot
+    cold = tiers.to_rows(cold[0][:limit], cold[1][:limit])
+    return itertools.islice(tiers.merge_rows(cold, hot), limit)
+
+
+def read_page(PriceModel, query: PriceQuery, version: int) -> list[tuple]:
+    """
+    Read a page of rows and cache it under the series `version`, read
+    before the rows.
+    """
+    # One extra row tells whether there is a next page
+    rows = list(tiered_rows(PriceModel, query, query.limit + 1))
+    cache.set_response(
+        cache.response_key(
+            query.symbol,
+            query.timeframe,
+            query.start,
+            query.end,
+            query.limit,
+            query.cursor,
+        ),
+        version,
+        query.end,
+        rows,
+    )
+    return rows
+
+
+def read_delta(PriceModel, query: PriceQuery) -> tuple[list[tuple], int | None]:
+    """
+    A page of the bars of the range ingested after `since`. Compacted bars
+    are old and were sent before, only the price table is read.
+
+    Returns up to limit + 1 rows and, on the first page, the token of the
+    next poll. Later pages have none, a token read after the first page
+    would skip bars inserted before the cursor in between.
+    """
+    seq = None
+    if query.after is None:
+        state = conditional.series_version(query.symbol, query.timeframe)
+        seq = state[0] if state else 0
+    # Read after the version, bars committed in between are just sent
+    # again on the next poll
+    rows = list(price_rows(PriceModel, query)[: query.limit + 1])
+    return rows, seq
+
+
+def submit_partial(PriceModel, query: PriceQuery) -> tuple[FetchJob, list[tuple]]:
+    """
+    Fill the gaps of the range in the background.
+
+    Returns the fetch job and the page of bars stored so far.
+    """
+    job = jobs.submit(query.symbol, query.timeframe, query.start, query.end)
+    # Not cached, the page is incomplete
+    rows = list(tiered_rows(PriceModel, query, query.limit + 1))
+    return job, rows
+
+
+def accepted(request, response, job: FetchJob):
+    """
+    Turn a partial page into a 202 linking the fetch job in the Location
+    and X-Fetch-Job headers.
+    """
+    response.status_code = status.HTTP_202_ACCEPTED
+    response["Location"] = request.build_absolute_uri(
+        reverse("fetch_job", args=[job.pk])
+    )
+    response["X-Fetch-Job"] = str(job.pk)
+    return response
+
+
+def add_next_cursor(request, response, rows: list[tuple], limit: int):
+    """
+    Point at the next page in the X-Next-Cursor and Link headers when the
+    rows go past `limit`.
+    """
+    if len(rows) > limit:
+        cursor = pagination.encode_cursor(rows[limit - 1][0])
+        response["X-Next-Cursor"] = cursor
+        response["Link"] = pagination.next_link(request, cursor)
+    return response
+
+
+def csv_response(rows) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        formats.iter_csv(rows), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = 'attachment; filename="prices.csv"'
+    return response
 
 
 # check https://docs.djangoproject.com/en/5.2/ref/validators/
 class PriceDataView(APIView):
     # Restrict to the API to just queries
     http_method_names = ["get"]
+    # Picked from the Accept header or ?format=json|columns|csv|npy|bars,
+    # bars is as exact as npy
+    renderer_classes = [
+        JSONRenderer,
+        BrowsableAPIRenderer,
+        ColumnarJSONRenderer,
+        CSVRenderer,
+        NumpyRenderer,
+        BarCodecRenderer,
+    ]
 
     def get(self, request, symbol):
-        symbol = symbol.upper()
-        timeframe = request.query_params.get("timeframe")
-        start = request.query_params.get("start")
-        end = request.query_params.get("end")
-        limit = request.query_params.get("limit", "100")
+        try:
+            query = parse_price_query(symbol, request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not all([symbol, timeframe, start, end]):
+        format = request.accepted_renderer.format
+        if query.stream and format not in ("json", "csv"):
             return Response(
-                {
-                    "error": "symbol, timeframe, start date, and end date are required parameters."
-                },
+                {"error": "Streaming is only available as json or csv."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        # Date validation
-        try:
-            end_date = datetime.datetime.fromisoformat(end).date()
-            start_date = datetime.datetime.fromisoformat(start).date()
-            if start_date > end_date:
-                return Response(
-                    {"error": "Start date must be before end date."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            if end_date > datetime.date.today():
-                end_date = datetime.date.today()
-        except ValueError:
+        if query.stream and query.since is not None:
             return Response(
-                {"error": "Invalid date format. (YYYY-MM-DD only)"},
+                {"error": "since can't be combined with stream."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        # Streams and deltas skip the cache and the validators
+        paged = not query.stream and query.since is None
 
-        # Limit validation
-        try:
-            limit_query = int(limit)
-            if limit_query < 1:
-                raise Exception(ValueError)
-            if limit_query > 200:
-                limit_query = 200
-        except ValueError:
-            return Response(
-                {"error": "Invalid limit value. Must be an integer."},
-                status=status.HTTP_400_BAD_REQUEST,
+        # Timeframe validation
+        PriceModel = get_timeframe(query.timeframe, "model")
+
+        # Serve repeated queries without touching the DB
+        cache_key = cache.response_key(
+            query.symbol,
+            query.timeframe,
+            query.start,
+            query.end,
+            query.limit,
+            query.cursor,
+        )
+        # Conditional GET, one indexed lookup of the series write counter
+        # answers pollers before the cache or the main query
+        validators = None
+        if paged:
+            validators = conditional.series_validators(
+                query.symbol, query.timeframe, cache_key, format
             )
+            # Past ranges only change through ingest, which bumps the version
+            if query.end < datetime.date.today():
+                response = conditional.not_modified(request, validators)
+                if response is not None:
+                    return response
 
-        # Timeframe validation
-        PriceModel = get_timeframe(timeframe, "model")
+        rows = None
+        if paged:
+            # Versioned by the series write counter, an ingest retires them
+            rows = cache.get_response(cache_key, getattr(validators, "version", 0))
+        if rows is not None:
+            response = self.render_page(request, rows, query.limit)
+            return conditional.set_validators(response, validators)
+
+        # Answer at once with the stored bars and fill the gaps in the
+        # background, the client polls the job or uses the partial data
+        if not query.wait and paged:
+            if not services.is_data_ready(
+                query.symbol, query.timeframe, query.start, query.end
+            ):
+                return self.accept_partial(request, PriceModel, query)
 
         # Check the DB
         is_data_ready = ensure_data(
-            symbol, timeframe, start_date, end_date, limit_query
+            query.symbol, query.timeframe, query.start, query.end, query.limit
         )
         if not is_data_ready:
             return Response(
-                {
-                    "error": "Data could not be found in the database or fetched from external sources."
-                },
+                {"error": NOT_FOUND_ERROR},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Query the DB
-        query = PriceModel.objects.filter(
-            stock__symbol__iexact=symbol,
-            timestamp__gte=start_date,
-            timestamp__lte=end_date,
-        ).order_by("timestamp")[:limit_query]
+        if query.since is not None:
+            return self.render_delta(request, PriceModel, query)
+
+        if query.stream:
+            # The whole range in constant memory, apart from the cold
+            # partitions which are loaded whole
+            return self.stream_rows(request, tiered_rows(PriceModel, query))
+
+        # ensure_data may have written bars
+        validators = conditional.series_validators(
+            query.symbol, query.timeframe, cache_key, format
+        )
+        response = conditional.not_modified(request, validators)
+        if response is not None:
+            return response
+
+        rows = read_page(PriceModel, query, getattr(validators, "version", 0))
+        response = self.render_page(request, rows, query.limit)
+        return conditional.set_validators(response, validators)
+
+    def render_delta(self, request, PriceModel, query: PriceQuery):
+        """
+        Render a page of the bars of the range ingested after `since`, the
+        first page has the token of the next poll in X-Seq.
+        """
+        rows, seq = read_delta(PriceModel, query)
+        response = self.render_page(request, rows, query.limit)
+        if seq is not None:
+            response[conditional.SEQ_HEADER] = str(seq)
+        return response
+
+    def accept_partial(self, request, PriceModel, query: PriceQuery):
+        """
+        202 with the bars stored so far, the fetch job is linked in the
+        Location and X-Fetch-Job headers.
+        """
+        job, rows = submit_partial(PriceModel, query)
+        response = self.render_page(request, rows, query.limit)
+        return accepted(request, response, job)
+
+    def render_page(self, request, rows: list[tuple], limit: int):
+        """
+        Render the first `limit` rows, with the next page cursor in the
+        X-Next-Cursor and Link headers when there are more.
+        """
+        response = self.render_rows(request, rows[:limit])
+        return add_next_cursor(request, response, rows, limit)
+
+    def stream_rows(self, request, rows):
+        """
+        Stream the rows in the negotiated format, json or csv.
+        """
+        if request.accepted_renderer.format == "csv":
+            return csv_response(rows)
+        return StreamingHttpResponse(
+            formats.iter_json(rows), content_type="application/json"
+        )
+
+    def render_rows(self, request, rows: list[tuple]):
+        """
+        Lay the bar rows out for the negotiated format.
+        """
+        format = request.accepted_renderer.format
+        if format == "csv":
+            return self.stream_rows(request, rows)
+        if format == "columns":
+            data = formats.to_columns(rows)
+        elif format in ("npy", "bars"):
+            data = formats.to_array(rows)
+        else:
+            data = formats.to_records(rows)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def rows_response(format: str, rows: list[tuple]) -> HttpResponse:
+    """
+    Lay the bar rows out for ?format=json|columns|csv|npy|bars without DRF.
+    """
+    if format == "csv":
+        return HttpResponse(
+            "".join(formats.iter_csv(rows)), content_type="text/csv; charset=utf-8"
+        )
+    if format == "npy":
+        return HttpResponse(
+            formats.to_npy(formats.to_array(rows)),
+            content_type="application/x-npy",
+        )
+    if format == "bars":
+        return HttpResponse(
+            formats.to_bars(formats.to_array(rows)),
+            content_type="application/x-bars",
+        )
+    if format == "columns":
+        return JsonResponse(formats.to_columns(rows))
+    return JsonResponse(formats.to_records(rows), safe=False)
+
+
+@require_GET
+async def price_data_async(request, symbol):
+    """
+    Async twin of PriceDataView for ASGI servers: a cold request waits on the
+    providers without holding a worker, so one process can keep many of them
+    in flight. Formats are picked with ?format=json|columns|csv|npy|bars,
+    streaming stays on the sync endpoint.
+    """
+    try:
+        query = parse_price_query(symbol, request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    format = request.GET.get("format", "json")
+    if format not in ("json", "columns", "csv", "npy", "bars") or query.stream:
+        return JsonResponse(
+            {
+                "error": "format must be json, columns, csv, npy or bars, without stream."
+            },
+            status=400,
+        )
+    # Deltas skip the cache
+    paged = query.since is None
+
+    PriceModel = get_timeframe(query.timeframe, "model")
+    cache_key = cache.response_key(
+        query.symbol,
+        query.timeframe,
+        query.start,
+        query.end,
+        query.limit,
+        query.cursor,
+    )
+    rows = None
+    if paged:
+        version = await sync_to_async(cache.series_version)(
+            query.symbol, query.timeframe
+        )
+        rows = await sync_to_async(cache.get_response)(cache_key, version)
+    if rows is None:
+        # Answer at once with the stored bars and fill the gaps in the
+        # background, the client polls the job or uses the partial data
+        if not query.wait and paged:
+            is_data_ready = await sync_to_async(services.is_data_ready)(
+                query.symbol, query.timeframe, query.start, query.end
+            )
+            if not is_data_ready:
+                job, rows = await sync_to_async(submit_partial)(PriceModel, query)
+                response = rows_response(format, rows[: query.limit])
+                add_next_cursor(request, response, rows, query.limit)
+                return accepted(request, response, job)
+
+        is_data_ready = await aensure_data(
+            query.symbol, query.timeframe, query.start, query.end, query.limit
+        )
+        if not is_data_ready:
+            return JsonResponse({"error": NOT_FOUND_ERROR}, status=404)
+
+        if query.since is not None:
+            rows, seq = await sync_to_async(read_delta)(PriceModel, query)
+            response = rows_response(format, rows[: query.limit])
+            if seq is not None:
+                response[conditional.SEQ_HEADER] = str(seq)
+            return add_next_cursor(request, response, rows, query.limit)
+
+        # The fetch may have written bars
+        version = await sync_to_async(cache.series_version)(
+            query.symbol, query.timeframe
+        )
+        rows = await sync_to_async(read_page)(PriceModel, query, version)
+
+    response = rows_response(format, rows[: query.limit])
+    return add_next_cursor(request, response, rows, query.limit)
+
+
+class PanelView(APIView):
+    """
+    Bars of many symbols aligned on shared timestamps, e.g.
+    ?symbols=SPY,QQQ&timeframe=1d&start=2025-01-01&end=2025-02-01&fields=close
+    """
+
+    http_method_names = ["get"]
+
+    def get(self, request):
+        symbols = [
+            symbol.strip().upper()
+            for symbol in request.query_params.get("symbols", "").split(",")
+            if symbol.strip()
+        ]
+        # Keep the request order, drop repeats
+        symbols = list(dict.fromkeys(symbols))
+        timeframe = request.query_params.get("timeframe")
+        start = request.query_params.get("start")
+        end = request.query_params.get("end")
+        fields = request.query_params.get("fields", "close").lower().split(",")
+
+        try:
+            if not all([symbols, timeframe, start, end]):
+                raise ValueError(
+                    "symbols, timeframe, start date, and end date are required parameters."
+                )
+            if len(symbols) > panel.MAX_PANEL_SYMBOLS:
+                raise ValueError(
+                    f"At most {panel.MAX_PANEL_SYMBOLS} symbols per request."
+                )
+            if not set(fields) <= set(panel.PANEL_FIELDS):
+                raise ValueError(
+                    f"fields must be among {', '.join(panel.PANEL_FIELDS)}."
+                )
+            start_date, end_date = parse_date_range(start, end)
+            PriceModel = get_timeframe(timeframe, "model")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Symbols that can't be fetched stay in the panel as empty columns
+        ensure_data_many(symbols, timeframe, start_date, end_date)
+
+        data = panel.read_panel(PriceModel, symbols, start_date, end_date, fields)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class IndicatorView(APIView):
+    """
+    An indicator over stored bars, e.g.
+    ?timeframe=1d&start=2025-01-01&end=2025-02-01&indicator=rsi&period=14
+    Warm-up bars before `start` are fetched and used automatically.
+    """
+
+    http_method_names = ["get"]
+
+    def get(self, request, symbol):
+        symbol = symbol.upper()
+        timeframe = request.query_params.get("timeframe")
+        start = request.query_params.get("start")
+        end = request.query_params.get("end")
+        name = request.query_params.get("indicator", "").lower()
+        period = request.query_params.get("period")
+
+        try:
+            if not all([timeframe, start, end, name]):
+                raise ValueError(
+                    "timeframe, start date, end date, and indicator are required parameters."
+                )
+            indicator = indicator_math.INDICATORS.get(name)
+            if indicator is None:
+                raise ValueError(
+                    f"indicator must be one of {', '.join(indicator_math.INDICATORS)}."
+                )
+            start_date, end_date = parse_date_range(start, end)
+            PriceModel = get_timeframe(timeframe, "model")
+            if indicator.default_period is None:
+                period = None
+            else:
+                try:
+                    period = int(period or indicator.default_period)
+                except ValueError:
+                    period = 0
+                if not 1 <= period <= indicator_math.MAX_PERIOD:
+                    raise ValueError(
+                        f"period must be an integer from 1 to {indicator_math.MAX_PERIOD}."
+                    )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Fetch the warm-up bars along with the range
+        info = registry.resolve(symbol)
+        warmup = indicator.warmup(period)
+        fetch_start = None
+        if info is not None:
+            fetch_start = sessions.warmup_start(
+                info.exchange, timeframe, start_date, warmup
+            )
+        if fetch_start is not None:
+            fetch_start = fetch_start.date()
+        else:
+            fetch_start = start_date - warmup * get_timeframe(timeframe, "delta")
+        if not ensure_data(symbol, timeframe, fetch_start, end_date, 0):
+            return Response(
+                {"error": NOT_FOUND_ERROR}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        info = registry.resolve(symbol)
+        timestamps, values = indicators.get_series(
+            symbol,
+            timeframe,
+            name,
+            period,
+            start_date,
+            end_date,
+            PriceModel,
+            info.id,
+            info.exchange,
+        )
+        data = {
+            "symbol": symbol,
+            "timeframe": timeframe.lower(),
+            "indicator": name,
+            "period": period,
+            "timestamps": [
+                formats.format_timestamp(value)
+                for value in pd.to_datetime(timestamps, utc=True).to_pydatetime()
+            ],
+            "values": panel.to_nullable(values),
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class FetchJobView(APIView):
+    http_method_names = ["get"]
 
-        serializer = StockPriceSerializer(query, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get(self, request, job_id):
+        job = get_object_or_404(FetchJob, pk=job_id)
+        return Response(FetchJobSerializer(job).data, status=status.HTTP_200_OK)
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of the compact bar codec against the current payloads:
+JSON records, .npy and compressed .npz.
+
+Run from the backend directory:
+    python -m benchmarks.codec_bench
+"""
+
+import io
+import json
+import time
+import numpy as np
+import pandas as pd
+from api import formats
+from market_data import codec
+
+BARS_PER_SESSION = 78  # 5min bars in a 6.5 hour session
+SESSIONS_PER_YEAR = 252
+
+
+def make_bars(years: int, seed: int = 0):
+    """
+    Build a synthetic 5min series priced in cents.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2020-01-01", periods=years * SESSIONS_PER_YEAR, tz="UTC")
+    opens = (days + pd.Timedelta(hours=14, minutes=30)).as_unit("ns").asi8
+    offsets = np.arange(BARS_PER_SESSION) * pd.Timedelta(minutes=5).value
+    timestamps = (opens[:, None] + offsets).ravel()
+
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.05, len(timestamps))), 2)
+    open = np.round(close + rng.normal(0, 0.02, len(close)), 2)
+    high = np.maximum(open, close) + np.round(rng.random(len(close)) * 0.1, 2)
+    low = np.minimum(open, close) - np.round(rng.random(len(close)) * 0.1, 2)
+    volume = rng.integers(1_000, 500_000, len(close)).astype(np.float64)
+    return timestamps, np.column_stack([open, high, low, close, volume])
+
+
+def to_rows(timestamps, values) -> list[tuple]:
+    index = pd.to_datetime(timestamps, utc=True).to_pydatetime()
+    return [
+        (timestamp, *row[:4], int(row[4]))
+        for timestamp, row in zip(index, values.tolist())
+    ]
+
+
+def json_codec(timestamps, values):
+    rows = to_rows(timestamps, values)
+    encode = lambda: json.dumps(formats.to_records(rows)).encode()
+    return encode, json.loads
+
+
+def npy_codec(timestamps, values):
+    array = formats.to_array(to_rows(timestamps, values))
+    return lambda: formats.to_npy(array), lambda data: np.load(io.BytesIO(data))
+
+
+def npz_codec(timestamps, values):
+    def encode():
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, timestamp=timestamps, values=values)
+        return buffer.getvalue()
+
+    def decode(data):
+        with np.load(io.BytesIO(data)) as file:
+            return file["timestamp"], file["values"]
+
+    return encode, decode
+
+
+def bar_codec(timestamps, values):
+    return lambda: codec.encode(timestamps, values), codec.decode
+
+
+def best_of(function, *args, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    codecs = {"json": json_codec, "npy": npy_codec, "npz": npz_codec, "bars": bar_codec}
+    print(
+        f"{'years':>5} {'bars':>8} {'format':>6} {'bytes/bar':>10} "
+        f"{'encode (ms)':>12} {'decode (ms)':>12}"
+    )
+    for years in (1, 5):
+        timestamps, values = make_bars(years)
+        for name, build in codecs.items():
+            encode, decode = build(timestamps, values)
+            payload = encode()
+            print(
+                f"{years:>5} {len(timestamps):>8} {name:>6} "
+                f"{len(payload) / len(timestamps):>10.1f} "
+                f"{best_of(encode) * 1000:>12.1f} "
+                f"{best_of(decode, payload) * 1000:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class DataIngestionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'data_ingestion'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from market_data.models import UnobtainableRange
+        from .ohlcv import unobtainable
+
+        post_save.connect(
+            unobtainable.range_changed,
+            sender=UnobtainableRange,
+            dispatch_uid='unobtainable_index_save',
+        )
+        post_delete.connect(
+            unobtainable.range_changed,
+            sender=UnobtainableRange,
+            dispatch_uid='unobtainable_index_delete',
+        )
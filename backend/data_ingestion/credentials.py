@@ -6,6 +6,7 @@ def get_api_credentials():
         "alpaca_key": os.environ.get("api_key_alpaca"),
         "alpaca_secret": os.environ.get("api_secret_alpaca"),
         "finage_key": os.environ.get("api_key_finage"),
+        "fmp_key": os.environ.get("api_key_fmp"),
         "polygon_key": os.environ.get("api_key_polygon"),
         "tiingo_key": os.environ.get("api_key_tiingo"),
     }
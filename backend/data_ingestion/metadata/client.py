@@ -1,6 +1,6 @@
 import yfinance as yf
-import requests
 from ..credentials import get_api_credentials
+from ..providers import get_http_session
 from .utils import get_fmp_asset, yf_to_mcal_exchange
 
 # Load the API keys
@@ -12,8 +12,8 @@ def fetch_from_fmp(symbol: str) -> dict:
     Fetch metadata for `symbol` from Financial Modeling Prep.
     """
     url = f"https://financialmodelingprep.com/api/v3/profile/{symbol}"
-    params = {"apikey": _credentials["api_key_fmp"]}
-    r = requests.get(url, params=params)
+    params = {"apikey": _credentials["fmp_key"]}
+    r = get_http_session("fmp").get(url, params=params)
     data = r.json()
     if not isinstance(data, list) or not data:
         return None
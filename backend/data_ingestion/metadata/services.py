@@ -1,5 +1,7 @@
 import logging
 from datetime import timedelta
+from django.db.models import Max
+from django.db.models.functions import Upper
 from django.utils import timezone
 from market_data.models import Stock, StockMetadata
 from data_ingestion.metadata import client
@@ -39,6 +41,35 @@ def ensure_metadata(symbol: str, force_update: bool = False) -> bool:
     return fetch_metadata(symbol)
 
 
+def ensure_metadata_many(symbols: list[str]) -> dict[str, bool]:
+    """
+    Ensure metadata exists for many symbols, finding the outdated ones in a
+    single query.
+
+    Returns a success flag per symbol.
+    """
+    cutoff = timezone.now() - timedelta(days=UPDATE_FREQUENCY_DAYS)
+    updated = set(
+        Stock.objects.annotate(
+            upper=Upper("symbol"), last_updated=Max("stockmetadata__last_updated")
+        )
+        .filter(
+            upper__in=[symbol.upper() for symbol in symbols],
+            last_updated__gte=cutoff,
+        )
+        .values_list("upper", flat=True)
+    )
+
+    results = {}
+    for symbol in symbols:
+        if symbol.upper() in updated:
+            results[symbol] = True
+        else:
+            results[symbol] = fetch_metadata(symbol)
+    logger.debug(f"Metadata of {len(updated)}/{len(symbols)} symbols is updated")
+    return results
+
+
 def fetch_metadata(symbol: str) -> bool:
     """
     Fetch metadata from API provides given a stock symbol.
@@ -1,14 +1,15 @@
 import re
+import threading
 import pandas as pd
 import yfinance as yf
-from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
-from ..credentials import get_api_credentials
+from ..providers import get_alpaca_client
 from datetime import datetime
 
-# Load the API keys
-_credentials = get_api_credentials()
+# yf.download collects its frames in yfinance.shared module globals, two
+# downloads running at once can swap or drop each other's bars
+_yf_download_lock = threading.Lock()
 
 
 def convert_tf(timeframe: str, endpoint: str):
@@ -65,9 +66,7 @@ def fetch_from_alpaca(
 
     amount, unit = tf_object
 
-    client = StockHistoricalDataClient(
-        _credentials["alpaca_key"], _credentials["alpaca_secret"]
-    )
+    client = get_alpaca_client()
     request_params = StockBarsRequest(
         symbol_or_symbols=symbol,
         timeframe=TimeFrame(amount=amount, unit=unit),
@@ -88,11 +87,81 @@ def fetch_from_yfinance(
     amount, unit = tf_object
     interval = f"{amount}{unit}"
 
-    return yf.download(
-        tickers=symbol, start=start, end=end, interval=interval, multi_level_index=False
+    # Ticker.history keeps its result local, unlike yf.download, so gaps can
+    # be fetched concurrently
+    return yf.Ticker(symbol).history(
+        start=start, end=end, interval=interval, actions=False
     )
 
 
+def fetch_many_from_alpaca(
+    symbols: list[str], timeframe: str, start: datetime, end: datetime
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch bars for many symbols in a single Alpaca request.
+
+    Returns a DataFrame per symbol found in the response.
+    """
+    tf_object = convert_tf(timeframe, "alpaca")
+    if not tf_object:
+        raise ValueError("Alpaca: TimeFrame object conversion failed")
+
+    amount, unit = tf_object
+
+    client = get_alpaca_client()
+    request_params = StockBarsRequest(
+        symbol_or_symbols=list(symbols),
+        timeframe=TimeFrame(amount=amount, unit=unit),
+        start=start,
+        end=end,
+    )
+    df = client.get_stock_bars(request_params).df
+    if df.empty:
+        return {}
+
+    # Bars are indexed by (symbol, timestamp)
+    return {
+        symbol: df.xs(symbol, level="symbol")
+        for symbol in df.index.get_level_values("symbol").unique()
+    }
+
+
+def fetch_many_from_yfinance(
+    symbols: list[str], timeframe: str, start: datetime, end: datetime
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch bars for many symbols in a single yFinance download.
+
+    Returns a DataFrame per symbol found in the response.
+    """
+    tf_object = convert_tf(timeframe, "yfinance")
+    if not tf_object:
+        raise ValueError("yFinance: TimeFrame object conversion failed")
+
+    amount, unit = tf_object
+    interval = f"{amount}{unit}"
+
+    with _yf_download_lock:
+        df = yf.download(
+            tickers=list(symbols),
+            start=start,
+            end=end,
+            interval=interval,
+            group_by="ticker",
+            progress=False,
+        )
+    if df is None or df.empty:
+        return {}
+
+    # Columns are indexed by (ticker, price), failed tickers are all NaN
+    frames = {}
+    for symbol in df.columns.get_level_values(0).unique():
+        frame = df[symbol].dropna(how="all")
+        if not frame.empty:
+            frames[symbol] = frame
+    return frames
+
+
 def fetch_from_finage(
     symbol: str, timeframe: str, start: datetime, end: datetime
 ) -> pd.DataFrame:
@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from market_data import registry
+from market_data.models import BarCoverage
+from data_ingestion.ohlcv.intervals import merge_intervals
+
+logger = logging.getLogger(__name__)
+
+
+def record_coverage(stock: object, timeframe: str, start: datetime, end: datetime):
+    """
+    Add [start, end] to the stored intervals, merging any it overlaps.
+    """
+    timeframe = timeframe.lower()
+    start, end = (to_datetime(value) for value in to_ns([start, end]))
+    with transaction.atomic():
+        overlapping = list(
+            BarCoverage.objects.select_for_update().filter(
+                stock=stock, timeframe=timeframe, start__lte=end, end__gte=start
+            )
+        )
+        merged_start = min([start, *(interval.start for interval in overlapping)])
+        merged_end = max([end, *(interval.end for interval in overlapping)])
+
+        if len(overlapping) == 1 and (
+            overlapping[0].start == merged_start and overlapping[0].end == merged_end
+        ):
+            return
+
+        BarCoverage.objects.filter(
+            pk__in=[interval.pk for interval in overlapping]
+        ).delete()
+        BarCoverage.objects.create(
+            stock=stock, timeframe=timeframe, start=merged_start, end=merged_end
+        )
+    logger.debug(f"Coverage of {stock.symbol} {timeframe}: {merged_start} - {merged_end}")
+
+
+def is_range_covered(
+    symbol: str, timeframe: str, start: datetime, end: datetime
+) -> bool:
+    """
+    Check if a single stored interval contains [start, end].
+    """
+    stock_id = registry.resolve_id(symbol)
+    if stock_id is None:
+        return False
+    return BarCoverage.objects.filter(
+        stock_id=stock_id,
+        timeframe=timeframe.lower(),
+        start__lte=start,
+        end__gte=end,
+    ).exists()
+
+
+def get_coverage(
+    symbol: str, timeframe: str, start: datetime, end: datetime
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load the stored intervals overlapping [start, end].
+
+    Returns sorted, non-overlapping (starts, ends) arrays of UTC int64 ns.
+    """
+    rows = BarCoverage.objects.filter(
+        stock_id=registry.resolve_id(symbol),
+        timeframe=timeframe.lower(),
+        start__lte=end,
+        end__gte=start,
+    ).values_list("start", "end")
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    starts, ends = zip(*rows)
+    return merge_intervals(to_ns(starts), to_ns(ends))
+
+
+def to_ns(values) -> np.ndarray:
+    """
+    Convert datetimes to UTC int64 ns.
+    """
+    return pd.to_datetime(list(values), utc=True).as_unit("ns").asi8
+
+
+def to_datetime(value: int) -> datetime:
+    """
+    Convert a UTC int64 ns timestamp to an aware datetime.
+    """
+    return pd.Timestamp(value, unit="ns", tz="UTC").to_pydatetime()
@@ -0,0 +1,78 @@
+import numpy as np
+from data_ingestion.ohlcv.intervals import contains, merge_intervals
+
+
+def find_missing(
+    expected: np.ndarray,
+    existing: np.ndarray,
+    blocked_starts: np.ndarray | None = None,
+    blocked_ends: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the expected bars that are neither stored nor inside a blocked
+    (unobtainable) interval. All values are int64 ns, `expected` sorted.
+
+    Returns the positions in `expected` of the missing bars and a mask of
+    the expected bars that were blocked.
+    """
+    expected = np.asarray(expected, dtype=np.int64)
+    existing = np.sort(np.asarray(existing, dtype=np.int64))
+
+    # searchsorted against the sorted stored bars, cheaper than np.isin
+    position = np.searchsorted(existing, expected, side="left")
+    present = position < len(existing)
+    present[present] = existing[position[present]] == expected[present]
+
+    if blocked_starts is not None and len(blocked_starts):
+        blocked = contains(*merge_intervals(blocked_starts, blocked_ends), expected)
+    else:
+        blocked = np.zeros(len(expected), dtype=bool)
+
+    return np.flatnonzero(~present & ~blocked), blocked & ~present
+
+
+def filled_slots(expected: np.ndarray, stored: np.ndarray, step: int) -> np.ndarray:
+    """
+    Find the expected bars (stamped at their close) that stored bars
+    (stamped at their open) fill. A bar fills the first expected bar after
+    it, if that is at most `step` ns later. All values are int64 ns, both
+    sorted.
+
+    Returns a mask of the filled expected bars.
+    """
+    expected = np.asarray(expected, dtype=np.int64)
+    stored = np.asarray(stored, dtype=np.int64)
+    position = np.searchsorted(expected, stored, side="right")
+    inside = position < len(expected)
+    inside[inside] = expected[position[inside]] - step <= stored[inside]
+
+    filled = np.zeros(len(expected), dtype=bool)
+    filled[position[inside]] = True
+    return filled
+
+
+def split_runs(positions: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Split sorted positions into runs of consecutive values.
+
+    Returns (first, last) positions of every run.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    runs = split_by_step(positions, lambda diffs: diffs == 1)
+    return [(int(positions[first]), int(positions[last])) for first, last in runs]
+
+
+def split_by_step(timestamps: np.ndarray, is_contiguous) -> list[tuple[int, int]]:
+    """
+    Split sorted timestamps wherever `is_contiguous(diffs)` is false.
+
+    Returns (first, last) indexes of every run.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if not len(timestamps):
+        return []
+
+    breaks = np.flatnonzero(~is_contiguous(np.diff(timestamps)))
+    firsts = np.concatenate(([0], breaks + 1))
+    lasts = np.concatenate((breaks, [len(timestamps) - 1]))
+    return list(zip(firsts.tolist(), lasts.tolist()))
@@ -0,0 +1,153 @@
+from typing import Callable, NamedTuple
+import numpy as np
+import pandas as pd
+
+# EMA-style indicators forget their seed at this many periods of warm-up
+SMOOTHING_WARMUP_PERIODS = 3
+# Largest period accepted from clients
+MAX_PERIOD = 500
+
+
+class Indicator(NamedTuple):
+    """
+    `compute(columns, period, state)` returns (values, state). Passing the
+    returned state with the next bars continues the series exactly as if
+    it had been computed in one go.
+    """
+
+    compute: Callable
+    default_period: int | None
+    warmup: Callable[[int | None], int]
+
+
+def sma(columns: dict, period: int, state: dict | None = None):
+    """
+    Simple moving average of the closes.
+    """
+    tail = state["tail"] if state else np.empty(0)
+    close = np.concatenate([tail, columns["close"]])
+    values = pd.Series(close).rolling(period).mean().to_numpy()[len(tail) :]
+    return values, {"tail": close[-(period - 1) :] if period > 1 else close[:0]}
+
+
+def ema(columns: dict, period: int, state: dict | None = None):
+    """
+    Exponential moving average of the closes.
+    """
+    values, last, seen = _smooth(columns["close"], 2 / (period + 1), state)
+    values[: max(period - 1 - (state or {}).get("seen", 0), 0)] = np.nan
+    return values, {"last": last, "seen": seen}
+
+
+def rsi(columns: dict, period: int, state: dict | None = None):
+    """
+    Relative strength index with Wilder's smoothing.
+    """
+    close = columns["close"]
+    state = state or {}
+    # The first bar ever has no change
+    change = close - _previous(close, state.get("close"), close[:1])
+    alpha = 1 / period
+    gain, last_gain, seen = _smooth(np.clip(change, 0, None), alpha, state.get("gain"))
+    loss, last_loss, _ = _smooth(np.clip(-change, 0, None), alpha, state.get("loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+    values[: max(period - state.get("gain", {}).get("seen", 0), 0)] = np.nan
+    return values, {
+        "close": close[-1] if len(close) else state.get("close"),
+        "gain": {"last": last_gain, "seen": seen},
+        "loss": {"last": last_loss, "seen": seen},
+    }
+
+
+def atr(columns: dict, period: int, state: dict | None = None):
+    """
+    Average true range with Wilder's smoothing.
+    """
+    high, low, close = columns["high"], columns["low"], columns["close"]
+    state = state or {}
+    previous = _previous(close, state.get("close"), [np.nan])
+    true_range = np.fmax(
+        high - low, np.fmax(np.abs(high - previous), np.abs(low - previous))
+    )
+    values, last, seen = _smooth(true_range, 1 / period, state.get("tr"))
+    values[: max(period - 1 - state.get("tr", {}).get("seen", 0), 0)] = np.nan
+    return values, {
+        "close": close[-1] if len(close) else state.get("close"),
+        "tr": {"last": last, "seen": seen},
+    }
+
+
+def vwap(columns: dict, period: None = None, state: dict | None = None):
+    """
+    Volume weighted average price, restarted every session. Bars are grouped
+    by their `session` column (exchange-local dates).
+    """
+    typical = (columns["high"] + columns["low"] + columns["close"]) / 3
+    volume = columns["volume"]
+    sessions = columns["session"]
+    state = state or {}
+
+    weighted = (
+        pd.Series(typical * volume).groupby(sessions).cumsum().to_numpy(copy=True)
+    )
+    total = pd.Series(volume).groupby(sessions).cumsum().to_numpy(copy=True)
+    if len(sessions) and state.get("session") == sessions[0]:
+        # Carry the running sums into the session that was cut off
+        same = sessions == sessions[0]
+        weighted[same] += state["weighted"]
+        total[same] += state["volume"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(total > 0, weighted / total, np.nan)
+    if not len(sessions):
+        return values, state
+    return values, {
+        "session": sessions[-1],
+        "weighted": weighted[-1],
+        "volume": total[-1],
+    }
+
+
+def _previous(close: np.ndarray, last_close, seed) -> np.ndarray:
+    """
+    Shift the closes by one bar, the first takes `last_close` or `seed`.
+    """
+    if not len(close):
+        return close
+    first = seed if last_close is None else [last_close]
+    return np.concatenate([first, close[:-1]])
+
+
+def _smooth(values: np.ndarray, alpha: float, state: dict | None):
+    """
+    Exponential smoothing seeded with the first value, or continued from
+    the last smoothed value of `state`.
+
+    Returns (smoothed values, last value, values seen).
+    """
+    seen = (state or {}).get("seen", 0)
+    if not len(values):
+        return values.astype(np.float64), (state or {}).get("last"), seen
+    if state and state.get("last") is not None:
+        series = pd.Series(np.concatenate([[state["last"]], values]))
+        smoothed = series.ewm(alpha=alpha, adjust=False).mean().to_numpy(copy=True)[1:]
+    else:
+        smoothed = (
+            pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy(copy=True)
+        )
+    return smoothed, smoothed[-1], seen + len(values)
+
+
+def _smoothing_warmup(period: int) -> int:
+    return SMOOTHING_WARMUP_PERIODS * period
+
+
+INDICATORS = {
+    "sma": Indicator(sma, 20, lambda period: period - 1),
+    "ema": Indicator(ema, 20, _smoothing_warmup),
+    "rsi": Indicator(rsi, 14, _smoothing_warmup),
+    "atr": Indicator(atr, 14, _smoothing_warmup),
+    # Anchored to the session open, which is inside any requested date range
+    "vwap": Indicator(vwap, None, lambda period: 0),
+}
@@ -0,0 +1,234 @@
+import logging
+from dataclasses import dataclass
+from typing import Type
+import numpy as np
+import pandas as pd
+from django.db import connection
+from market_data.models import BasePrice
+
+logger = logging.getLogger(__name__)
+
+# Rows written per database round-trip, bounds the memory used per chunk
+INGEST_CHUNK_SIZE = 5000
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+@dataclass
+class IngestResult:
+    """
+    Row counts reported by a bulk ingest.
+    """
+
+    inserted: int = 0
+    skipped: int = 0  # Duplicates, either in the frame or already stored
+    invalid: int = 0  # Rows with missing prices or volume
+
+    def __add__(self, other: "IngestResult") -> "IngestResult":
+        return IngestResult(
+            self.inserted + other.inserted,
+            self.skipped + other.skipped,
+            self.invalid + other.invalid,
+        )
+
+
+def frame_to_columns(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Convert a provider DataFrame into sorted, de-duplicated column arrays.
+
+    Returns (UTC timestamps as int64 ns, float64 OHLCV matrix, invalid rows,
+    duplicate rows).
+    """
+    # Standardize column names (yFinance uses capitalized names)
+    frame = df.rename(columns=lambda column: str(column).lower())
+    missing = [column for column in PRICE_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing OHLCV columns: {missing}")
+
+    # Alpaca indexes bars by (symbol, timestamp)
+    index = frame.index
+    if isinstance(index, pd.MultiIndex):
+        level = "timestamp" if "timestamp" in index.names else index.nlevels - 1
+        index = index.get_level_values(level)
+
+    index = pd.DatetimeIndex(index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    timestamps = index.as_unit("ns").asi8
+    values = frame[PRICE_COLUMNS].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    valid = ~np.isnan(values).any(axis=1)
+    invalid = int(len(valid) - valid.sum())
+    timestamps, values = timestamps[valid], values[valid]
+
+    # Sort and keep the first bar of every repeated timestamp
+    order = np.argsort(timestamps, kind="stable")
+    timestamps, values = timestamps[order], values[order]
+    unique = np.ones(len(timestamps), dtype=bool)
+    unique[1:] = timestamps[1:] != timestamps[:-1]
+    duplicates = int(len(unique) - unique.sum())
+
+    return timestamps[unique], values[unique], invalid, duplicates
+
+
+def format_timestamps(timestamps: np.ndarray, suffix: str = "") -> np.ndarray:
+    """
+    Format UTC int64 ns timestamps the way Django stores naive UTC datetimes.
+    """
+    index = pd.to_datetime(timestamps, unit="ns")
+    formatted = np.asarray(index.strftime("%Y-%m-%d %H:%M:%S"), dtype=object)
+    fractional = timestamps % 1_000_000_000 != 0
+    if fractional.any():
+        precise = np.asarray(index.strftime("%Y-%m-%d %H:%M:%S.%f"), dtype=object)
+        formatted = np.where(fractional, precise, formatted)
+    return formatted + suffix if suffix else formatted
+
+
+def bulk_insert_bars(
+    PriceModel: Type[BasePrice],
+    stock_id: int,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    chunk_size: int = INGEST_CHUNK_SIZE,
+    seq: int = 0,
+) -> int:
+    """
+    Insert bars in chunks, skipping any that already exist. Inserted bars
+    are stamped with the ingest sequence `seq`.
+
+    Uses COPY on PostgreSQL (psycopg 3), executemany on SQLite, and
+    bulk_create elsewhere. Must run inside a transaction.
+
+    Returns the number of rows inserted.
+    """
+    if connection.vendor == "postgresql" and _supports_copy():
+        writer = _copy_chunk
+    elif connection.vendor == "sqlite":
+        writer = _executemany_chunk
+    else:
+        writer = _bulk_create_chunk
+
+    inserted = 0
+    for offset in range(0, len(timestamps), chunk_size):
+        inserted += writer(
+            PriceModel,
+            stock_id,
+            seq,
+            timestamps[offset : offset + chunk_size],
+            values[offset : offset + chunk_size],
+        )
+    return inserted
+
+
+def _chunk_rows(
+    stock_id: int,
+    seq: int,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    suffix: str = "",
+) -> list:
+    """
+    Build row tuples for a chunk column-wise.
+    """
+    volume = np.rint(values[:, 4]).astype(np.int64)
+    return list(
+        zip(
+            [stock_id] * len(timestamps),
+            format_timestamps(timestamps, suffix).tolist(),
+            values[:, 0].tolist(),
+            values[:, 1].tolist(),
+            values[:, 2].tolist(),
+            values[:, 3].tolist(),
+            volume.tolist(),
+            [seq] * len(timestamps),
+        )
+    )
+
+
+def _column_list() -> str:
+    quote = connection.ops.quote_name
+    columns = ["stock_id", "timestamp", *PRICE_COLUMNS, "seq"]
+    return ", ".join(quote(column) for column in columns)
+
+
+def _executemany_chunk(
+    PriceModel: Type[BasePrice],
+    stock_id: int,
+    seq: int,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+) -> int:
+    table = connection.ops.quote_name(PriceModel._meta.db_table)
+    sql = (
+        f"INSERT OR IGNORE INTO {table} ({_column_list()}) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, _chunk_rows(stock_id, seq, timestamps, values))
+        return max(cursor.rowcount, 0)
+
+
+def _supports_copy() -> bool:
+    # psycopg2 has no cursor.copy(), only psycopg 3 does
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    return is_psycopg3
+
+
+def _copy_chunk(
+    PriceModel: Type[BasePrice],
+    stock_id: int,
+    seq: int,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+) -> int:
+    quote = connection.ops.quote_name
+    table = quote(PriceModel._meta.db_table)
+    staging = quote("ingest_bars_staging")
+    columns = _column_list()
+
+    with connection.cursor() as cursor:
+        # COPY cannot skip conflicts, so stage the chunk and merge it
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+            f"(stock_id bigint, {quote('timestamp')} timestamptz, "
+            "open double precision, high double precision, low double precision, "
+            "close double precision, volume bigint, seq bigint) ON COMMIT DROP"
+        )
+        cursor.execute(f"TRUNCATE {staging}")
+        with cursor.cursor.copy(f"COPY {staging} ({columns}) FROM STDIN") as copy:
+            for row in _chunk_rows(stock_id, seq, timestamps, values, suffix="+00"):
+                copy.write_row(row)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+            f"ON CONFLICT (stock_id, {quote('timestamp')}) DO NOTHING"
+        )
+        return max(cursor.rowcount, 0)
+
+
+def _bulk_create_chunk(
+    PriceModel: Type[BasePrice],
+    stock_id: int,
+    seq: int,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+) -> int:
+    index = pd.to_datetime(timestamps, unit="ns", utc=True).to_pydatetime()
+    queryset = PriceModel.objects.filter(stock_id=stock_id)
+    before = queryset.count()
+    PriceModel.objects.bulk_create(
+        [
+            PriceModel(
+                stock_id=stock_id,
+                timestamp=timestamp,
+                open=row[0],
+                high=row[1],
+                low=row[2],
+                close=row[3],
+                volume=int(round(row[4])),
+                seq=seq,
+            )
+            for timestamp, row in zip(index, values.tolist())
+        ],
+        ignore_conflicts=True,
+    )
+    return queryset.count() - before
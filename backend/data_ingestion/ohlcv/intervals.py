@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def merge_intervals(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge overlapping or touching closed intervals.
+
+    Returns sorted, non-overlapping (starts, ends) arrays.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if not len(starts):
+        return starts, ends
+
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+
+    # A new interval begins wherever the start is past everything seen so far
+    new_group = np.ones(len(starts), dtype=bool)
+    new_group[1:] = starts[1:] > reach[:-1]
+    first = np.flatnonzero(new_group)
+    last = np.append(first[1:], len(starts)) - 1
+
+    return starts[first], reach[last]
+
+
+def contains(starts: np.ndarray, ends: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Check which points fall inside sorted, non-overlapping closed intervals.
+
+    Returns a boolean mask aligned with `points`.
+    """
+    points = np.asarray(points, dtype=np.int64)
+    if not len(starts):
+        return np.zeros(len(points), dtype=bool)
+
+    position = np.searchsorted(starts, points, side="right") - 1
+    inside = position >= 0
+    inside[inside] = points[inside] <= ends[position[inside]]
+    return inside
+
+
+def subtract_intervals(
+    start: int, end: int, starts: np.ndarray, ends: np.ndarray
+) -> list[tuple[int, int]]:
+    """
+    Subtract sorted, non-overlapping closed intervals from [start, end].
+
+    Returns the uncovered (start, end) pieces, bounds exclusive where they
+    touch a subtracted interval.
+    """
+    pieces = []
+    cursor = start
+    for covered_start, covered_end in zip(starts.tolist(), ends.tolist()):
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            pieces.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            return pieces
+    pieces.append((cursor, end))
+    return pieces
@@ -0,0 +1,86 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from market_data.models import FetchJob
+from data_ingestion.ohlcv import services
+
+logger = logging.getLogger(__name__)
+
+# Unfinished jobs not updated for this long are assumed lost with their
+# process and no longer reused
+STALE_AFTER = timedelta(minutes=10)
+
+_lock = threading.Lock()
+_pool = None
+
+
+def get_job_pool() -> ThreadPoolExecutor:
+    """
+    Get the pool running fetch jobs.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.OHLCV_JOB_WORKERS,
+                thread_name_prefix="ohlcv-job",
+            )
+        return _pool
+
+
+def submit(symbol: str, timeframe: str, start: date, end: date) -> FetchJob:
+    """
+    Queue a background ensure_data, reusing a live job for the same range.
+
+    Returns the job.
+    """
+    symbol, timeframe = symbol.upper(), timeframe.lower()
+    job = (
+        FetchJob.objects.filter(
+            symbol=symbol,
+            timeframe=timeframe,
+            start=start,
+            end=end,
+            status__in=[FetchJob.PENDING, FetchJob.RUNNING],
+            updated_at__gte=timezone.now() - STALE_AFTER,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if job is not None:
+        return job
+
+    job = FetchJob.objects.create(
+        symbol=symbol, timeframe=timeframe, start=start, end=end
+    )
+    # The worker must see the committed row
+    transaction.on_commit(
+        lambda: get_job_pool().submit(services.run_with_connection, run_job, job.pk)
+    )
+    logger.info(f"Queued fetch job {job.pk} for {symbol} {timeframe}")
+    return job
+
+
+def run_job(job_id) -> FetchJob:
+    """
+    Run a fetch job and record how it ended.
+    """
+    job = FetchJob.objects.get(pk=job_id)
+    FetchJob.objects.filter(pk=job_id).update(
+        status=FetchJob.RUNNING, updated_at=timezone.now()
+    )
+    try:
+        ok = services.ensure_data(job.symbol, job.timeframe, job.start, job.end, 0)
+        job.status = FetchJob.DONE if ok else FetchJob.FAILED
+        job.error = "" if ok else "No provider returned the missing bars."
+    except Exception as e:
+        logger.error(f"Fetch job {job_id} failed: {e}")
+        job.status, job.error = FetchJob.FAILED, str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+    logger.info(f"Fetch job {job_id} {job.status}")
+    return job
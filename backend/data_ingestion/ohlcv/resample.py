@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+def session_buckets(
+    timestamps: np.ndarray, opens: np.ndarray, closes: np.ndarray, step: int
+) -> np.ndarray:
+    """
+    Label bars with the start of their `step` ns bucket, counted from the
+    open of their session. All values are UTC int64 ns.
+
+    Returns the bucket starts, -1 for bars outside every session.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    session = np.searchsorted(opens, timestamps, side="right") - 1
+    inside = session >= 0
+    inside[inside] = timestamps[inside] < closes[session[inside]]
+
+    buckets = np.full(len(timestamps), -1, dtype=np.int64)
+    session_open = opens[session[inside]]
+    buckets[inside] = session_open + (timestamps[inside] - session_open) // step * step
+    return buckets
+
+
+def month_buckets(
+    timestamps: np.ndarray, dates: np.ndarray, closes: np.ndarray
+) -> np.ndarray:
+    """
+    Label daily bars with the first day of their session's month, given the
+    naive session `dates` and their `closes` (see sessions.session_table).
+    A bar belongs to the first session closing at or after it, so bars
+    stamped at UTC or exchange-local midnight and at the close all land in
+    their session.
+
+    Returns the month starts as UTC int64 ns, -1 for bars after the last
+    close.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if not len(closes):
+        return np.full(len(timestamps), -1, dtype=np.int64)
+    position = np.searchsorted(closes, timestamps, side="left")
+    inside = position < len(closes)
+    days = np.asarray(dates)[np.minimum(position, len(closes) - 1)]
+    months = days.astype("datetime64[ns]").astype("datetime64[M]")
+    return np.where(inside, months.astype("datetime64[ns]").astype(np.int64), -1)
+
+
+def aggregate(buckets: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate time-sorted OHLCV rows sharing a bucket label, rows labelled
+    -1 are dropped.
+
+    Returns (bucket labels, OHLCV matrix) with one row per bucket.
+    """
+    keep = buckets != -1
+    buckets, values = buckets[keep], values[keep]
+    if not len(buckets):
+        return buckets, values.reshape(0, 5)
+
+    first = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    last = np.append(first[1:], len(buckets)) - 1
+
+    result = np.empty((len(first), 5), dtype=np.float64)
+    result[:, 0] = values[first, 0]
+    result[:, 1] = np.maximum.reduceat(values[:, 1], first)
+    result[:, 2] = np.minimum.reduceat(values[:, 2], first)
+    result[:, 3] = values[last, 3]
+    result[:, 4] = np.add.reduceat(values[:, 4], first)
+    return buckets[first], result
+
+
+def to_frame(buckets: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    """
+    Build an ingestable DataFrame from aggregated bars.
+    """
+    return pd.DataFrame(
+        values,
+        columns=["open", "high", "low", "close", "volume"],
+        index=pd.to_datetime(buckets, unit="ns", utc=True),
+    )
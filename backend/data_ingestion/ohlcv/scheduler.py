@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+# Assumed latency (seconds) of a provider that hasn't been called yet
+DEFAULT_LATENCY = 1.0
+# Seconds charged on top of its latency for a call that returned no bars,
+# an answer without data is never cheap however fast it comes
+WASTED_CALL_COST = 1.0
+# Consecutive errors that open a provider's circuit breaker
+FAILURE_THRESHOLD = 3
+# Seconds an open breaker skips the provider, doubled on every failed retry
+BREAKER_COOLDOWN = 60
+MAX_BREAKER_COOLDOWN = 30 * 60
+
+
+@dataclass
+class ProviderStats:
+    """
+    Call statistics of a provider for a (timeframe, exchange).
+    """
+
+    calls: int = 0
+    successes: int = 0
+    empties: int = 0
+    errors: int = 0
+    latency: float | None = None
+    consecutive_errors: int = 0
+    opened_at: float | None = None
+    cooldown: float = BREAKER_COOLDOWN
+    trial_started: float | None = None
+
+    @property
+    def success_rate(self) -> float:
+        # Laplace smoothing keeps new providers from scoring 0 or 1
+        return (self.successes + 1) / (self.calls + 2)
+
+    @property
+    def expected_cost(self) -> float:
+        """
+        Seconds spent per response with bars, lower is better. Empty and
+        failed calls are charged WASTED_CALL_COST each.
+        """
+        latency = DEFAULT_LATENCY if self.latency is None else self.latency
+        wasted = (1 - self.success_rate) * WASTED_CALL_COST
+        return (latency + wasted) / self.success_rate
+
+    def is_open(self, now: float) -> bool:
+        return self.opened_at is not None and now - self.opened_at < self.cooldown
+
+    def is_trial_running(self, now: float) -> bool:
+        trial = self.trial_started
+        return (
+            self.opened_at is not None
+            and trial is not None
+            and now - trial < self.cooldown
+        )
+
+
+class ProviderScheduler:
+    """
+    Orders providers by their track record and skips the ones whose circuit
+    breaker is open. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str, str], ProviderStats] = {}
+
+    def order(
+        self, sources: list[Callable], timeframe: str, exchange: str | None
+    ) -> list[Callable]:
+        """
+        Sort the sources by expected cost, dropping those with an open
+        breaker or whose trial call is running. The trial of a provider whose
+        cooldown ended is claimed when it is called, see claim.
+
+        Returns every source if all breakers are open.
+        """
+        now = time.monotonic()
+        allowed = []
+        with self._lock:
+            for position, src in enumerate(sources):
+                stats = self._get(src.__name__, timeframe, exchange)
+                if stats.is_open(now):
+                    continue
+                if stats.is_trial_running(now):
+                    continue
+                allowed.append((stats.expected_cost, position, src))
+
+        if not allowed:
+            logger.warning(f"All providers are open for {timeframe} {exchange}")
+            return list(sources)
+        return [src for _, _, src in sorted(allowed, key=lambda item: item[:2])]
+
+    def claim(self, name: str, timeframe: str, exchange: str | None) -> bool:
+        """
+        Claim a call to a provider right before making it. A half-open
+        provider lets a single trial call through per cooldown.
+
+        Returns False if another trial call is running, the source is skipped.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = self._get(name, timeframe, exchange)
+            if stats.opened_at is None or stats.is_open(now):
+                return True
+            if stats.is_trial_running(now):
+                return False
+            stats.trial_started = now
+            return True
+
+    def record(
+        self,
+        name: str,
+        timeframe: str,
+        exchange: str | None,
+        latency: float,
+        outcome: str,
+    ):
+        """
+        Record a call outcome: "success", "empty" or "error".
+        """
+        with self._lock:
+            stats = self._get(name, timeframe, exchange)
+            stats.calls += 1
+            stats.trial_started = None
+            stats.latency = (
+                latency
+                if stats.latency is None
+                else LATENCY_SMOOTHING * latency
+                + (1 - LATENCY_SMOOTHING) * stats.latency
+            )
+
+            if outcome == "error":
+                stats.errors += 1
+                stats.consecutive_errors += 1
+                if stats.opened_at is not None:
+                    # The trial failed, back off further
+                    stats.cooldown = min(stats.cooldown * 2, MAX_BREAKER_COOLDOWN)
+                    stats.opened_at = time.monotonic()
+                elif stats.consecutive_errors >= FAILURE_THRESHOLD:
+                    stats.opened_at = time.monotonic()
+                    logger.warning(
+                        f"Circuit opened for {name} {timeframe} {exchange} "
+                        f"for {stats.cooldown}s"
+                    )
+                return
+
+            if outcome == "success":
+                stats.successes += 1
+            else:
+                stats.empties += 1
+            stats.consecutive_errors = 0
+            if stats.opened_at is not None:
+                logger.info(f"Circuit closed for {name} {timeframe} {exchange}")
+            stats.opened_at = None
+            stats.cooldown = BREAKER_COOLDOWN
+
+    def stats(self, name: str, timeframe: str, exchange: str | None) -> ProviderStats:
+        with self._lock:
+            return self._get(name, timeframe, exchange)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _get(self, name: str, timeframe: str, exchange: str | None) -> ProviderStats:
+        key = (name, timeframe.lower(), exchange or "")
+        if key not in self._stats:
+            self._stats[key] = ProviderStats()
+        return self._stats[key]
+
+
+# Shared by every fetch in the process
+scheduler = ProviderScheduler()
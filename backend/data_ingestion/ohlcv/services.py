@@ -1,7 +1,18 @@
+import asyncio
+import threading
+from asgiref.sync import sync_to_async
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
 from market_data.models import (
     Stock,
     UnobtainableRange,
+    SeriesState,
     BasePrice,
     StockPrice5Min,
     StockPrice15Min,
@@ -9,12 +20,31 @@ from market_data.models import (
     StockPrice1D,
     StockPrice1Month,
 )
-from data_ingestion.ohlcv import client
-from data_ingestion.metadata.services import ensure_metadata
+from market_data import barcache, registry, tiers
+from market_data.signals import bars_saved
+from data_ingestion.ohlcv import (
+    client,
+    coverage,
+    gaps,
+    intervals,
+    resample,
+    sessions,
+    singleflight,
+    unobtainable,
+)
+from data_ingestion.ohlcv.scheduler import scheduler
+from data_ingestion.ohlcv.ingest import (
+    INGEST_CHUNK_SIZE,
+    IngestResult,
+    bulk_insert_bars,
+    frame_to_columns,
+)
+from data_ingestion.metadata.services import ensure_metadata, ensure_metadata_many
+import numpy as np
 import pandas as pd
-import pandas_market_calendars as mcal
 import logging
-from typing import Type
+import time
+from typing import NamedTuple, Type
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +58,12 @@ TIMEFRAME_CONFIG = {
     "15min": {
         "model": StockPrice15Min,
         "delta": timedelta(minutes=15),
+        "source": "5min",
     },
     "1h": {
         "model": StockPrice1H,
         "delta": timedelta(hours=1),
+        "source": "5min",
     },
     "1d": {
         "model": StockPrice1D,
@@ -40,9 +72,16 @@ TIMEFRAME_CONFIG = {
     "1month": {
         "model": StockPrice1Month,
         "delta": timedelta(days=30),
+        "source": "1d",
     },
 }
 
+# Symbols sent per batched provider request
+BATCH_SIZE = 100
+
+_async_fetch_lock = threading.Lock()
+_async_fetch_pool = None
+
 
 def ensure_data(
     symbol: str, timeframe: str, start: datetime, end: datetime, limit: int
@@ -57,12 +96,19 @@ def ensure_data(
 
     # Check metadata
     ensure_metadata(symbol)
+    exchange = get_exchange_from_db(symbol)
 
-    if is_all_bars_available(symbol, timeframe, start, end, PriceModel):
+    if is_all_bars_available(symbol, timeframe, start, end, PriceModel, exchange):
         logger.debug(f"All data already available for {symbol} {timeframe}")
         return True
 
-    result = fetch_missing_data(symbol, timeframe, start, end, PriceModel)
+    # Building bars from stored finer ones is cheaper than any provider
+    if derive_missing_data(symbol, timeframe, start, end, PriceModel, exchange):
+        logger.info(f"Derived {symbol} {timeframe} from finer stored bars")
+        return True
+
+    report = fetch_missing_data(symbol, timeframe, start, end, PriceModel, exchange)
+    result = report.ok
 
     if result:
         logger.info(f"Successfully ensured data for {symbol} {timeframe}")
@@ -72,109 +118,668 @@ def ensure_data(
     return result
 
 
-def fetch_missing_data(
-    symbol: str,
+async def aensure_data(
+    symbol: str, timeframe: str, start: datetime, end: datetime, limit: int
+) -> bool:
+    """
+    Async ensure_data for ASGI views. The DB check runs on the ORM thread
+    and a cold fetch in the async fetch pool, the providers only have
+    blocking clients so the event loop hands them off instead of waiting.
+    This is not async I/O: at most OHLCV_ASYNC_FETCH_WORKERS cold fetches
+    run at once, the rest queue on the pool.
+
+    Returns true if succesful else false.
+    """
+    if await sync_to_async(is_data_ready)(symbol, timeframe, start, end):
+        logger.debug(f"All data already available for {symbol} {timeframe}")
+        return True
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_async_fetch_pool(),
+        run_with_connection,
+        ensure_data,
+        symbol,
+        timeframe,
+        start,
+        end,
+        limit,
+    )
+
+
+def is_data_ready(symbol: str, timeframe: str, start: datetime, end: datetime) -> bool:
+    """
+    Check the DB only, without fetching metadata or bars.
+
+    Returns true if every expected bar is stored.
+    """
+    exchange = get_exchange_from_db(symbol)
+    if exchange is None:
+        return False
+    PriceModel = get_timeframe(timeframe, "model")
+    return is_all_bars_available(symbol, timeframe, start, end, PriceModel, exchange)
+
+
+def get_async_fetch_pool() -> ThreadPoolExecutor:
+    """
+    Get the pool running the blocking fetches of async requests.
+    """
+    global _async_fetch_pool
+    with _async_fetch_lock:
+        if _async_fetch_pool is None:
+            _async_fetch_pool = ThreadPoolExecutor(
+                max_workers=settings.OHLCV_ASYNC_FETCH_WORKERS,
+                thread_name_prefix="ohlcv-fetch",
+            )
+        return _async_fetch_pool
+
+
+def run_with_connection(func, *args):
+    """
+    Run `func` in a pool thread, releasing the thread's DB connection after.
+    """
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def ensure_data_many(
+    symbols: list[str], timeframe: str, start: datetime, end: datetime
+) -> dict[str, bool]:
+    """
+    Ensure data for many symbols, fetching shared gaps in batched provider
+    requests.
+
+    Returns a success flag per symbol.
+    """
+    PriceModel = get_timeframe(timeframe, "model")
+
+    ensure_metadata_many(symbols)
+
+    results = {}
+    plans = {}
+    for symbol in symbols:
+        exchange = get_exchange_from_db(symbol)
+        if is_all_bars_available(symbol, timeframe, start, end, PriceModel, exchange):
+            results[symbol] = True
+            continue
+        stock, _ = Stock.objects.get_or_create(symbol=symbol)
+        plans[symbol] = (
+            stock,
+            exchange,
+            plan_missing_data(stock, timeframe, start, end, PriceModel, exchange),
+        )
+
+    # Symbols refreshed together usually miss the same window
+    batches = defaultdict(list)
+    for symbol, (_, exchange, plan) in plans.items():
+        for gap in plan.gaps:
+            batches[(exchange, gap)].append(symbol)
+
+    failed = set()
+    for (exchange, (gap_start, gap_end)), gap_symbols in batches.items():
+        for offset in range(0, len(gap_symbols), BATCH_SIZE):
+            batch = gap_symbols[offset : offset + BATCH_SIZE]
+            frames = fetch_batch_data(batch, timeframe, gap_start, gap_end, exchange)
+            for symbol in batch:
+                stock = plans[symbol][0]
+                if symbol in frames:
+                    saved = save_to_db(
+                        frames[symbol],
+                        stock,
+                        PriceModel,
+                        fetched_range=(gap_start, gap_end),
+                    )
+                else:
+                    # Fall back to the single-symbol sources
+                    saved = fetch_gap_data(
+                        stock,
+                        symbol,
+                        timeframe,
+                        gap_start,
+                        gap_end,
+                        PriceModel,
+                        exchange,
+                    )
+                if not saved:
+                    failed.add(symbol)
+
+    for symbol, (stock, exchange, plan) in plans.items():
+        results[symbol] = symbol not in failed
+        if results[symbol] and plan.covered_range:
+            record_range_coverage(stock, timeframe, start, end, PriceModel, exchange)
+
+    logger.info(
+        f"Ensured {timeframe} data for {len(results) - len(failed)}/{len(results)} "
+        f"symbols in {len(batches)} gap windows"
+    )
+    return results
+
+
+def fetch_batch_data(
+    symbols: list[str],
+    timeframe: str,
+    gap_start: datetime,
+    gap_end: datetime,
+    exchange: str | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch a gap for many symbols from the sources that accept batches.
+
+    Returns a non-empty DataFrame per symbol that could be fetched.
+    """
+    sources = [
+        client.fetch_many_from_yfinance,
+        client.fetch_many_from_alpaca,
+    ]
+    frames = {}
+    for src in scheduler.order(sources, timeframe, exchange):
+        remaining = [symbol for symbol in symbols if symbol not in frames]
+        if not remaining:
+            break
+        if not scheduler.claim(src.__name__, timeframe, exchange):
+            continue
+        started = time.monotonic()
+        try:
+            data = src(remaining, timeframe, gap_start, gap_end)
+        except Exception as e:
+            scheduler.record(
+                src.__name__, timeframe, exchange, time.monotonic() - started, "error"
+            )
+            logger.warning(f"Failed to fetch batch from {src.__name__}: {e}")
+            continue
+
+        found = {
+            symbol: df
+            for symbol, df in data.items()
+            if symbol in remaining and df is not None and not df.empty
+        }
+        frames.update(found)
+        scheduler.record(
+            src.__name__,
+            timeframe,
+            exchange,
+            time.monotonic() - started,
+            "success" if found else "empty",
+        )
+    return frames
+
+
+class GapPlan(NamedTuple):
+    """
+    Gaps to fetch for a range, and the range to mark as covered once every
+    expected bar of it is stored (None if some bars are unobtainable).
+    """
+
+    gaps: list[tuple[datetime, datetime]]
+    covered_range: tuple[datetime, datetime] | None
+
+
+def plan_missing_data(
+    stock: object,
     timeframe: str,
     start: datetime,
     end: datetime,
     PriceModel: Type[BasePrice],
-) -> bool:
+    exchange: str | None = None,
+) -> GapPlan:
     """
-    Fetch data from an API with multiple fallbacks.
-
-    Returns true if successful, else false.
+    Work out which gaps of a range have to be fetched.
     """
-    stock, _ = Stock.objects.get_or_create(symbol=symbol)
+    expected = sessions.expected_bar_timestamps(exchange, timeframe, start, end)
+    # If the calendar check fails fetch the parts of the range not covered yet
+    if expected is None or not len(expected):
+        range_start, range_end = coverage.to_ns([start, end])
+        starts, ends = coverage.get_coverage(stock.symbol, timeframe, start, end)
+        pieces = intervals.subtract_intervals(range_start, range_end, starts, ends)
+        return GapPlan(
+            gaps=[
+                (coverage.to_datetime(gap_start), coverage.to_datetime(gap_end))
+                for gap_start, gap_end in pieces
+            ],
+            covered_range=None,
+        )
+
+    # Only bars outside the stored coverage intervals need checking
+    first, last = coverage.to_datetime(expected[0]), coverage.to_datetime(expected[-1])
+    starts, ends = coverage.get_coverage(stock.symbol, timeframe, first, last)
+    uncovered = expected[~intervals.contains(starts, ends, expected)]
+    if not len(uncovered):
+        return GapPlan(gaps=[], covered_range=None)
 
-    existing_timestamps = set(
+    uncovered_range = (
+        coverage.to_datetime(uncovered[0]),
+        coverage.to_datetime(uncovered[-1]),
+    )
+    existing = coverage.to_ns(
         PriceModel.objects.filter(
-            stock=stock, timestamp__range=(start, end)
+            stock=stock, timestamp__range=uncovered_range
         ).values_list("timestamp", flat=True)
     )
-    unobtainable_timestamps = list(
-        UnobtainableRange.objects.filter(
-            stock=stock,
-            timeframe=timeframe,
-            start__lt=end,
-            end__gt=start,
-        ).values_list("start", "end")
+    # Bars compacted to cold storage are stored too
+    cold, _ = tiers.read_cold(PriceModel, stock.pk, timestamp__range=uncovered_range)
+    if len(cold):
+        existing = np.concatenate([existing, cold])
+    # Live negative cache, merged intervals kept in memory
+    blocked_starts, blocked_ends = unobtainable.get_unobtainable(stock.pk, timeframe)
+    missing, blocked = gaps.find_missing(
+        uncovered, existing, blocked_starts, blocked_ends
     )
 
-    missing_dates = []
-    expected_timestamps = get_expected_bar_timestamps(symbol, timeframe, start, end)
-    # If the calendar check fails fetch the whole data
-    if not expected_timestamps:
-        return fetch_gap_data(stock, symbol, timeframe, gap_start, gap_end, PriceModel)
+    # Bars next to each other in the calendar belong to the same gap
+    return GapPlan(
+        gaps=[
+            (
+                coverage.to_datetime(uncovered[run_start]),
+                coverage.to_datetime(uncovered[run_end]),
+            )
+            for run_start, run_end in gaps.split_runs(missing)
+        ],
+        covered_range=None if blocked.any() else (first, last),
+    )
 
-    # Ensure all timestamps are available in the response
-    for expected_date in expected_timestamps:
-        if expected_date in existing_timestamps:
-            continue
 
-        # Skip if within unobtainable range
-        is_unobtainable = any(
-            unobt_start <= expected_date <= unobt_end
-            for unobt_start, unobt_end in unobtainable_timestamps
+def month_range(exchange: str | None, start: datetime, end: datetime):
+    """
+    Widen a range to the whole months of its session dates, clipped to the
+    exchange-local today.
+
+    Returns (first day, last day) dates.
+    """
+    start = pd.Timestamp(sessions.session_date(start)).to_period("M").start_time
+    end = pd.Timestamp(sessions.session_date(end)).to_period("M").end_time
+    return start.date(), min(end.date(), sessions.local_date(exchange, timezone.now()))
+
+
+def running_month(exchange: str | None) -> int:
+    """
+    Get the bucket of the exchange-local current month, its first day at
+    midnight UTC like every monthly bar.
+    """
+    today = sessions.local_date(exchange, timezone.now())
+    return pd.Timestamp(today).to_period("M").start_time.tz_localize("UTC").value
+
+
+def aggregate_source(
+    stock_id: int,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    exchange: str | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate the stored bars of a timeframe's source over the sessions
+    from `start` to `end`.
+
+    Returns (UTC int64 ns bucket labels, OHLCV matrix), empty if there are
+    no sessions or bars.
+    """
+    source = TIMEFRAME_CONFIG[timeframe.lower()]["source"]
+    SourceModel = get_timeframe(source, "model")
+    empty = np.empty(0, dtype=np.int64), np.empty((0, 5))
+    dates, opens, closes = sessions.session_table(exchange, start, end)
+    if not len(opens):
+        return empty
+    if source == "1d":
+        bucket_of = lambda timestamps: resample.month_buckets(timestamps, dates, closes)
+    else:
+        step = pd.Timedelta(get_timeframe(timeframe, "delta")).value
+        bucket_of = lambda timestamps: resample.session_buckets(
+            timestamps, opens, closes, step
         )
-        if is_unobtainable:
-            continue
 
-        missing_dates.append(expected_date)
+    # Daily bars are stamped at midnight UTC or exchange-local before the
+    # session opens, or at its close
+    first_day = pd.Timestamp(dates[0])
+    first = min(opens[0], first_day.value, sessions.local_midnight(exchange, first_day))
+    bounds = {
+        "timestamp__gte": coverage.to_datetime(first),
+        "timestamp__lte": coverage.to_datetime(closes[-1]),
+    }
+    rows = list(
+        SourceModel.objects.filter(stock_id=stock_id, **bounds)
+        .order_by("timestamp")
+        .values_list("timestamp", "open", "high", "low", "close", "volume")
+    )
+    timestamps, values = tiers.merge_arrays(
+        tiers.read_cold(SourceModel, stock_id, **bounds),
+        (
+            coverage.to_ns([row[0] for row in rows]),
+            np.array([row[1:] for row in rows], dtype=np.float64),
+        ),
+    )
+    if not len(timestamps):
+        return empty
+    return resample.aggregate(bucket_of(timestamps), values)
+
+
+def is_stored_bar(
+    PriceModel: Type[BasePrice], stock_id: int, bucket: int, bar: np.ndarray
+) -> bool:
+    """
+    Check if the bar stored at `bucket` (UTC int64 ns) has the OHLCV values
+    of `bar`.
+    """
+    row = (
+        PriceModel.objects.filter(
+            stock_id=stock_id, timestamp=coverage.to_datetime(bucket)
+        )
+        .values_list("open", "high", "low", "close", "volume")
+        .first()
+    )
+    return row is not None and np.array_equal(np.array(row, dtype=np.float64), bar)
 
-    if not missing_dates:
-        return True
 
-    gap = group_ranges(missing_dates, timeframe)
+def is_month_range_available(
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    PriceModel: Type[BasePrice],
+    exchange: str | None = None,
+) -> bool:
+    """
+    Monthly bars have no calendar: their closed months are checked against
+    the stored coverage, the running month against its stored daily bars.
+    """
+    info = registry.resolve(symbol)
+    if info is None:
+        return False
+    timeframe = get_timeframe_name(PriceModel)
+    start, end = month_range(exchange, start, end)
+    range_end = int(coverage.to_ns([end])[0])
+    open_bucket = running_month(exchange)
 
-    for gap_start, gap_end in gap:
-        if not fetch_gap_data(stock, symbol, timeframe, gap_start, gap_end, PriceModel):
+    # The bars of the closed months, stamped at their first day
+    months = pd.date_range(start, end, freq="MS", tz="UTC").as_unit("ns").asi8
+    months = months[months < open_bucket]
+    if len(months):
+        starts, ends = coverage.get_coverage(
+            symbol,
+            timeframe,
+            coverage.to_datetime(months[0]),
+            coverage.to_datetime(months[-1]),
+        )
+        if not intervals.contains(starts, ends, months).all():
             return False
-    return True
+    if range_end < open_bucket:
+        return True
 
+    # The running month's bar is current while it matches the aggregate of
+    # the month's daily bars, so it is only derived again when they change
+    month_start = coverage.to_datetime(open_bucket).date()
+    if not len(sessions.session_table(exchange, month_start, end)[0]):
+        return True
+    SourceModel = get_timeframe("1d", "model")
+    if not is_all_bars_available(symbol, "1d", month_start, end, SourceModel, exchange):
+        return False
+    buckets, bars = aggregate_source(info.id, timeframe, month_start, end, exchange)
+    if not len(buckets) or buckets[-1] != open_bucket:
+        return False
+    return is_stored_bar(PriceModel, info.id, open_bucket, bars[-1])
 
-def group_ranges(timestamps: list, timeframe: str) -> list:
+
+def derive_missing_data(
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    PriceModel: Type[BasePrice],
+    exchange: str | None = None,
+) -> bool:
     """
-    Groups a sorted list of timestamps into contiguous ranges.
+    Build a coarser timeframe (TIMEFRAME_CONFIG "source") by aggregating the
+    stored finer bars, if they cover the whole range.
 
-    Returns list of (start_date, end_date) tuples.
+    Returns true if the range was derived, else false.
     """
-    if not timestamps:
-        return []
+    source = TIMEFRAME_CONFIG[timeframe.lower()].get("source")
+    if not source:
+        return False
+    info = registry.resolve(symbol)
+    if info is None:
+        return False
 
-    expected_delta = get_timeframe(timeframe, "delta")
+    if source == "1d":
+        # Monthly bars need every daily bar of their months
+        start, end = month_range(exchange, start, end)
+    SourceModel = get_timeframe(source, "model")
+    if not is_all_bars_available(symbol, source, start, end, SourceModel, exchange):
+        return False
 
-    ranges = []
-    current_start = timestamps[0]
-    current_end = timestamps[0]
+    buckets, bars = aggregate_source(info.id, timeframe, start, end, exchange)
+    if not len(buckets):
+        return False
 
-    for i in range(1, len(timestamps)):
-        current_ts = timestamps[i]
-        previous_ts = timestamps[i - 1]
+    expected = sessions.expected_bar_timestamps(exchange, timeframe, start, end)
+    if expected is not None and len(expected):
+        derived_range = (
+            coverage.to_datetime(expected[0]),
+            coverage.to_datetime(expected[-1]),
+        )
+    else:
+        derived_range = (start, end)
 
-        # Check if current timestamp is contiguous with previous
-        if timeframe.lower() == "1d":
-            # For daily data, use market calendar logic
-            expected_next = previous_ts + expected_delta
-            # Allow for weekends and holidays (more flexible gap detection)
-            is_contiguous = (current_ts - previous_ts).days <= 4
-        else:
-            # For intraday data, strict timing
-            expected_next = previous_ts + expected_delta
-            is_contiguous = abs((current_ts - expected_next).total_seconds()) < 60
+    open_bucket = None
+    if source == "1d":
+        # The bar of the running month changes until the month closes, it
+        # is left uncovered and replaced by every derivation
+        open_bucket = running_month(exchange)
+        range_end = min(int(coverage.to_ns([end])[0]), open_bucket - 1000)
+        derived_range = (start, coverage.to_datetime(range_end))
+
+    replace = open_bucket is not None and buckets[-1] >= open_bucket
+    if replace and is_stored_bar(PriceModel, info.id, open_bucket, bars[-1]):
+        # Unchanged, rewriting it would retire the cached responses
+        buckets, bars, replace = buckets[:-1], bars[:-1], False
+        if not len(buckets):
+            return True
+
+    stock = Stock(pk=info.id, symbol=info.symbol, exchange=info.exchange)
+    with transaction.atomic():
+        if replace:
+            PriceModel.objects.filter(
+                stock=stock, timestamp__gte=coverage.to_datetime(open_bucket)
+            ).delete()
+            # The cached series still holds the replaced bar
+            transaction.on_commit(lambda: barcache.drop(PriceModel, stock.pk))
+        result = save_to_db(
+            resample.to_frame(buckets, bars),
+            stock,
+            PriceModel,
+            fetched_range=derived_range,
+        )
+        if result is None:
+            transaction.set_rollback(True)
+    return result is not None
+
+
+class GapOutcome(NamedTuple):
+    """
+    What happened to a single gap fetch.
+    """
+
+    start: datetime
+    end: datetime
+    status: str  # fetched, coalesced, unobtainable, save_failed or error
+    source: str | None = None
+    inserted: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("fetched", "coalesced")
 
-        if is_contiguous:
-            # Extend current range
-            current_end = current_ts
+
+@dataclass
+class FetchReport:
+    """
+    Outcome of every gap fetched for a range, truthy if all were stored.
+    """
+
+    outcomes: list[GapOutcome]
+
+    @property
+    def ok(self) -> bool:
+        return all(outcome.ok for outcome in self.outcomes)
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+def fetch_missing_data(
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    PriceModel: Type[BasePrice],
+    exchange: str | None = None,
+    max_workers: int | None = None,
+) -> FetchReport:
+    """
+    Fetch data from an API with multiple fallbacks.
+
+    Gaps are downloaded concurrently (see fetch_gaps). A gap that another
+    request, in this process or another one, is already fetching is waited
+    for instead of being downloaded twice.
+
+    Returns a report with the outcome of each gap.
+    """
+    stock, _ = Stock.objects.get_or_create(symbol=symbol)
+    if exchange is None:
+        exchange = get_exchange_from_db(symbol)
+
+    plan = plan_missing_data(stock, timeframe, start, end, PriceModel, exchange)
+
+    # Identical gaps requested concurrently are fetched once
+    claimed, waiting = [], []
+    for gap in plan.gaps:
+        flight, is_leader = singleflight.join(
+            singleflight.gap_key(symbol, timeframe, *gap)
+        )
+        (claimed if is_leader else waiting).append((gap, flight))
+
+    # Every claimed flight lands, even if this request fails, or followers
+    # would wait on it until they time out
+    outcomes, unlanded = {}, dict(claimed)
+    try:
+        # Gaps locked by another process are waited for instead
+        locked, remote = [], []
+        try:
+            for gap, flight in claimed:
+                (locked if singleflight.try_lock(flight.key) else remote).append(gap)
+            outcomes.update(
+                fetch_gaps(
+                    stock, symbol, timeframe, locked, PriceModel, exchange, max_workers
+                )
+            )
+        finally:
+            for gap in locked:
+                singleflight.unlock(unlanded[gap].key)
+        for gap in locked:
+            singleflight.land(unlanded.pop(gap), outcomes.get(gap))
+
+        released = singleflight.wait_unlocked([unlanded[gap].key for gap in remote])
+        retry = []
+        for gap in remote:
+            if unlanded[gap].key in released and coverage.is_range_covered(
+                symbol, timeframe, *gap
+            ):
+                outcomes[gap] = GapOutcome(*gap, "coalesced")
+            else:
+                retry.append(gap)
+        # The other process failed, try them here
+        outcomes.update(
+            fetch_gaps(
+                stock, symbol, timeframe, retry, PriceModel, exchange, max_workers
+            )
+        )
+    finally:
+        for gap, flight in unlanded.items():
+            singleflight.land(flight, outcomes.get(gap))
+
+    deadline = time.monotonic() + singleflight.WAIT_TIMEOUT
+    for gap, flight in waiting:
+        try:
+            outcome = flight.wait(max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            outcome = None
+        if outcome is None:
+            outcomes[gap] = GapOutcome(*gap, "error")
+        elif outcome.ok:
+            outcomes[gap] = outcome._replace(status="coalesced", inserted=0)
         else:
-            # Gap found, close current range and start new one
-            ranges.append((current_start, current_end))
-            current_start = current_ts
-            current_end = current_ts
+            outcomes[gap] = outcome
+
+    report = FetchReport(sorted(outcomes.values(), key=lambda outcome: outcome.start))
+
+    if report.ok and plan.covered_range:
+        record_range_coverage(stock, timeframe, start, end, PriceModel, exchange)
+    return report
+
+
+def record_range_coverage(
+    stock: object,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    PriceModel: Type[BasePrice],
+    exchange: str | None = None,
+):
+    """
+    Mark a range as covered if every expected bar of it is stored now,
+    counting bars stored before coverage was tracked. A provider answer
+    that left bars out keeps them to be fetched again.
+    """
+    plan = plan_missing_data(stock, timeframe, start, end, PriceModel, exchange)
+    if not plan.gaps and plan.covered_range:
+        coverage.record_coverage(stock, timeframe, *plan.covered_range)
 
-    # Add the final range
-    ranges.append((current_start, current_end))
 
-    return ranges
+def fetch_gaps(
+    stock: object,
+    symbol: str,
+    timeframe: str,
+    gap_list: list[tuple[datetime, datetime]],
+    PriceModel: Type[BasePrice],
+    exchange: str | None = None,
+    max_workers: int | None = None,
+) -> dict[tuple[datetime, datetime], GapOutcome]:
+    """
+    Download gaps in up to `max_workers` threads (default
+    settings.OHLCV_FETCH_CONCURRENCY) while this thread writes them to the
+    DB one at a time.
+
+    Returns the outcome of each gap.
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, "OHLCV_FETCH_CONCURRENCY", 4)
+
+    outcomes = {}
+    if len(gap_list) <= 1 or max_workers <= 1:
+        for gap in gap_list:
+            downloaded = download_gap(symbol, timeframe, *gap, exchange)
+            outcomes[gap] = store_gap(stock, timeframe, *gap, PriceModel, downloaded)
+        return outcomes
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(gap_list)),
+        thread_name_prefix=f"fetch-{symbol}",
+    ) as executor:
+        futures = {
+            executor.submit(download_gap, symbol, timeframe, *gap, exchange): gap
+            for gap in gap_list
+        }
+        # Single writer, results are stored as they arrive
+        for future in as_completed(futures):
+            gap = futures[future]
+            try:
+                downloaded = future.result()
+            except Exception as e:
+                logger.error(f"Gap {gap[0]} to {gap[1]} failed: {e}")
+                outcomes[gap] = GapOutcome(*gap, "error")
+                continue
+            outcomes[gap] = store_gap(stock, timeframe, *gap, PriceModel, downloaded)
+    return outcomes
 
 
 def fetch_gap_data(
@@ -184,12 +789,33 @@ def fetch_gap_data(
     gap_start: datetime,
     gap_end: datetime,
     PriceModel: Type[BasePrice],
+    exchange: str | None = None,
 ) -> bool:
     """
     Attempt to fetch data from multiple API sources.
 
     Returns true if successful, false otherwise.
     """
+    downloaded = download_gap(symbol, timeframe, gap_start, gap_end, exchange)
+    outcome = store_gap(stock, timeframe, gap_start, gap_end, PriceModel, downloaded)
+    return outcome.ok
+
+
+def download_gap(
+    symbol: str,
+    timeframe: str,
+    gap_start: datetime,
+    gap_end: datetime,
+    exchange: str | None = None,
+) -> tuple[pd.DataFrame | None, str]:
+    """
+    Download a gap from the first API source that has it, in the order the
+    provider scheduler prefers for the timeframe and exchange. Doesn't touch
+    the DB, so it can run in a worker thread.
+
+    Returns (data, source name), or (None, UnobtainableRange reason) if no
+    source had it.
+    """
     logger.info(f"Fetching {symbol} {timeframe} data from {gap_start} to {gap_end}")
 
     sources = [
@@ -200,57 +826,230 @@ def fetch_gap_data(
         client.fetch_from_polygon,
         client.fetch_from_databento,
     ]
-    for src in sources:
+    reason = UnobtainableRange.NO_DATA
+    for src in scheduler.order(sources, timeframe, exchange):
+        if not scheduler.claim(src.__name__, timeframe, exchange):
+            continue
+        started = time.monotonic()
         try:
             data = src(symbol, timeframe, gap_start, gap_end)
-            if data is not None and not data.empty:
-                save_to_db(data, stock, PriceModel)
-                logger.info(
-                    f"Successfully fetched {timeframe} {symbol} from {gap_start} to {gap_start} - {src.__name__}"
-                )
-                return True
         except Exception as e:
+            reason = UnobtainableRange.ERROR
+            scheduler.record(
+                src.__name__, timeframe, exchange, time.monotonic() - started, "error"
+            )
             logger.warning(f"Failed to fetch from {src.__name__}: {e}")
             continue
 
-    # If all sources failed, mark as unobtainable
+        found = isinstance(data, pd.DataFrame) and not data.empty
+        scheduler.record(
+            src.__name__,
+            timeframe,
+            exchange,
+            time.monotonic() - started,
+            "success" if found else "empty",
+        )
+        if found:
+            logger.info(
+                f"Successfully fetched {timeframe} {symbol} from {gap_start} to {gap_end} - {src.__name__}"
+            )
+            return data, src.__name__
+
     logger.error(
         f"All API sources failed for {symbol} {timeframe} {gap_start} to {gap_end}"
     )
-    UnobtainableRange.objects.create(
-        stock=stock,
-        timeframe=timeframe,
-        start=gap_start,
-        end=gap_end,
-        reason="All data sources failed",
-    )
-    return False
-
-
-def save_to_db(df: pd.DataFrame, stock: object, PriceModel: Type[BasePrice]):
-    # Standardize column names (yFinance)
-    df.rename(
-        columns={
-            "Open": "open",
-            "High": "high",
-            "Low": "low",
-            "Close": "close",
-            "Volume": "volume",
-        },
-        inplace=True,
-        errors="ignore",
-    )
+    return None, reason
+
+
+def store_gap(
+    stock: object,
+    timeframe: str,
+    gap_start: datetime,
+    gap_end: datetime,
+    PriceModel: Type[BasePrice],
+    downloaded: tuple[pd.DataFrame | None, str],
+) -> "GapOutcome":
+    """
+    Save a downloaded gap, or mark it as unobtainable if nothing was found.
+    """
+    data, source = downloaded
+    if data is None:
+        # If all sources failed, skip the gap until it is worth retrying
+        unobtainable.record_unobtainable(stock, timeframe, gap_start, gap_end, source)
+        return GapOutcome(gap_start, gap_end, "unobtainable")
+
+    result = save_to_db(data, stock, PriceModel, fetched_range=(gap_start, gap_end))
+    if result is None:
+        return GapOutcome(gap_start, gap_end, "save_failed", source)
+    return GapOutcome(gap_start, gap_end, "fetched", source, result.inserted)
+
+
+def save_to_db(
+    df: pd.DataFrame,
+    stock: object,
+    PriceModel: Type[BasePrice],
+    chunk_size: int = INGEST_CHUNK_SIZE,
+    fetched_range: tuple[datetime, datetime] | None = None,
+) -> IngestResult | None:
+    """
+    Store provider bars column-wise in chunked bulk inserts.
+
+    `fetched_range` is the (start, end) range the frame was fetched for, the
+    parts of it the bars fill are recorded as covered in the same
+    transaction (see record_fetched_coverage).
+
+    Returns the inserted/skipped row counts, or None if the write failed.
+    """
     try:
-        records = [
-            PriceModel(stock=stock, timestamp=index.to_pydatetime(), **row.to_dict())
-            for index, row in df.iterrows()
-        ]
-        PriceModel.objects.bulk_create(records, ignore_conflicts=True)
-        logger.info(f"Successfully stored {stock.symbol}")
-        return True
+        timestamps, values, invalid, duplicates = frame_to_columns(df)
+        with transaction.atomic():
+            inserted = insert_sequenced_bars(
+                stock, PriceModel, timestamps, values, chunk_size
+            )
+            if fetched_range:
+                record_fetched_coverage(stock, PriceModel, timestamps, *fetched_range)
+            if inserted:
+                notify_bars_saved(stock, PriceModel, timestamps, inserted)
+        result = IngestResult(
+            inserted=inserted,
+            skipped=duplicates + len(timestamps) - inserted,
+            invalid=invalid,
+        )
+        logger.info(
+            f"Successfully stored {stock.symbol}: {result.inserted} inserted, "
+            f"{result.skipped} duplicates skipped, {result.invalid} invalid"
+        )
+        return result
     except Exception as e:
         logger.error(f"Failed to save data for {stock.symbol}: {e}")
-        return False
+        return None
+
+
+def record_fetched_coverage(
+    stock: object,
+    PriceModel: Type[BasePrice],
+    timestamps: np.ndarray,
+    start: datetime,
+    end: datetime,
+):
+    """
+    Record as covered the runs of expected bars of [start, end] that the
+    fetched bars fill. Bars a truncated or partial answer left out stay
+    uncovered, so they are fetched again.
+    """
+    if not len(timestamps):
+        return
+    timeframe = get_timeframe_name(PriceModel)
+    step = pd.Timedelta(get_timeframe(timeframe, "delta")).value
+    range_start, range_end = coverage.to_ns([start, end])
+
+    expected = sessions.expected_bar_timestamps(stock.exchange, timeframe, start, end)
+    if expected is None or not len(expected):
+        # Without a calendar only the span of the bars is known, the last
+        # one lasts until 1 us (DB resolution) before the next would open
+        first = max(range_start, int(timestamps[0]))
+        last = min(range_end, int(timestamps[-1]) + step - 1000)
+        if first <= last:
+            coverage.record_coverage(
+                stock,
+                timeframe,
+                coverage.to_datetime(first),
+                coverage.to_datetime(last),
+            )
+        return
+
+    expected = expected[(expected >= range_start) & (expected <= range_end)]
+    filled = np.flatnonzero(gaps.filled_slots(expected, timestamps, step))
+    for run_start, run_end in gaps.split_runs(filled):
+        coverage.record_coverage(
+            stock,
+            timeframe,
+            coverage.to_datetime(expected[run_start]),
+            coverage.to_datetime(expected[run_end]),
+        )
+
+
+def insert_sequenced_bars(
+    stock: object,
+    PriceModel: Type[BasePrice],
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    chunk_size: int = INGEST_CHUNK_SIZE,
+) -> int:
+    """
+    Insert bars stamped with the next version of their series. The version
+    is only kept if a bar was inserted. Must run inside a transaction.
+
+    Returns the number of rows inserted.
+    """
+    savepoint = transaction.savepoint()
+    # The bump locks the series row until commit, so versions of a series
+    # become visible in order
+    seq = bump_series_version(stock, get_timeframe_name(PriceModel))
+    inserted = bulk_insert_bars(
+        PriceModel, stock.pk, timestamps, values, chunk_size, seq=seq
+    )
+    if inserted:
+        transaction.savepoint_commit(savepoint)
+    else:
+        transaction.savepoint_rollback(savepoint)
+    return inserted
+
+
+def bump_series_version(stock: object, timeframe: str) -> int:
+    """
+    Increment the write counter of a series, creating it on first write.
+
+    Returns the new version.
+    """
+    updated = SeriesState.objects.filter(stock=stock, timeframe=timeframe).update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        state, created = SeriesState.objects.get_or_create(
+            stock=stock, timeframe=timeframe, defaults={"version": 1}
+        )
+        if not created:
+            # Created by a concurrent writer in between
+            return bump_series_version(stock, timeframe)
+    return (
+        SeriesState.objects.filter(stock=stock, timeframe=timeframe)
+        .values_list("version", flat=True)
+        .get()
+    )
+
+
+def notify_bars_saved(
+    stock: object,
+    PriceModel: Type[BasePrice],
+    timestamps: np.ndarray,
+    inserted: int,
+):
+    """
+    Send bars_saved once the current transaction commits.
+    """
+    start = coverage.to_datetime(int(timestamps[0]))
+    end = coverage.to_datetime(int(timestamps[-1]))
+    transaction.on_commit(
+        lambda: bars_saved.send(
+            sender=PriceModel,
+            stock=stock,
+            timeframe=get_timeframe_name(PriceModel),
+            start=start,
+            end=end,
+            inserted=inserted,
+        )
+    )
+
+
+def get_timeframe_name(PriceModel: Type[BasePrice]) -> str:
+    """
+    Get the timeframe stored by a Django model.
+    """
+    for timeframe, config in TIMEFRAME_CONFIG.items():
+        if config["model"] is PriceModel:
+            return timeframe
+    raise ValueError(f"No timeframe stored in '{PriceModel.__name__}'")
 
 
 def get_timeframe(timeframe: str, type: str):
@@ -274,80 +1073,80 @@ def is_all_bars_available(
     start: datetime,
     end: datetime,
     PriceModel: Type[BasePrice],
+    exchange: str | None = None,
 ) -> bool:
     """
     Ensures all data bars are available in the database according to
     the exchange's calendar.
     """
-    expected_bars = get_expected_bars(symbol, timeframe, start, end)
-    if expected_bars == -1:
+    if exchange is None:
+        exchange = get_exchange_from_db(symbol)
+    if TIMEFRAME_CONFIG[timeframe.lower()].get("source") == "1d":
+        return is_month_range_available(symbol, start, end, PriceModel, exchange)
+
+    expected = sessions.expected_bar_timestamps(exchange, timeframe, start, end)
+    if expected is None or not len(expected):
+        logger.warning(f"Calendar validation failed for {symbol} {timeframe}")
         return False
 
-    actual_bars = PriceModel.objects.filter(
-        stock__symbol__iexact=symbol,
-        timestamp__gte=start,
-        timestamp__lte=end,
-    ).count()
+    first, last = coverage.to_datetime(expected[0]), coverage.to_datetime(expected[-1])
+    if coverage.is_range_covered(symbol, timeframe, first, last):
+        return True
 
-    return actual_bars >= expected_bars
+    # The range may still be covered by several intervals
+    starts, ends = coverage.get_coverage(symbol, timeframe, first, last)
+    return bool(intervals.contains(starts, ends, expected).all())
 
 
 def get_expected_bars(
-    symbol: str, timeframe: str, start: datetime, end: datetime
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    exchange: str | None = None,
 ) -> int:
     """
     Gets the expected bars in a specific timeframe given an exchange's calendar.
     """
-    try:
-        db_exchange = get_exchange_from_db(symbol)
-        if not db_exchange:
-            logger.debug(f"No exchange found in DB for {symbol}, using NYSE")
-            raise KeyError  # Get fallback exchange
-        exchange = mcal.get_calendar(db_exchange)
-    except KeyError:
-        exchange = mcal.get_calendar("NYSE")
+    if exchange is None:
+        exchange = get_exchange_from_db(symbol)
 
-    schedule = exchange.schedule(start_date=start, end_date=end)
-
-    if schedule.empty:
+    timestamps = sessions.expected_bar_timestamps(exchange, timeframe, start, end)
+    if timestamps is None:
+        logger.warning(f"Calendar validation failed for {symbol} {timeframe}")
+        return -1  # Skip calendar validation
+    if not len(timestamps):
         logger.warning(f"Empty schedule for {symbol} from {start} to {end}")
         return -1  # Skip calendar validation
 
-    try:
-        total_bars = len(mcal.date_range(schedule, frequency=timeframe))
-        logger.info(f"Expected {total_bars} bars for {symbol} {timeframe}")
-        return total_bars
-    except (KeyError, ValueError) as e:
-        logger.warning(f"Calendar validation failed for {symbol} {timeframe}: {e}")
-        return -1  # Skip calendar validation
+    total_bars = len(timestamps)
+    logger.info(f"Expected {total_bars} bars for {symbol} {timeframe}")
+    return total_bars
 
 
 def get_exchange_from_db(symbol: str):
     """
     Gets the Exchange metadata from the DB.
     """
-    stock = Stock.objects.filter(symbol__iexact=symbol).only("exchange").first()
-    return stock.exchange if stock else None
+    info = registry.resolve(symbol)
+    return info.exchange if info else None
 
 
 def get_expected_bar_timestamps(
-    symbol: str, timeframe: str, start: datetime, end: datetime
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    exchange: str | None = None,
 ) -> list:
     """
     Returns a list of expected trading timestamps for the given symbol, timeframe, and date range.
     Uses market calendar to respect trading hours and holidays.
     """
-    try:
-        db_exchange = get_exchange_from_db(symbol)
-        exchange = mcal.get_calendar(db_exchange)
-    except Exception:
-        exchange = mcal.get_calendar("NYSE")
+    if exchange is None:
+        exchange = get_exchange_from_db(symbol)
 
-    # Get market schedule for the date range
-    schedule = exchange.schedule(start_date=start, end_date=end)
-
-    try:
-        total_bars = mcal.date_range(schedule, frequency=timeframe)
-        return [bar.to_pydatetime() for bar in total_bars]
-    except KeyError:
+    timestamps = sessions.expected_bar_timestamps(exchange, timeframe, start, end)
+    if timestamps is None:
         return []
+    return pd.to_datetime(timestamps, unit="ns", utc=True).to_pydatetime().tolist()
@@ -0,0 +1,203 @@
+import logging
+from datetime import date, datetime
+from functools import lru_cache
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+import pandas_market_calendars as mcal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCHANGE = "NYSE"
+
+# Calendars are cheap to keep but slow to build
+CALENDAR_CACHE_SIZE = 32
+
+# One block holds a year of sessions and bars for an (exchange, timeframe)
+SESSION_CACHE_SIZE = 256
+
+# Furthest back warmup_start searches for bars
+WARMUP_MAX_LOOKBACK = pd.Timedelta(days=5 * 366)
+
+
+class SessionBlock(NamedTuple):
+    """
+    A year of trading sessions and their bar timestamps.
+
+    All arrays hold int64 ns values, `sessions` are naive session dates and
+    the rest are UTC. Bars of session `i` are `bars[offsets[i]:offsets[i + 1]]`.
+    """
+
+    sessions: np.ndarray
+    opens: np.ndarray
+    closes: np.ndarray
+    offsets: np.ndarray
+    bars: np.ndarray
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def get_calendar(exchange: str | None):
+    """
+    Get the market calendar of an exchange, falling back to NYSE.
+    """
+    if exchange:
+        try:
+            return mcal.get_calendar(exchange)
+        except Exception:
+            logger.debug(f"Unknown calendar '{exchange}', using {DEFAULT_EXCHANGE}")
+    return mcal.get_calendar(DEFAULT_EXCHANGE)
+
+
+@lru_cache(maxsize=SESSION_CACHE_SIZE)
+def get_session_block(exchange: str | None, timeframe: str, year: int):
+    """
+    Compute the sessions and expected bars of a calendar year.
+
+    Returns a SessionBlock, or None if the calendar has no bars for the
+    timeframe.
+    """
+    calendar = get_calendar(exchange)
+    schedule = calendar.schedule(start_date=date(year, 1, 1), end_date=date(year, 12, 31))
+    try:
+        bars = mcal.date_range(schedule, frequency=timeframe)
+    except (KeyError, ValueError) as e:
+        logger.warning(f"Calendar bars unavailable for {exchange} {timeframe}: {e}")
+        return None
+
+    closes = _to_ns(schedule["market_close"])
+    bars = _to_ns(bars)
+    # Bars close within (open, close], so each belongs to the first close >= it
+    session_of_bar = np.searchsorted(closes, bars, side="left")
+    offsets = np.searchsorted(session_of_bar, np.arange(len(closes) + 1), side="left")
+
+    return SessionBlock(
+        sessions=_to_ns(schedule.index),
+        opens=_to_ns(schedule["market_open"]),
+        closes=closes,
+        offsets=offsets,
+        bars=bars,
+    )
+
+
+def expected_bar_timestamps(
+    exchange: str | None, timeframe: str, start: datetime, end: datetime
+) -> np.ndarray | None:
+    """
+    Slice the expected bars of every session from `start` to `end` (inclusive
+    session dates) out of the cached year blocks.
+
+    Returns sorted UTC int64 ns timestamps, or None if the calendar can't
+    produce bars for the timeframe.
+    """
+    first, last = session_date(start), session_date(end)
+    if first > last:
+        return np.empty(0, dtype=np.int64)
+
+    parts = []
+    for year in range(first.year, last.year + 1):
+        block = get_session_block(exchange, timeframe, year)
+        if block is None:
+            return None
+        lo = np.searchsorted(block.sessions, first.value, side="left")
+        hi = np.searchsorted(block.sessions, last.value, side="right")
+        parts.append(block.bars[block.offsets[lo] : block.offsets[hi]])
+
+    return np.concatenate(parts)
+
+
+def session_table(
+    exchange: str | None, start: datetime, end: datetime
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the sessions from `start` to `end` (inclusive session dates).
+
+    Returns (naive session dates, opens, closes) as int64 ns, the bounds
+    in UTC.
+    """
+    first, last = session_date(start), session_date(end)
+    columns = [[np.empty(0, dtype=np.int64)] for _ in range(3)]
+    for year in range(first.year, last.year + 1):
+        # Daily bars always exist, their blocks carry the session bounds
+        block = get_session_block(exchange, "1D", year)
+        lo = np.searchsorted(block.sessions, first.value, side="left")
+        hi = np.searchsorted(block.sessions, last.value, side="right")
+        for column, values in zip(columns, block[:3]):
+            column.append(values[lo:hi])
+
+    dates, opens, closes = (np.concatenate(column) for column in columns)
+    return dates, opens, closes
+
+
+def session_bounds(
+    exchange: str | None, start: datetime, end: datetime
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the sessions from `start` to `end` (inclusive session dates).
+
+    Returns (opens, closes) as UTC int64 ns.
+    """
+    _, opens, closes = session_table(exchange, start, end)
+    return opens, closes
+
+
+def local_date(exchange: str | None, value: datetime) -> date:
+    """
+    Get the exchange-local date of an aware datetime.
+    """
+    return pd.Timestamp(value).tz_convert(get_calendar(exchange).tz).date()
+
+
+def local_midnight(exchange: str | None, day) -> int:
+    """
+    Get the start of a date in the exchange's time zone as UTC int64 ns.
+    """
+    midnight = session_date(day).tz_localize(get_calendar(exchange).tz)
+    return midnight.tz_convert("UTC").value
+
+
+def warmup_start(
+    exchange: str | None, timeframe: str, start: datetime, bars: int
+) -> pd.Timestamp | None:
+    """
+    Find the session date `bars` expected bars before `start`.
+
+    Returns the session date, None if the calendar has no bars for the
+    timeframe.
+    """
+    first = session_date(start)
+    lookback = pd.Timedelta(days=7)
+    while bars > 0 and lookback <= WARMUP_MAX_LOOKBACK:
+        expected = expected_bar_timestamps(
+            exchange, timeframe, first - lookback, first - pd.Timedelta(days=1)
+        )
+        if expected is None:
+            return None
+        if len(expected) >= bars:
+            return session_date(pd.Timestamp(expected[-bars], unit="ns"))
+        lookback *= 2
+    return first
+
+
+def session_date(value: date | datetime) -> pd.Timestamp:
+    """
+    Normalize a date or datetime to a naive session date.
+    """
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.normalize().as_unit("ns")
+
+
+def clear_session_cache():
+    """
+    Drop every cached calendar and session block.
+    """
+    get_session_block.cache_clear()
+    get_calendar.cache_clear()
+
+
+def _to_ns(values) -> np.ndarray:
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8
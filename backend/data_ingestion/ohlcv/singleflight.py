@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from market_data.models import FetchLock
+
+logger = logging.getLogger(__name__)
+
+# Lock rows older than this are considered abandoned and taken over
+LOCK_TTL = timedelta(minutes=2)
+# Seconds a follower waits for the leader before giving up
+WAIT_TIMEOUT = 60
+POLL_INTERVAL = 0.25
+
+_lock = threading.Lock()
+_flights = {}
+
+
+class Flight:
+    """
+    An in-flight fetch that followers can wait on.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.result = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: float = WAIT_TIMEOUT):
+        """
+        Wait for the leader to land the flight.
+
+        Returns the leader's result, raises TimeoutError if it didn't land.
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for {self.key}")
+        return self.result
+
+
+def gap_key(symbol: str, timeframe: str, start: datetime, end: datetime) -> str:
+    return f"{symbol.upper()}:{timeframe.lower()}:{start.isoformat()}:{end.isoformat()}"
+
+
+def join(key: str) -> tuple[Flight, bool]:
+    """
+    Join the flight of `key` in this process, starting it if there is none.
+
+    Returns (flight, true if the caller is the leader).
+    """
+    with _lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = Flight(key)
+        return flight, True
+
+
+def land(flight: Flight, result=None):
+    """
+    Publish the leader's result and wake the followers.
+    """
+    with _lock:
+        _flights.pop(flight.key, None)
+    flight.result = result
+    flight._done.set()
+
+
+def try_lock(key: str) -> bool:
+    """
+    Take the cross-process lock of `key` without blocking: an advisory
+    lock on PostgreSQL, a FetchLock row elsewhere.
+
+    Returns true if the lock was taken.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [_lock_id(key)])
+            return bool(cursor.fetchone()[0])
+
+    now = timezone.now()
+    FetchLock.objects.filter(key=key, expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            FetchLock.objects.create(key=key, owner=_owner(), expires_at=now + LOCK_TTL)
+        return True
+    except IntegrityError:
+        return False
+
+
+def unlock(key: str):
+    """
+    Release a lock taken with try_lock.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [_lock_id(key)])
+        return
+    FetchLock.objects.filter(key=key, owner=_owner()).delete()
+
+
+def wait_unlocked(keys: list[str], timeout: float = WAIT_TIMEOUT) -> set[str]:
+    """
+    Wait until no process holds the locks of `keys`, polling them together
+    so the wait is bounded by a single `timeout`.
+
+    Returns the keys released in time.
+    """
+    deadline = time.monotonic() + timeout
+    pending, released = list(keys), set()
+    while True:
+        for key in list(pending):
+            if try_lock(key):
+                unlock(key)
+                released.add(key)
+                pending.remove(key)
+        if not pending:
+            return released
+        if time.monotonic() >= deadline:
+            logger.warning(f"Timed out waiting for locks {pending}")
+            return released
+        time.sleep(POLL_INTERVAL)
+
+
+def _lock_id(key: str) -> int:
+    # Advisory locks take a signed 64-bit key
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from market_data.models import UnobtainableRange
+from data_ingestion.ohlcv.coverage import to_datetime, to_ns
+from data_ingestion.ohlcv.intervals import contains
+
+logger = logging.getLogger(__name__)
+
+# How long a range is skipped before it is fetched again, by reason
+RETRY_AFTER = {
+    UnobtainableRange.NO_DATA: timedelta(days=7),
+    UnobtainableRange.ERROR: timedelta(minutes=15),
+}
+# Empty answers for bars this recent may just be provider lag
+RECENT_WINDOW = timedelta(days=2)
+# Seconds a loaded index is trusted, bounds staleness from other processes'
+# writes since the invalidation only reaches this one
+INDEX_TTL = 60
+# DB datetimes hold microseconds, ranges this many ns apart touch
+TICK = 1000
+
+_lock = threading.Lock()
+# {(stock_id, timeframe): (starts, ends, retry_after, loaded_at)}, UTC int64 ns
+_index: dict[tuple[int, str], tuple[np.ndarray, np.ndarray, np.ndarray, float]] = {}
+
+
+def retry_after(reason: str, end: datetime, now: datetime) -> datetime:
+    """
+    Get when a range failed for `reason` should be fetched again.
+    """
+    if reason == UnobtainableRange.NO_DATA and now - end < RECENT_WINDOW:
+        reason = UnobtainableRange.ERROR
+    return now + RETRY_AFTER.get(reason, RETRY_AFTER[UnobtainableRange.ERROR])
+
+
+def record_unobtainable(
+    stock: object, timeframe: str, start: datetime, end: datetime, reason: str
+):
+    """
+    Mark [start, end] as unobtainable. Live ranges of the same reason it
+    overlaps or touches are merged into it, the parts of other ranges it
+    overlaps are replaced. Expired ranges it meets are dropped.
+    """
+    timeframe = timeframe.lower()
+    start_ns, end_ns = (int(value) for value in to_ns([start, end]))
+    now = timezone.now()
+    retry = retry_after(reason, to_datetime(end_ns), now)
+
+    with transaction.atomic():
+        nearby = list(
+            UnobtainableRange.objects.select_for_update().filter(
+                stock=stock,
+                timeframe=timeframe,
+                start__lte=to_datetime(end_ns + TICK),
+                end__gte=to_datetime(start_ns - TICK),
+            )
+        )
+        merged_start, merged_end = start_ns, end_ns
+        pieces = []
+        for interval in nearby:
+            interval_start, interval_end = (
+                int(value) for value in to_ns([interval.start, interval.end])
+            )
+            if interval.retry_after <= now:
+                continue
+            if interval.reason == reason:
+                merged_start = min(merged_start, interval_start)
+                merged_end = max(merged_end, interval_end)
+                # The sooner retry, no part is skipped past its own
+                retry = min(retry, interval.retry_after)
+                continue
+            # Keep what sticks out of the new range
+            if interval_start < start_ns:
+                pieces.append((interval, interval_start, start_ns - TICK))
+            if interval_end > end_ns:
+                pieces.append((interval, end_ns + TICK, interval_end))
+
+        UnobtainableRange.objects.filter(
+            pk__in=[interval.pk for interval in nearby]
+        ).delete()
+        UnobtainableRange.objects.bulk_create(
+            [
+                UnobtainableRange(
+                    stock=stock,
+                    timeframe=timeframe,
+                    start=to_datetime(piece_start),
+                    end=to_datetime(piece_end),
+                    reason=interval.reason,
+                    retry_after=interval.retry_after,
+                )
+                for interval, piece_start, piece_end in pieces
+            ]
+            + [
+                UnobtainableRange(
+                    stock=stock,
+                    timeframe=timeframe,
+                    start=to_datetime(merged_start),
+                    end=to_datetime(merged_end),
+                    reason=reason,
+                    retry_after=retry,
+                )
+            ]
+        )
+    invalidate(stock.pk, timeframe)
+    logger.info(
+        f"Unobtainable {stock.symbol} {timeframe}: {to_datetime(merged_start)} - "
+        f"{to_datetime(merged_end)} ({reason}) until {retry}"
+    )
+
+
+def get_unobtainable(stock_id: int, timeframe: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the live unobtainable ranges of a series from memory, loading them in
+    one query when missing or older than INDEX_TTL. Expired ranges drop out
+    without a reload, so they are retried on time.
+
+    Returns sorted, non-overlapping (starts, ends) arrays of UTC int64 ns.
+    """
+    key = (stock_id, timeframe.lower())
+    clock = time.monotonic()
+    with _lock:
+        entry = _index.get(key)
+    if entry is None or clock - entry[3] >= INDEX_TTL:
+        rows = list(
+            UnobtainableRange.objects.filter(
+                stock_id=stock_id,
+                timeframe=key[1],
+                retry_after__gt=timezone.now(),
+            )
+            .order_by("start")
+            .values_list("start", "end", "retry_after")
+        )
+        if rows:
+            starts, ends, retries = (to_ns(column) for column in zip(*rows))
+        else:
+            starts = ends = retries = np.empty(0, dtype=np.int64)
+        entry = (starts, ends, retries, clock)
+        with _lock:
+            _index[key] = entry
+
+    starts, ends, retries, _ = entry
+    live = retries > to_ns([timezone.now()])[0]
+    return starts[live], ends[live]
+
+
+def is_unobtainable(stock_id: int, timeframe: str, points: np.ndarray) -> np.ndarray:
+    """
+    Check which UTC int64 ns timestamps fall in a live unobtainable range.
+
+    Returns a boolean mask aligned with `points`.
+    """
+    return contains(*get_unobtainable(stock_id, timeframe), points)
+
+
+def invalidate(stock_id: int | None = None, timeframe: str | None = None):
+    """
+    Drop the loaded ranges of a series, or of every series.
+    """
+    with _lock:
+        if stock_id is None:
+            _index.clear()
+        else:
+            _index.pop((stock_id, timeframe.lower()), None)
+
+
+def range_changed(sender, instance, **kwargs):
+    """
+    post_save / post_delete receiver of UnobtainableRange.
+    """
+    invalidate(instance.stock_id, instance.timeframe)
@@ -0,0 +1,99 @@
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from alpaca.data.historical import StockHistoricalDataClient
+from .credentials import get_api_credentials
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) seconds
+HTTP_TIMEOUT = (3.05, 20)
+# Connections kept alive per host, enough for the concurrent gap fetches
+HTTP_POOL_SIZE = 16
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.RLock()
+_sessions = {}
+_clients = {}
+
+
+class TimeoutSession(requests.Session):
+    """
+    A requests Session with a default timeout on every request.
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_http_session(
+    timeout=HTTP_TIMEOUT,
+    retries: int = HTTP_RETRIES,
+    pool_size: int = HTTP_POOL_SIZE,
+) -> TimeoutSession:
+    """
+    Build a pooled keep-alive session that retries with exponential backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = TimeoutSession(timeout)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session(name: str) -> requests.Session:
+    """
+    Get the long-lived HTTP session of a provider.
+    """
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = _sessions[name] = build_http_session()
+            logger.debug(f"Created HTTP session for {name}")
+        return session
+
+
+def get_alpaca_client() -> StockHistoricalDataClient:
+    """
+    Get the shared Alpaca historical data client.
+    """
+    with _lock:
+        client = _clients.get("alpaca")
+        if client is None:
+            credentials = get_api_credentials()
+            client = StockHistoricalDataClient(
+                credentials["alpaca_key"], credentials["alpaca_secret"]
+            )
+            # alpaca-py has no timeouts or pool options, route it through ours
+            if hasattr(client, "_session"):
+                client._session = get_http_session("alpaca")
+            _clients["alpaca"] = client
+        return client
+
+
+def close_providers():
+    """
+    Close every pooled session and drop the cached clients.
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _clients.clear()
@@ -0,0 +1,62 @@
+import datetime
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import Stock, StockPrice5Min
+
+
+class PriceCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(
+            make_frame(["2025-01-02 09:30", "2025-01-02 09:35"]),
+            self.stock,
+            StockPrice5Min,
+        )
+
+    @patch("api.views.ensure_data", return_value=True)
+    def test_repeated_query_is_cached(self, ensure_data):
+        client = APIClient()
+        url = "/data/get-ticker/spy/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+
+        first = client.get(url)
+        second = client.get(url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json()), 2)
+        self.assertEqual(first.json(), second.json())
+        ensure_data.assert_called_once()
+
+    def cache_page(self, timeframe, day):
+        key = cache.response_key("SPY", timeframe, day, day, 100)
+        version = cache.series_version("SPY", timeframe)
+        cache.set_response(key, version, day, [])
+        return key
+
+    def cached(self, key, timeframe):
+        return cache.get_response(key, cache.series_version("SPY", timeframe))
+
+    def test_ingest_retires_series_responses(self):
+        day = datetime.date(2025, 1, 2)
+        same_day = self.cache_page("5min", day)
+        other_day = self.cache_page("5min", day.replace(day=10))
+        other_timeframe = self.cache_page("1h", day)
+
+        save_to_db(make_frame(["2025-01-02 09:40"]), self.stock, StockPrice5Min)
+
+        # Seen by every process, the version lives in the DB
+        self.assertIsNone(self.cached(same_day, "5min"))
+        self.assertIsNone(self.cached(other_day, "5min"))
+        self.assertEqual(self.cached(other_timeframe, "1h"), [])
+
+    def test_duplicate_ingest_keeps_cache(self):
+        key = self.cache_page("5min", datetime.date(2025, 1, 2))
+
+        save_to_db(make_frame(["2025-01-02 09:30"]), self.stock, StockPrice5Min)
+
+        self.assertEqual(self.cached(key, "5min"), [])
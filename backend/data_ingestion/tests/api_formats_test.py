@@ -0,0 +1,78 @@
+import io
+import numpy as np
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data import codec
+from market_data.models import Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+
+
+@patch("api.views.ensure_data", return_value=True)
+class PriceFormatTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(
+            make_frame(["2025-01-02 09:30", "2025-01-02 09:35"]), stock, StockPrice5Min
+        )
+        self.client = APIClient()
+
+    def test_records(self, ensure_data):
+        response = self.client.get(URL)
+        self.assertEqual(
+            response.json()[0],
+            {
+                "timestamp": "2025-01-02T14:30:00Z",
+                "open": 100.0,
+                "high": 101.0,
+                "low": 99.0,
+                "close": 100.5,
+                "volume": 1000,
+            },
+        )
+
+    def test_columns(self, ensure_data):
+        response = self.client.get(URL + "&format=columns")
+        data = response.json()
+        self.assertEqual(
+            data["timestamp"], ["2025-01-02T14:30:00Z", "2025-01-02T14:35:00Z"]
+        )
+        self.assertEqual(data["volume"], [1000, 1010])
+
+    def test_csv(self, ensure_data):
+        response = self.client.get(URL, HTTP_ACCEPT="text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "timestamp,open,high,low,close,volume")
+        self.assertEqual(lines[1], "2025-01-02T14:30:00Z,100.0,101.0,99.0,100.5,1000")
+        self.assertEqual(len(lines), 3)
+
+    def test_npy(self, ensure_data):
+        response = self.client.get(URL, HTTP_ACCEPT="application/x-npy")
+        array = np.load(io.BytesIO(response.content))
+        self.assertEqual(array.dtype.names[0], "timestamp")
+        self.assertEqual(array["timestamp"][0], np.datetime64("2025-01-02T14:30", "ns"))
+        self.assertEqual(array["close"].tolist(), [100.5, 101.5])
+
+    def test_bars(self, ensure_data):
+        response = self.client.get(URL, HTTP_ACCEPT="application/x-bars")
+        self.assertEqual(response["Content-Type"], "application/x-bars")
+        timestamps, values = codec.decode(response.content)
+        self.assertEqual(
+            timestamps[0], np.datetime64("2025-01-02T14:30", "ns").astype(np.int64)
+        )
+        self.assertEqual(values[:, 3].tolist(), [100.5, 101.5])
+        self.assertEqual(values[:, 4].tolist(), [1000, 1010])
+
+    def test_errors_stay_json(self, ensure_data):
+        response = self.client.get(
+            URL.replace("start=2025-01-02", "start=bad") + "&format=npy"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("error", response.json())
@@ -0,0 +1,62 @@
+import json
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+TIMESTAMPS = [f"2025-01-02 09:{minute}" for minute in (30, 35, 40, 45, 50)]
+
+
+@patch("api.views.ensure_data", return_value=True)
+class PricePaginationTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(make_frame(TIMESTAMPS), stock, StockPrice5Min)
+        self.client = APIClient()
+
+    def test_cursor_walks_every_page(self, ensure_data):
+        url, seen, pages = URL + "&limit=2", [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [bar["timestamp"] for bar in response.json()]
+            pages += 1
+            cursor = response.get("X-Next-Cursor")
+            if cursor:
+                self.assertIn(f"cursor={cursor}", response["Link"])
+            url = cursor and URL + f"&limit=2&cursor={cursor}"
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(set(seen)))
+
+    def test_last_page_has_no_cursor(self, ensure_data):
+        response = self.client.get(URL + "&limit=5")
+        self.assertNotIn("X-Next-Cursor", response)
+        self.assertNotIn("Link", response)
+
+    def test_invalid_cursor(self, ensure_data):
+        response = self.client.get(URL + "&cursor=nope")
+        self.assertEqual(response.status_code, 400)
+
+    def test_stream_ignores_limit(self, ensure_data):
+        response = self.client.get(URL + "&limit=1&stream=true")
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(body.count("timestamp"), 5)
+
+        response = self.client.get(URL + "&stream=1&format=csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+
+    def test_stream_json_is_valid(self, ensure_data):
+        response = self.client.get(
+            URL.replace("start=2025-01-02", "start=2025-01-03") + "&stream=1"
+        )
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
@@ -0,0 +1,95 @@
+import threading
+import uuid
+from unittest.mock import AsyncMock, patch
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase
+from api import cache
+from data_ingestion.ohlcv import services
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import FetchJob, Stock, StockPrice5Min
+
+URL = "/data/async/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+
+
+@patch("api.views.aensure_data", new_callable=AsyncMock, return_value=True)
+class AsyncPriceViewTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        services.save_to_db(
+            make_frame(["2025-01-02 09:30", "2025-01-02 09:35", "2025-01-02 09:40"]),
+            stock,
+            StockPrice5Min,
+        )
+
+    async def test_pages(self, aensure_data):
+        response = await self.async_client.get(URL + "&limit=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        self.assertIn("X-Next-Cursor", response)
+
+        cursor = response["X-Next-Cursor"]
+        response = await self.async_client.get(URL + f"&limit=2&cursor={cursor}")
+        self.assertEqual(
+            [bar["timestamp"] for bar in response.json()], ["2025-01-02T14:40:00Z"]
+        )
+        self.assertNotIn("X-Next-Cursor", response)
+
+    async def test_cached(self, aensure_data):
+        await self.async_client.get(URL + "&format=columns")
+        response = await self.async_client.get(URL + "&format=columns")
+        self.assertEqual(len(response.json()["close"]), 3)
+        aensure_data.assert_awaited_once()
+
+    async def test_delta_poll(self, aensure_data):
+        response = await self.async_client.get(URL + "&since=0")
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(response["X-Seq"], "1")
+        response = await self.async_client.get(URL + "&since=1&format=columns")
+        self.assertEqual(response.json()["close"], [])
+
+    @patch("api.views.jobs.submit")
+    async def test_partial_answer(self, submit, aensure_data):
+        submit.return_value = job = FetchJob(pk=uuid.uuid4())
+        # Only the first bars of the session are stored
+        response = await self.async_client.get(URL + "&wait=false")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(response["X-Fetch-Job"], str(job.pk))
+        self.assertTrue(response["Location"].endswith(f"/{job.pk}/"))
+        aensure_data.assert_not_awaited()
+
+    async def test_validation(self, aensure_data):
+        response = await self.async_client.get(URL + "&limit=abc")
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(URL)
+        self.assertEqual(response.status_code, 405)
+
+
+class AsyncEnsureDataTestCase(SimpleTestCase):
+
+    @patch.object(services, "get_exchange_from_db", return_value="NYSE")
+    @patch.object(services, "is_all_bars_available", return_value=True)
+    @patch.object(services, "ensure_data")
+    def test_available_data_skips_the_pool(self, ensure_data, available, exchange):
+        ready = async_to_sync(services.aensure_data)(
+            "SPY", "5min", "2025-01-02", "2025-01-03", 100
+        )
+        self.assertTrue(ready)
+        ensure_data.assert_not_called()
+
+    @patch.object(services, "get_exchange_from_db", return_value="NYSE")
+    @patch.object(services, "is_all_bars_available", return_value=False)
+    @patch.object(services, "ensure_data")
+    def test_cold_fetch_runs_in_the_pool(self, ensure_data, available, exchange):
+        threads = []
+        ensure_data.side_effect = (
+            lambda *args: threads.append(threading.current_thread().name) or True
+        )
+
+        ready = async_to_sync(services.aensure_data)(
+            "SPY", "5min", "2025-01-02", "2025-01-03", 100
+        )
+        self.assertTrue(ready)
+        self.assertTrue(threads[0].startswith("ohlcv-fetch"))
@@ -0,0 +1,84 @@
+import datetime
+import shutil
+import tempfile
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data import barcache, tiers
+from market_data.models import Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-04"
+
+
+class BarCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.storage = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage)
+        settings = override_settings(BAR_CACHE_DIR=self.storage)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        tiers.clear()
+        barcache.clear()
+        cache.get_cache().clear()
+
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(
+            make_frame(["2025-01-02 09:30", "2025-01-02 09:35", "2025-01-03 09:30"]),
+            self.stock,
+            StockPrice5Min,
+        )
+        self.path = barcache.series_path(StockPrice5Min, self.stock.pk)
+
+    def test_series_is_cached_after_repeated_reads(self):
+        for _ in range(barcache.MIN_READS - 1):
+            self.assertIsNone(barcache.read(StockPrice5Min, self.stock.pk))
+        self.assertFalse(self.path.exists())
+
+        bars = barcache.read(
+            StockPrice5Min, self.stock.pk, timestamp__gte=datetime.date(2025, 1, 3)
+        )
+        self.assertTrue(self.path.exists())
+        self.assertEqual(len(bars), 1)
+        self.assertEqual(bars[0]["close"], 102.5)
+        self.assertEqual(len(barcache.load(StockPrice5Min, self.stock.pk)), 3)
+
+    def test_new_bars_are_appended(self):
+        barcache.build(StockPrice5Min, self.stock.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            save_to_db(
+                make_frame(["2025-01-03 09:30", "2025-01-03 09:35"]),
+                self.stock,
+                StockPrice5Min,
+            )
+        self.assertEqual(len(barcache.load(StockPrice5Min, self.stock.pk)), 4)
+        self.assertEqual(self.path.stat().st_size, 4 * barcache.BAR_DTYPE.itemsize)
+
+    def test_backfilled_bars_drop_the_series(self):
+        barcache.build(StockPrice5Min, self.stock.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            save_to_db(make_frame(["2025-01-02 09:40"]), self.stock, StockPrice5Min)
+        self.assertFalse(self.path.exists())
+
+    def test_drop(self):
+        barcache.build(StockPrice5Min, self.stock.pk)
+        barcache.drop(StockPrice5Min, self.stock.pk)
+        self.assertFalse(self.path.exists())
+        # Nothing cached is fine too
+        barcache.drop(StockPrice5Min, self.stock.pk)
+
+    @patch("api.views.ensure_data", return_value=True)
+    def test_price_view_reads_the_cache(self, ensure_data):
+        client = APIClient()
+        expected = client.get(URL + "&limit=2").json()
+        barcache.build(StockPrice5Min, self.stock.pk)
+        cache.get_cache().clear()
+
+        with patch("api.views.price_rows") as price_rows:
+            page = client.get(URL + "&limit=2")
+        price_rows.assert_not_called()
+        self.assertEqual(page.json(), expected)
+        self.assertIn("X-Next-Cursor", page)
@@ -0,0 +1,56 @@
+from datetime import date
+from unittest.mock import patch
+import pandas as pd
+from django.test import TestCase
+from data_ingestion.ohlcv.scheduler import scheduler
+from data_ingestion.ohlcv.services import ensure_data_many
+from market_data.models import Stock, StockPrice1D
+
+
+def make_frame():
+    index = pd.DatetimeIndex(["2025-01-06", "2025-01-07", "2025-01-08"], tz="UTC")
+    return pd.DataFrame(
+        {"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100},
+        index=index,
+    )
+
+
+@patch("data_ingestion.ohlcv.services.ensure_metadata_many")
+@patch("data_ingestion.ohlcv.services.client")
+class EnsureDataManyTestCase(TestCase):
+
+    def setUp(self):
+        scheduler.reset()
+        for symbol in ["SPY", "QQQ", "DIA"]:
+            Stock.objects.create(symbol=symbol, exchange="NYSE")
+
+    def test_batches_shared_gaps(self, mock_client, mock_metadata):
+        sources = ["yfinance", "alpaca", "finage", "tiingo", "polygon", "databento"]
+        for name in [f"fetch_from_{source}" for source in sources] + [
+            "fetch_many_from_yfinance",
+            "fetch_many_from_alpaca",
+        ]:
+            getattr(mock_client, name).__name__ = name
+        mock_client.fetch_many_from_yfinance.return_value = {
+            "SPY": make_frame(),
+            "QQQ": make_frame(),
+        }
+        mock_client.fetch_many_from_alpaca.return_value = {}
+        mock_client.fetch_from_yfinance.return_value = make_frame()
+
+        results = ensure_data_many(
+            ["SPY", "QQQ", "DIA"], "1D", date(2025, 1, 6), date(2025, 1, 8)
+        )
+        self.assertEqual(results, {"SPY": True, "QQQ": True, "DIA": True})
+
+        # One batched request, DIA falls back to the single-symbol sources
+        mock_client.fetch_many_from_yfinance.assert_called_once()
+        self.assertEqual(
+            mock_client.fetch_many_from_alpaca.call_args.args[0], ["DIA"]
+        )
+        mock_client.fetch_from_yfinance.assert_called_once()
+        self.assertEqual(StockPrice1D.objects.count(), 9)
+
+        # Covered symbols are not fetched again
+        ensure_data_many(["SPY", "QQQ", "DIA"], "1D", date(2025, 1, 6), date(2025, 1, 8))
+        mock_client.fetch_many_from_yfinance.assert_called_once()
@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from data_ingestion.ohlcv import client
+from data_ingestion.ohlcv.scheduler import scheduler
+from data_ingestion.ohlcv.services import fetch_missing_data
+from market_data.models import Stock, StockPrice1D
+
+
+def naive_utc(value):
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp
+
+
+def daily_bars(start, end):
+    """
+    Daily bars of [start, end), closing at the day of the month.
+    """
+    index = pd.date_range(
+        naive_utc(start).normalize(), naive_utc(end), freq="D", inclusive="left"
+    ).tz_localize("UTC")
+    return pd.DataFrame(
+        {
+            "Open": 1.0,
+            "High": 2.0,
+            "Low": 0.5,
+            "Close": index.day.astype(float),
+            "Volume": 100,
+        },
+        index=index,
+    )
+
+
+class FakeYFinance:
+    """
+    Stand-in for yfinance. download() passes its result through a module
+    global that every call resets, like yfinance.shared._DFS.
+    """
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.lock = threading.Lock()
+        self.active = self.max_active = 0
+        self.shared = {}
+
+    def download(self, tickers, start, end, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            self.shared = {}
+            # Long enough for unserialized calls to overlap
+            time.sleep(0.05)
+            frames = {ticker: daily_bars(start, end) for ticker in tickers}
+            self.shared.update(frames)
+            return pd.concat(self.shared, axis=1)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def Ticker(self, symbol):
+        fake = self
+
+        class Ticker:
+            def history(self, start, end, **kwargs):
+                # Both gaps are in flight at once
+                fake.barrier.wait()
+                return daily_bars(start, end)
+
+        return Ticker()
+
+
+class YFinanceTestCase(TestCase):
+
+    def setUp(self):
+        scheduler.reset()
+
+    def test_concurrent_gaps_of_one_symbol(self):
+        Stock.objects.create(symbol="SPY", exchange="NYSE")
+        # Leave the one-day gaps of Jan 6th and Jan 8th
+        StockPrice1D.objects.create(
+            stock=Stock.objects.get(),
+            timestamp=pd.Timestamp("2025-01-07 21:00", tz="UTC"),
+            open=1,
+            high=1,
+            low=1,
+            close=7,
+            volume=1,
+        )
+        fake = FakeYFinance(parties=2)
+        with patch.object(client, "yf", fake):
+            report = fetch_missing_data(
+                "SPY", "1D", date(2025, 1, 6), date(2025, 1, 8), StockPrice1D, None, 2
+            )
+
+        self.assertTrue(report)
+        self.assertEqual(
+            list(StockPrice1D.objects.order_by("timestamp").values_list("close")),
+            [(6.0,), (7.0,), (8.0,)],
+        )
+
+
+class YFinanceBatchTestCase(SimpleTestCase):
+
+    def test_downloads_are_serialized(self):
+        fake = FakeYFinance(parties=1)
+        results = {}
+
+        def fetch(symbol):
+            results[symbol] = client.fetch_many_from_yfinance(
+                [symbol], "1D", date(2025, 1, 6), date(2025, 1, 8)
+            )
+
+        with patch.object(client, "yf", fake):
+            threads = [
+                threading.Thread(target=fetch, args=(symbol,))
+                for symbol in ["SPY", "QQQ", "DIA", "IWM"]
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(fake.max_active, 1)
+        for symbol, frames in results.items():
+            self.assertEqual(list(frames), [symbol])
@@ -0,0 +1,84 @@
+import numpy as np
+from django.test import SimpleTestCase
+from market_data import codec
+
+
+def make_bars(count: int = 500, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_735_828_200_000_000_000 + np.arange(count) * 300_000_000_000
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.1, count)), 2)
+    volume = rng.integers(0, 10**9, count).astype(np.float64)
+    values = np.column_stack([close + 0.01, close + 0.05, close - 0.05, close, volume])
+    return timestamps, np.round(values, 2)
+
+
+class BarCodecTestCase(SimpleTestCase):
+
+    def test_round_trip(self):
+        timestamps, values = make_bars()
+        payload = codec.encode(timestamps, values)
+        decoded_timestamps, decoded_values = codec.decode(payload)
+        np.testing.assert_array_equal(decoded_timestamps, timestamps)
+        np.testing.assert_allclose(decoded_values, values, rtol=0, atol=1e-9)
+        # Against 48 bytes per bar in .npy
+        self.assertLess(len(payload) / len(timestamps), 12)
+
+    def test_empty(self):
+        timestamps, values = codec.decode(
+            codec.encode(np.empty(0, dtype=np.int64), np.empty((0, 5)))
+        )
+        self.assertEqual((len(timestamps), values.shape), (0, (0, 5)))
+
+    def test_tick_and_time_detection(self):
+        self.assertEqual(codec.tick_decimals(np.array([1.5, 2.25])), 2)
+        self.assertEqual(codec.tick_decimals(np.array([187.44000244140625])), 6)
+        self.assertEqual(codec.time_exponent(np.array([3 * 10**9, 6 * 10**9])), 9)
+        self.assertEqual(codec.time_exponent(np.array([10**9 + 1])), 0)
+
+    def test_prices_past_the_finest_tick_are_exact(self):
+        timestamps, values = make_bars(10)
+        values[:, :4] += 1e-8
+        values[3, 4] = 0.5
+        payload = codec.encode(timestamps, values)
+        self.assertEqual(payload[5], codec.EXACT)
+        decoded_timestamps, decoded = codec.decode(payload)
+        np.testing.assert_array_equal(decoded_timestamps, timestamps)
+        np.testing.assert_array_equal(decoded.view(np.int64), values.view(np.int64))
+
+    def test_float32_prices_are_exact(self):
+        timestamps, values = make_bars(100)
+        values[:, :4] = values[:, :4].astype(np.float32)
+        _, decoded = codec.decode(codec.encode(timestamps, values))
+        np.testing.assert_array_equal(decoded, values)
+
+    def test_rounding_on_request(self):
+        timestamps, values = make_bars(10)
+        values[:, :4] += 1e-8
+        _, decoded = codec.decode(codec.encode(timestamps, values, decimals=2))
+        np.testing.assert_allclose(decoded, values, rtol=0, atol=1e-7)
+
+    def test_version_1_payloads(self):
+        timestamps, values = make_bars(10)
+        payload = bytearray(codec.encode(timestamps, values))
+        payload[4] = 1
+        np.testing.assert_allclose(
+            codec.decode(bytes(payload))[1], values, rtol=0, atol=1e-9
+        )
+        payload[5] = codec.EXACT
+        with self.assertRaises(ValueError):
+            codec.decode(bytes(payload))
+
+    def test_extreme_integers(self):
+        values = np.array([0, 1, -1, 2**62, -(2**63), 2**63 - 1], dtype=np.int64)
+        np.testing.assert_array_equal(codec.unzigzag(codec.zigzag(values)), values)
+        varints = np.array([0, 127, 128, 2**64 - 1], dtype=np.uint64)
+        np.testing.assert_array_equal(
+            codec.decode_varints(codec.encode_varints(varints), 4), varints
+        )
+
+    def test_corrupt_payloads(self):
+        timestamps, values = make_bars(10)
+        payload = codec.encode(timestamps, values)
+        for corrupt in (b"", b"NOPE" + payload[4:], payload[:-1], payload + b"\x00"):
+            with self.assertRaises(ValueError):
+                codec.decode(corrupt)
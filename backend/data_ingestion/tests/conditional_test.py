@@ -0,0 +1,48 @@
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import SeriesState, Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+
+
+@patch("api.views.ensure_data", return_value=True)
+class ConditionalGetTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(make_frame(["2025-01-02 09:30"]), self.stock, StockPrice5Min)
+        self.client = APIClient()
+
+    def test_version_bumped_on_insert_only(self, ensure_data):
+        self.assertEqual(SeriesState.objects.get(stock=self.stock).version, 1)
+        save_to_db(make_frame(["2025-01-02 09:30"]), self.stock, StockPrice5Min)
+        self.assertEqual(SeriesState.objects.get(stock=self.stock).version, 1)
+        save_to_db(make_frame(["2025-01-02 09:35"]), self.stock, StockPrice5Min)
+        self.assertEqual(SeriesState.objects.get(stock=self.stock).version, 2)
+
+    def test_not_modified(self, ensure_data):
+        response = self.client.get(URL)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        # Only the series version lookup runs
+        with self.assertNumQueries(1):
+            response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        ensure_data.assert_called_once()
+
+    def test_etag_changes_with_data_and_format(self, ensure_data):
+        etag = self.client.get(URL)["ETag"]
+        self.assertNotEqual(self.client.get(URL + "&format=columns")["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            save_to_db(make_frame(["2025-01-02 09:35"]), self.stock, StockPrice5Min)
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,172 @@
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from data_ingestion.ohlcv import coverage, intervals, unobtainable
+from data_ingestion.ohlcv.scheduler import scheduler
+from data_ingestion.ohlcv.services import fetch_missing_data, is_all_bars_available
+from market_data.models import BarCoverage, Stock, StockPrice1D
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class IntervalsTestCase(TestCase):
+
+    def test_merge_intervals(self):
+        starts, ends = intervals.merge_intervals([5, 1, 3, 10], [6, 2, 5, 12])
+        self.assertEqual(starts.tolist(), [1, 3, 10])
+        self.assertEqual(ends.tolist(), [2, 6, 12])
+
+    def test_contains(self):
+        starts, ends = np.array([1, 10]), np.array([5, 12])
+        mask = intervals.contains(starts, ends, [0, 1, 5, 6, 11, 13])
+        self.assertEqual(mask.tolist(), [False, True, True, False, True, False])
+
+    def test_subtract_intervals(self):
+        starts, ends = np.array([2, 6]), np.array([4, 8])
+        self.assertEqual(
+            intervals.subtract_intervals(0, 10, starts, ends),
+            [(0, 2), (4, 6), (8, 10)],
+        )
+        self.assertEqual(intervals.subtract_intervals(3, 4, starts, ends), [])
+        self.assertEqual(
+            intervals.subtract_intervals(0, 10, starts[:0], ends[:0]), [(0, 10)]
+        )
+
+
+class CoverageTestCase(TestCase):
+
+    def setUp(self):
+        unobtainable.invalidate()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+
+    def test_record_coverage_merges(self):
+        coverage.record_coverage(self.stock, "1d", utc(2025, 1, 2), utc(2025, 1, 3))
+        coverage.record_coverage(self.stock, "1d", utc(2025, 1, 7), utc(2025, 1, 8))
+        self.assertEqual(BarCoverage.objects.count(), 2)
+
+        coverage.record_coverage(self.stock, "1D", utc(2025, 1, 3), utc(2025, 1, 7))
+        interval = BarCoverage.objects.get()
+        self.assertEqual(
+            (interval.start, interval.end), (utc(2025, 1, 2), utc(2025, 1, 8))
+        )
+
+    def test_is_all_bars_available(self):
+        args = ("SPY", "1D", date(2025, 1, 6), date(2025, 1, 10), StockPrice1D)
+        self.assertFalse(is_all_bars_available(*args))
+
+        # Session closes of Jan 6th - 10th (Jan 9th market closed)
+        coverage.record_coverage(
+            self.stock, "1d", utc(2025, 1, 6, 21), utc(2025, 1, 8, 21)
+        )
+        self.assertFalse(is_all_bars_available(*args))
+
+        coverage.record_coverage(
+            self.stock, "1d", utc(2025, 1, 10, 21), utc(2025, 1, 10, 21)
+        )
+        self.assertTrue(is_all_bars_available(*args))
+
+
+class FetchMissingDataTestCase(TestCase):
+
+    def setUp(self):
+        scheduler.reset()
+
+    def mock_sources(self, mock_client):
+        sources = ["yfinance", "alpaca", "finage", "tiingo", "polygon", "databento"]
+        for source in sources:
+            mocked = getattr(mock_client, f"fetch_from_{source}")
+            mocked.__name__ = f"fetch_from_{source}"
+            mocked.return_value = None
+
+    @patch("data_ingestion.ohlcv.services.client")
+    def test_fetch_missing_data_records_coverage(self, mock_client):
+        Stock.objects.create(symbol="SPY", exchange="NYSE")
+        self.mock_sources(mock_client)
+        index = pd.DatetimeIndex(
+            ["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-10"], tz="UTC"
+        )
+        mock_client.fetch_from_yfinance.return_value = pd.DataFrame(
+            {"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100},
+            index=index,
+        )
+
+        args = ("SPY", "1D", date(2025, 1, 6), date(2025, 1, 10), StockPrice1D)
+        self.assertTrue(fetch_missing_data(*args))
+        self.assertEqual(mock_client.fetch_from_yfinance.call_count, 1)
+        self.assertEqual(StockPrice1D.objects.count(), 4)
+        self.assertTrue(is_all_bars_available(*args))
+
+        # Nothing is fetched once the range is covered
+        self.assertTrue(fetch_missing_data(*args))
+        self.assertEqual(mock_client.fetch_from_yfinance.call_count, 1)
+
+    @patch("data_ingestion.ohlcv.services.client")
+    def test_partial_answer_is_not_covered(self, mock_client):
+        Stock.objects.create(symbol="SPY", exchange="NYSE")
+        self.mock_sources(mock_client)
+        # The last session is missing from the answer
+        mock_client.fetch_from_yfinance.return_value = pd.DataFrame(
+            {"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100},
+            index=pd.DatetimeIndex(
+                ["2025-01-06", "2025-01-07", "2025-01-08"], tz="UTC"
+            ),
+        )
+
+        args = ("SPY", "1D", date(2025, 1, 6), date(2025, 1, 10), StockPrice1D)
+        self.assertTrue(fetch_missing_data(*args))
+        self.assertFalse(is_all_bars_available(*args))
+        self.assertEqual(
+            list(BarCoverage.objects.values_list("start", "end")),
+            [(utc(2025, 1, 6, 21), utc(2025, 1, 8, 21))],
+        )
+
+        # Only the missing session is fetched again
+        fetch_missing_data(*args)
+        gap_start, gap_end = mock_client.fetch_from_yfinance.call_args.args[2:]
+        self.assertEqual((gap_start, gap_end), (utc(2025, 1, 10, 21),) * 2)
+
+    @patch("data_ingestion.ohlcv.services.client")
+    def test_fetch_missing_data_concurrent_report(self, mock_client):
+        Stock.objects.create(symbol="SPY", exchange="NYSE")
+        self.mock_sources(mock_client)
+
+        def fetch(symbol, timeframe, start, end):
+            if start.day == 8:
+                return None
+            return pd.DataFrame(
+                {"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100},
+                index=pd.DatetimeIndex([start.date()], tz="UTC"),
+            )
+
+        mock_client.fetch_from_yfinance.side_effect = fetch
+        # Leave three separate one-day gaps
+        StockPrice1D.objects.bulk_create(
+            StockPrice1D(
+                stock_id=Stock.objects.get().pk,
+                timestamp=utc(2025, 1, day, 21),
+                open=1,
+                high=1,
+                low=1,
+                close=1,
+                volume=1,
+            )
+            for day in [7, 10]
+        )
+
+        report = fetch_missing_data(
+            "SPY",
+            "1D",
+            date(2025, 1, 6),
+            date(2025, 1, 13),
+            StockPrice1D,
+            max_workers=3,
+        )
+        self.assertFalse(report)
+        self.assertEqual(
+            [(outcome.start.day, outcome.status) for outcome in report.outcomes],
+            [(6, "fetched"), (8, "unobtainable"), (13, "fetched")],
+        )
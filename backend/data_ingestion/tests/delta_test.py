@@ -0,0 +1,68 @@
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+
+
+@patch("api.views.ensure_data", return_value=True)
+class DeltaFeedTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(
+            make_frame(["2025-01-02 09:30", "2025-01-02 09:35"]),
+            self.stock,
+            StockPrice5Min,
+        )
+        self.client = APIClient()
+
+    def test_bars_are_sequenced_per_ingest(self, ensure_data):
+        save_to_db(
+            make_frame(["2025-01-02 09:35", "2025-01-02 09:40"]),
+            self.stock,
+            StockPrice5Min,
+        )
+        seqs = StockPrice5Min.objects.order_by("timestamp").values_list(
+            "seq", flat=True
+        )
+        self.assertEqual(list(seqs), [1, 1, 2])
+
+    def test_delta_poll(self, ensure_data):
+        response = self.client.get(URL)
+        token = response["X-Seq"]
+        self.assertEqual(token, "1")
+
+        response = self.client.get(URL + f"&since={token}")
+        self.assertEqual((response.json(), response["X-Seq"]), ([], "1"))
+
+        save_to_db(make_frame(["2025-01-02 09:40"]), self.stock, StockPrice5Min)
+        response = self.client.get(URL + f"&since={token}")
+        bars = response.json()
+        self.assertEqual([bar["timestamp"] for bar in bars], ["2025-01-02T14:40:00Z"])
+        self.assertEqual(response["X-Seq"], "2")
+
+    def test_delta_pages(self, ensure_data):
+        save_to_db(make_frame(["2025-01-02 09:40"]), self.stock, StockPrice5Min)
+        response = self.client.get(URL + "&since=0&limit=2")
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response["X-Seq"], "2")
+
+        cursor = response["X-Next-Cursor"]
+        response = self.client.get(URL + f"&since=0&limit=2&cursor={cursor}")
+        bars = response.json()
+        self.assertEqual([bar["timestamp"] for bar in bars], ["2025-01-02T14:40:00Z"])
+        self.assertNotIn("X-Next-Cursor", response)
+        # Only the first page sets the token
+        self.assertNotIn("X-Seq", response)
+
+    def test_delta_format_and_validation(self, ensure_data):
+        response = self.client.get(URL + "&since=0&format=columns")
+        self.assertEqual(len(response.json()["close"]), 2)
+        self.assertEqual(self.client.get(URL + "&since=x").status_code, 400)
+        self.assertEqual(self.client.get(URL + "&since=0&stream=1").status_code, 400)
@@ -0,0 +1,30 @@
+import numpy as np
+from django.test import SimpleTestCase
+from data_ingestion.ohlcv import gaps
+
+
+class GapsTestCase(SimpleTestCase):
+
+    def test_find_missing(self):
+        expected = np.arange(0, 100, 10)
+        existing = np.array([30, 0, 10, 90])
+        missing, blocked = gaps.find_missing(
+            expected, existing, np.array([50, 55]), np.array([60, 58])
+        )
+        self.assertEqual(expected[missing].tolist(), [20, 40, 70, 80])
+        self.assertEqual(expected[blocked].tolist(), [50, 60])
+
+    def test_find_missing_without_blocked_ranges(self):
+        missing, blocked = gaps.find_missing(np.array([1, 2, 3]), np.array([]))
+        self.assertEqual(missing.tolist(), [0, 1, 2])
+        self.assertFalse(blocked.any())
+
+    def test_filled_slots(self):
+        # Bars stamped at their open fill the expected bar closing after them
+        expected = np.array([5, 10, 15, 20, 40])
+        filled = gaps.filled_slots(expected, np.array([0, 5, 15, 31]), 5)
+        self.assertEqual(filled.tolist(), [True, True, False, True, False])
+
+    def test_split_runs(self):
+        self.assertEqual(gaps.split_runs([1, 2, 3, 7, 9, 10]), [(1, 3), (7, 7), (9, 10)])
+        self.assertEqual(gaps.split_runs([]), [])
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.indicators import INDICATORS
+from data_ingestion.ohlcv.services import save_to_db
+from market_data.models import Stock, StockPrice1D
+
+
+def make_columns(count, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=count))
+    return {
+        "open": close + rng.normal(size=count) * 0.1,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.integers(100, 1000, size=count).astype(np.float64),
+        "session": np.repeat(np.arange(count // 10 + 1), 10)[:count],
+    }
+
+
+def split(columns, at):
+    head = {key: value[:at] for key, value in columns.items()}
+    tail = {key: value[at:] for key, value in columns.items()}
+    return head, tail
+
+
+class IndicatorMathTestCase(SimpleTestCase):
+
+    def test_incremental_matches_batch(self):
+        columns = make_columns(200)
+        for name, indicator in INDICATORS.items():
+            period = indicator.default_period
+            batch, _ = indicator.compute(columns, period)
+            for at in (0, 1, 5, 95, 199):
+                head, tail = split(columns, at)
+                first, state = indicator.compute(head, period)
+                rest, _ = indicator.compute(tail, period, state)
+                np.testing.assert_allclose(
+                    np.concatenate([first, rest]), batch, err_msg=f"{name} at {at}"
+                )
+
+    def test_sma(self):
+        columns = make_columns(50)
+        values, _ = INDICATORS["sma"].compute(columns, 5)
+        expected = pd.Series(columns["close"]).rolling(5).mean().to_numpy()
+        np.testing.assert_allclose(values, expected)
+        self.assertTrue(np.isnan(values[:4]).all())
+
+    def test_rsi_bounds(self):
+        values, _ = INDICATORS["rsi"].compute(make_columns(100), 14)
+        valid = values[~np.isnan(values)]
+        self.assertTrue(((valid >= 0) & (valid <= 100)).all())
+        self.assertEqual(len(valid), 86)
+
+    def test_vwap_restarts_each_session(self):
+        columns = make_columns(20)
+        values, _ = INDICATORS["vwap"].compute(columns, None)
+        typical = (columns["high"] + columns["low"] + columns["close"]) / 3
+        self.assertAlmostEqual(values[10], typical[10])
+
+
+@patch("api.views.ensure_data", return_value=True)
+class IndicatorViewTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        self.save_days("2024-10-01", "2025-01-31")
+        self.client = APIClient()
+
+    def save_days(self, start, end):
+        index = pd.bdate_range(start, end, tz="UTC")
+        frame = pd.DataFrame(
+            {
+                "open": np.arange(len(index)) + 100.0,
+                "high": np.arange(len(index)) + 101.0,
+                "low": np.arange(len(index)) + 99.0,
+                "close": np.arange(len(index)) + 100.0,
+                "volume": np.full(len(index), 1000),
+            },
+            index=index,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            save_to_db(frame, self.stock, StockPrice1D)
+
+    def get(self, end, **params):
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        url = f"/data/indicators/spy/?timeframe=1d&start=2025-01-02&end={end}&{query}"
+        return self.client.get(url)
+
+    def test_sma_uses_warmup_bars(self, ensure_data):
+        data = self.get("2025-01-10", indicator="sma", period=5).json()
+        self.assertEqual(data["timestamps"][0], "2025-01-02T00:00:00Z")
+        # Close rises by one per bar, so the SMA lags it by two
+        self.assertEqual(data["values"][0], 100.0 + 67 - 2)
+
+        fetch_start = ensure_data.call_args.args[2]
+        self.assertLess(fetch_start, pd.Timestamp("2025-01-02").date())
+
+    def test_cached_series_is_extended(self, ensure_data):
+        self.get("2025-01-10", indicator="ema", period=10)
+        key = "indicators:SPY:1d:ema:10"
+        self.assertIsNotNone(cache.get_cache().get(key))
+
+        self.save_days("2025-02-03", "2025-02-07")
+        # Bars after the cached end extend the series in place
+        self.assertIsNotNone(cache.get_cache().get(key))
+        extended = self.get("2025-02-08", indicator="ema", period=10).json()
+
+        cache.get_cache().clear()
+        fresh = self.get("2025-02-08", indicator="ema", period=10).json()
+        np.testing.assert_allclose(extended["values"], fresh["values"])
+        self.assertEqual(extended["timestamps"][-1], "2025-02-07T00:00:00Z")
+
+    def test_backfill_recomputes(self, ensure_data):
+        cached = self.get("2025-01-10", indicator="sma", period=5).json()
+        StockPrice1D.objects.filter(timestamp__date="2025-01-03").delete()
+        # A bar inside the cached series, without any signal reaching the cache
+        with patch("market_data.signals.bars_saved.send"):
+            self.save_days("2025-01-03", "2025-01-03")
+        served = self.get("2025-01-10", indicator="sma", period=5).json()
+        self.assertNotEqual(served["values"], cached["values"])
+
+        cache.get_cache().clear()
+        fresh = self.get("2025-01-10", indicator="sma", period=5).json()
+        self.assertEqual(served["values"], fresh["values"])
+
+    def test_validation(self, ensure_data):
+        self.assertEqual(self.get("2025-01-10", indicator="macd").status_code, 400)
+        response = self.get("2025-01-10", indicator="rsi", period=0)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from data_ingestion.ohlcv.ingest import frame_to_columns
+from data_ingestion.ohlcv.services import save_to_db
+from market_data.models import Stock, StockPrice5Min
+
+
+def make_frame(timestamps, tz="America/New_York"):
+    index = pd.DatetimeIndex(timestamps, tz=tz)
+    return pd.DataFrame(
+        {
+            "Open": np.arange(len(index)) + 100.0,
+            "High": np.arange(len(index)) + 101.0,
+            "Low": np.arange(len(index)) + 99.0,
+            "Close": np.arange(len(index)) + 100.5,
+            "Volume": np.arange(len(index)) * 10 + 1000,
+        },
+        index=index,
+    )
+
+
+class IngestTestCase(TestCase):
+
+    def test_frame_to_columns(self):
+        df = make_frame(
+            ["2025-01-02 09:35", "2025-01-02 09:30", "2025-01-02 09:30"]
+        )
+        df.iloc[0, 0] = np.nan
+        timestamps, values, invalid, duplicates = frame_to_columns(df)
+
+        self.assertEqual(invalid, 1)
+        self.assertEqual(duplicates, 1)
+        self.assertEqual(
+            timestamps.tolist(), [pd.Timestamp("2025-01-02 14:30", tz="UTC").value]
+        )
+        self.assertEqual(values.shape, (1, 5))
+
+    def test_frame_to_columns_alpaca(self):
+        index = pd.MultiIndex.from_tuples(
+            [("SPY", pd.Timestamp("2025-01-02 14:30", tz="UTC"))],
+            names=["symbol", "timestamp"],
+        )
+        df = pd.DataFrame(
+            {
+                "open": [1.0],
+                "high": [2.0],
+                "low": [0.5],
+                "close": [1.5],
+                "volume": [10.0],
+                "trade_count": [3.0],
+                "vwap": [1.2],
+            },
+            index=index,
+        )
+        timestamps, values, invalid, duplicates = frame_to_columns(df)
+        self.assertEqual(len(timestamps), 1)
+        self.assertEqual(values[0].tolist(), [1.0, 2.0, 0.5, 1.5, 10.0])
+
+    def test_save_to_db(self):
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        df = make_frame(["2025-01-02 09:30", "2025-01-02 09:35"])
+
+        result = save_to_db(df, stock, StockPrice5Min, chunk_size=1)
+        self.assertEqual((result.inserted, result.skipped), (2, 0))
+
+        bar = StockPrice5Min.objects.get(
+            stock=stock, timestamp=pd.Timestamp("2025-01-02 14:35", tz="UTC")
+        )
+        self.assertEqual(bar.open, 101.0)
+        self.assertEqual(bar.volume, 1010)
+
+        # Re-ingesting overlapping bars only inserts the new one
+        df = make_frame(["2025-01-02 09:35", "2025-01-02 09:40"])
+        result = save_to_db(df, stock, StockPrice5Min)
+        self.assertEqual((result.inserted, result.skipped), (1, 1))
+        self.assertEqual(StockPrice5Min.objects.filter(stock=stock).count(), 3)
@@ -0,0 +1,69 @@
+import datetime
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv import jobs
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import FetchJob, Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+START, END = datetime.date(2025, 1, 2), datetime.date(2025, 1, 3)
+
+
+class FetchJobTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(make_frame(["2025-01-02 09:30"]), stock, StockPrice5Min)
+        self.client = APIClient()
+
+    @patch("api.views.ensure_data")
+    @patch("data_ingestion.ohlcv.jobs.get_job_pool")
+    def test_partial_response(self, get_job_pool, ensure_data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(URL + "&wait=false")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(response.json()), 1)
+        ensure_data.assert_not_called()
+        get_job_pool.return_value.submit.assert_called_once()
+
+        job = FetchJob.objects.get()
+        self.assertEqual(response["X-Fetch-Job"], str(job.pk))
+        status = self.client.get(response["Location"]).json()
+        self.assertEqual((status["status"], status["symbol"]), ("pending", "SPY"))
+
+    @patch("data_ingestion.ohlcv.services.is_data_ready", return_value=True)
+    @patch("api.views.ensure_data", return_value=True)
+    def test_ready_data_is_served_normally(self, ensure_data, is_data_ready):
+        response = self.client.get(URL + "&wait=false")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Fetch-Job", response)
+
+    def test_submit_reuses_live_job(self):
+        first = jobs.submit("spy", "5MIN", START, END)
+        self.assertEqual(jobs.submit("SPY", "5min", START, END).pk, first.pk)
+
+        FetchJob.objects.filter(pk=first.pk).update(status=FetchJob.DONE)
+        self.assertNotEqual(jobs.submit("SPY", "5min", START, END).pk, first.pk)
+
+    @patch("data_ingestion.ohlcv.services.ensure_data")
+    def test_run_job(self, ensure_data):
+        ensure_data.return_value = True
+        job = jobs.run_job(jobs.submit("SPY", "5min", START, END).pk)
+        self.assertEqual(job.status, FetchJob.DONE)
+        self.assertIsNotNone(job.finished_at)
+
+        ensure_data.side_effect = RuntimeError("provider down")
+        job = FetchJob.objects.create(
+            symbol="SPY", timeframe="5min", start=START, end=END
+        )
+        job = jobs.run_job(job.pk)
+        self.assertEqual((job.status, job.error), (FetchJob.FAILED, "provider down"))
+
+    def test_unknown_job(self):
+        response = self.client.get("/data/jobs/00000000-0000-0000-0000-000000000000/")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase
+from django.utils import timezone
+from data_ingestion.metadata import services
+from market_data.models import Stock, StockMetadata
+
+
+class EnsureMetadataManyTestCase(TestCase):
+
+    def setUp(self):
+        for symbol, age in [("SPY", 1), ("QQQ", 60)]:
+            stock = Stock.objects.create(symbol=symbol, exchange="NYSE")
+            StockMetadata.objects.create(
+                stock=stock,
+                asset_type="ETF",
+                sector="",
+                market_cap=0,
+                last_updated=timezone.now() - timedelta(days=age),
+            )
+
+    @patch.object(services, "fetch_metadata", return_value=True)
+    def test_only_outdated_symbols_are_fetched(self, fetch_metadata):
+        with self.assertNumQueries(1):
+            results = services.ensure_metadata_many(["spy", "QQQ", "DIA"])
+        self.assertEqual(results, {"spy": True, "QQQ": True, "DIA": True})
+        self.assertEqual(
+            [call.args[0] for call in fetch_metadata.call_args_list], ["QQQ", "DIA"]
+        )
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIClient
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data.models import Stock, StockPrice5Min
+
+URL = "/data/panel/?timeframe=5min&start=2025-01-02&end=2025-01-03"
+
+
+@patch("api.views.ensure_data_many")
+class PanelTestCase(TestCase):
+
+    def setUp(self):
+        spy = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        qqq = Stock.objects.create(symbol="QQQ", exchange="NASDAQ")
+        save_to_db(
+            make_frame(["2025-01-02 09:30", "2025-01-02 09:35"]), spy, StockPrice5Min
+        )
+        save_to_db(
+            make_frame(["2025-01-02 09:35", "2025-01-02 09:40"]), qqq, StockPrice5Min
+        )
+        self.client = APIClient()
+
+    def test_aligned_matrix(self, ensure_data_many):
+        response = self.client.get(URL + "&symbols=qqq,SPY,NONE&fields=close,volume")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(data["symbols"], ["QQQ", "SPY", "NONE"])
+        self.assertEqual(
+            data["timestamps"],
+            ["2025-01-02T14:30:00Z", "2025-01-02T14:35:00Z", "2025-01-02T14:40:00Z"],
+        )
+        self.assertEqual(
+            data["close"],
+            [[None, 100.5, None], [100.5, 101.5, None], [101.5, None, None]],
+        )
+        self.assertEqual(data["volume"][1], [1000, 1010, None])
+        ensure_data_many.assert_called_once()
+
+    def test_single_price_query(self, ensure_data_many):
+        self.client.get(URL + "&symbols=SPY,QQQ")
+        # The stock ids come from the symbol registry
+        with self.assertNumQueries(1):
+            self.client.get(URL + "&symbols=SPY,QQQ")
+
+    def test_validation(self, ensure_data_many):
+        self.assertEqual(self.client.get(URL).status_code, 400)
+        response = self.client.get(URL + "&symbols=SPY&fields=vwap")
+        self.assertEqual(response.status_code, 400)
+        ensure_data_many.assert_not_called()
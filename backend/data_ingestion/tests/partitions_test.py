@@ -0,0 +1,153 @@
+from datetime import date, datetime, timezone
+from unittest import skipUnless
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from data_ingestion.ohlcv.services import get_timeframe_name
+from market_data import partitions
+from market_data.models import BarCoverage, Stock, StockPrice5Min, StockPrice1D
+
+TABLE = StockPrice5Min._meta.db_table
+
+
+class PartitionNamingTestCase(SimpleTestCase):
+
+    def test_spans(self):
+        self.assertEqual(
+            partitions.span_start("month", date(2024, 5, 17)), date(2024, 5, 1)
+        )
+        self.assertEqual(
+            partitions.span_start("year", date(2024, 5, 17)), date(2024, 1, 1)
+        )
+        self.assertEqual(
+            partitions.next_span("month", date(2024, 12, 1)), date(2025, 1, 1)
+        )
+        self.assertEqual(
+            partitions.next_span("year", date(2024, 1, 1)), date(2025, 1, 1)
+        )
+
+    def test_names_round_trip(self):
+        name = partitions.partition_name(TABLE, "month", date(2024, 3, 1))
+        self.assertEqual(name, f"{TABLE}_p202403")
+        self.assertEqual(partitions.parse_partition(TABLE, name), date(2024, 3, 1))
+
+        table = StockPrice1D._meta.db_table
+        name = partitions.partition_name(table, "year", date(2024, 1, 1))
+        self.assertEqual(partitions.parse_partition(table, name), date(2024, 1, 1))
+
+        self.assertIsNone(
+            partitions.parse_partition(TABLE, partitions.default_partition(TABLE))
+        )
+        self.assertIsNone(partitions.parse_partition(TABLE, f"{TABLE}_p202403_old"))
+
+    def test_every_price_table_has_a_span(self):
+        self.assertEqual(len(partitions.SPANS), 5)
+        self.assertEqual(set(partitions.TIMEFRAMES), set(partitions.SPANS))
+        self.assertEqual(
+            partitions.TIMEFRAMES[TABLE], get_timeframe_name(StockPrice5Min)
+        )
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TrimCoverageTestCase(TestCase):
+
+    def test_detached_span_is_cut_out(self):
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        for start, end in [
+            (utc(2023, 12, 1), utc(2024, 3, 1)),
+            (utc(2024, 1, 5), utc(2024, 1, 6)),
+            (utc(2024, 2, 1), utc(2024, 2, 2)),
+        ]:
+            BarCoverage.objects.create(
+                stock=stock, timeframe="5min", start=start, end=end
+            )
+        BarCoverage.objects.create(
+            stock=stock, timeframe="1d", start=utc(2024, 1, 1), end=utc(2024, 1, 31)
+        )
+
+        partitions.trim_coverage(TABLE, date(2024, 1, 1), date(2024, 2, 1))
+
+        self.assertEqual(
+            sorted(
+                BarCoverage.objects.filter(timeframe="5min").values_list("start", "end")
+            ),
+            [
+                (utc(2023, 12, 1), utc(2023, 12, 31, 23, 59, 59, 999999)),
+                (utc(2024, 2, 1), utc(2024, 2, 2)),
+                (utc(2024, 2, 1), utc(2024, 3, 1)),
+            ],
+        )
+        self.assertEqual(BarCoverage.objects.filter(timeframe="1d").count(), 1)
+
+
+class PartitionCommandTestCase(TestCase):
+
+    def test_needs_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command("partition_bars")
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+class PartitionMaintenanceTestCase(TestCase):
+    """
+    Runs on the tables partitioned by migration 0008, in a span far before
+    the partitions it created.
+    """
+
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        self.today = date(2020, 1, 15)
+
+    def add_bar(self):
+        StockPrice5Min.objects.create(
+            stock=self.stock,
+            timestamp=utc(2020, 1, 2, 14, 30),
+            open=1,
+            high=1,
+            low=1,
+            close=1,
+            volume=1,
+        )
+
+    def partitions(self):
+        with connection.cursor() as cursor:
+            return partitions.list_partitions(cursor, TABLE)
+
+    def test_detach_and_recreate_a_span(self):
+        name = f"{TABLE}_p202001"
+        self.add_bar()
+        BarCoverage.objects.create(
+            stock=self.stock,
+            timeframe="5min",
+            start=utc(2020, 1, 2, 14, 30),
+            end=utc(2020, 1, 2, 14, 30),
+        )
+        # The bar was in the default partition
+        created, _ = partitions.maintain(TABLE, self.today, ahead=0)
+        self.assertEqual(created, [name])
+        self.assertEqual(self.partitions()[date(2020, 1, 1)], name)
+        self.assertEqual(StockPrice5Min.objects.count(), 1)
+
+        _, detached = partitions.maintain(
+            TABLE, self.today, ahead=0, detach_before=date(2020, 2, 1)
+        )
+        self.assertEqual(detached, [(name, f"{name}_d20200115")])
+        self.assertNotIn(date(2020, 1, 1), self.partitions())
+        self.assertEqual(StockPrice5Min.objects.count(), 0)
+        self.assertFalse(BarCoverage.objects.exists())
+
+        # The span comes back under its name, the archive keeps its bars
+        self.add_bar()
+        created, _ = partitions.maintain(TABLE, self.today, ahead=0)
+        self.assertEqual(created, [name])
+        _, detached = partitions.maintain(
+            TABLE, self.today, ahead=0, detach_before=date(2020, 2, 1)
+        )
+        self.assertEqual(detached, [(name, f"{name}_d20200115_2")])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{name}_d20200115"')
+            self.assertEqual(cursor.fetchone()[0], 1)
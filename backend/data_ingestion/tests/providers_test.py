@@ -0,0 +1,24 @@
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from data_ingestion import providers
+
+
+class ProvidersTestCase(SimpleTestCase):
+
+    def tearDown(self):
+        providers.close_providers()
+
+    def test_sessions_are_reused(self):
+        session = providers.get_http_session("fmp")
+        self.assertIs(session, providers.get_http_session("fmp"))
+        self.assertIsNot(session, providers.get_http_session("alpaca"))
+
+        adapter = session.get_adapter("https://financialmodelingprep.com")
+        self.assertEqual(adapter.max_retries.total, providers.HTTP_RETRIES)
+        self.assertEqual(session.timeout, providers.HTTP_TIMEOUT)
+
+    @patch.dict("os.environ", {"api_key_alpaca": "key", "api_secret_alpaca": "secret"})
+    def test_alpaca_client_is_shared(self):
+        client = providers.get_alpaca_client()
+        self.assertIs(client, providers.get_alpaca_client())
+        self.assertIs(client._session, providers.get_http_session("alpaca"))
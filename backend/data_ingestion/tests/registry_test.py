@@ -0,0 +1,30 @@
+from django.test import TestCase
+from market_data import registry
+from market_data.models import Stock
+
+
+class SymbolRegistryTestCase(TestCase):
+
+    def setUp(self):
+        registry.clear()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+
+    def test_resolve_is_cached(self):
+        info = registry.resolve(" spy")
+        self.assertEqual((info.id, info.exchange), (self.stock.pk, "NYSE"))
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.resolve_id("SPY"), self.stock.pk)
+
+    def test_unknown_symbol(self):
+        self.assertIsNone(registry.resolve("NOPE"))
+        Stock.objects.create(symbol="NOPE", exchange="NASDAQ")
+        self.assertEqual(registry.resolve("nope").exchange, "NASDAQ")
+
+    def test_invalidated_on_save_and_delete(self):
+        registry.resolve("SPY")
+        self.stock.exchange = "ARCA"
+        self.stock.save()
+        self.assertEqual(registry.resolve("SPY").exchange, "ARCA")
+
+        self.stock.delete()
+        self.assertIsNone(registry.resolve("SPY"))
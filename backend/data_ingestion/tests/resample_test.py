@@ -0,0 +1,250 @@
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from data_ingestion.ohlcv import coverage, resample, sessions
+from data_ingestion.ohlcv.services import (
+    derive_missing_data,
+    is_all_bars_available,
+    save_to_db,
+)
+from market_data.models import SeriesState, Stock, StockPrice1D, StockPrice1H
+from market_data.models import StockPrice1Month
+from market_data.models import StockPrice5Min
+
+
+def ns(value):
+    return pd.Timestamp(value, tz="UTC").value
+
+
+class ResampleTestCase(SimpleTestCase):
+
+    def test_session_buckets(self):
+        opens = np.array([ns("2025-01-02 14:30")])
+        closes = np.array([ns("2025-01-02 21:00")])
+        timestamps = np.array(
+            [ns("2025-01-02 14:00"), ns("2025-01-02 14:30"), ns("2025-01-02 15:25")]
+            + [ns("2025-01-02 15:30"), ns("2025-01-02 21:00")]
+        )
+        buckets = resample.session_buckets(
+            timestamps, opens, closes, pd.Timedelta(hours=1).value
+        )
+        self.assertEqual(
+            buckets.tolist(),
+            [-1, opens[0], opens[0], ns("2025-01-02 15:30"), -1],
+        )
+
+    def test_month_buckets(self):
+        dates, _, closes = sessions.session_table("NYSE", "2025-01-30", "2025-02-04")
+        # Midnight UTC, midnight in New York and at the close
+        timestamps = np.array(
+            [ns("2025-01-31"), ns("2025-02-03 05:00"), ns("2025-02-04 21:00")]
+            + [ns("2025-02-05")]
+        )
+        self.assertEqual(
+            resample.month_buckets(timestamps, dates, closes).tolist(),
+            [ns("2025-01-01"), ns("2025-02-01"), ns("2025-02-01"), -1],
+        )
+
+    def test_month_buckets_east_of_utc(self):
+        dates, _, closes = sessions.session_table("XASX", "2025-03-28", "2025-04-03")
+        # Sydney midnight of March 31st, April 1st and 2nd
+        timestamps = np.array(
+            [ns("2025-03-30 13:00"), ns("2025-03-31 13:00"), ns("2025-04-01 13:00")]
+        )
+        self.assertEqual(
+            resample.month_buckets(timestamps, dates, closes).tolist(),
+            [ns("2025-03-01"), ns("2025-04-01"), ns("2025-04-01")],
+        )
+
+    def test_aggregate(self):
+        buckets = np.array([-1, 10, 10, 10, 20])
+        values = np.array(
+            [
+                [9.0, 9.0, 9.0, 9.0, 9.0],
+                [1.0, 3.0, 0.5, 2.0, 10.0],
+                [2.0, 4.0, 1.5, 3.0, 20.0],
+                [3.0, 3.5, 0.2, 2.5, 30.0],
+                [5.0, 6.0, 4.0, 5.5, 40.0],
+            ]
+        )
+        labels, bars = resample.aggregate(buckets, values)
+        self.assertEqual(labels.tolist(), [10, 20])
+        self.assertEqual(bars[0].tolist(), [1.0, 4.0, 0.2, 2.5, 60.0])
+        self.assertEqual(bars[1].tolist(), [5.0, 6.0, 4.0, 5.5, 40.0])
+
+
+class DeriveMissingDataTestCase(TestCase):
+
+    def setUp(self):
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+
+    def store(self, PriceModel, index, fetched_range):
+        df = pd.DataFrame(
+            {
+                "open": np.arange(len(index)) + 1.0,
+                "high": np.arange(len(index)) + 2.0,
+                "low": np.arange(len(index)) + 0.5,
+                "close": np.arange(len(index)) + 1.5,
+                "volume": 10,
+            },
+            index=index,
+        )
+        save_to_db(df, self.stock, PriceModel, fetched_range=fetched_range)
+
+    def test_derive_hourly_from_5min(self):
+        day = date(2025, 1, 2)
+        args = ("SPY", "1h", day, day, StockPrice1H)
+        self.assertFalse(derive_missing_data(*args))
+
+        index = pd.date_range("2025-01-02 14:30", "2025-01-02 20:55", freq="5min")
+        self.store(
+            StockPrice5Min,
+            index.tz_localize("UTC"),
+            (
+                datetime(2025, 1, 2, 14, 35, tzinfo=timezone.utc),
+                datetime(2025, 1, 2, 21, tzinfo=timezone.utc),
+            ),
+        )
+        self.assertTrue(derive_missing_data(*args))
+
+        bars = list(StockPrice1H.objects.order_by("timestamp"))
+        self.assertEqual(len(bars), 7)
+        self.assertEqual(bars[0].timestamp.hour, 14)
+        self.assertEqual(bars[0].timestamp.minute, 30)
+        self.assertEqual((bars[0].open, bars[0].close, bars[0].volume), (1, 12.5, 120))
+        # The last hour of the session is only 30 minutes long
+        self.assertEqual(bars[-1].volume, 60)
+
+    def test_derive_monthly_from_daily(self):
+        days = pd.DatetimeIndex(
+            pd.bdate_range("2025-02-01", "2025-02-28").drop(pd.Timestamp("2025-02-17")),
+            tz="UTC",
+        )
+        self.store(
+            StockPrice1D,
+            days,
+            (
+                datetime(2025, 2, 3, 21, tzinfo=timezone.utc),
+                datetime(2025, 2, 28, 21, tzinfo=timezone.utc),
+            ),
+        )
+        self.assertTrue(
+            derive_missing_data(
+                "SPY", "1month", date(2025, 2, 10), date(2025, 2, 20), StockPrice1Month
+            )
+        )
+        bar = StockPrice1Month.objects.get()
+        self.assertEqual(bar.timestamp.day, 1)
+        self.assertEqual((bar.open, bar.close, bar.volume), (1, len(days) + 0.5, 190))
+        self.assertTrue(
+            coverage.is_range_covered(
+                "SPY",
+                "1month",
+                datetime(2025, 2, 10, tzinfo=timezone.utc),
+                datetime(2025, 2, 20, tzinfo=timezone.utc),
+            )
+        )
+
+    def test_derive_monthly_east_of_utc(self):
+        self.stock.exchange = "XASX"
+        self.stock.save()
+        dates, _, closes = sessions.session_table("XASX", "2025-04-01", "2025-04-30")
+        # Daily bars stamped at Sydney midnight, the previous UTC day
+        days = pd.DatetimeIndex(
+            [sessions.local_midnight("XASX", pd.Timestamp(day)) for day in dates],
+            tz="UTC",
+        )
+        self.assertEqual(days[0], pd.Timestamp("2025-03-31 13:00", tz="UTC"))
+        self.store(
+            StockPrice1D,
+            days,
+            (coverage.to_datetime(closes[0]), coverage.to_datetime(closes[-1])),
+        )
+        self.assertTrue(
+            derive_missing_data(
+                "SPY",
+                "1month",
+                date(2025, 4, 10),
+                date(2025, 4, 20),
+                StockPrice1Month,
+                "XASX",
+            )
+        )
+        bar = StockPrice1Month.objects.get()
+        self.assertEqual(bar.timestamp, datetime(2025, 4, 1, tzinfo=timezone.utc))
+        # The first session, stamped in March in UTC, opens the month
+        self.assertEqual((bar.open, bar.volume), (1, 10 * len(days)))
+
+    def test_running_month_is_replaced(self):
+        args = ("SPY", "1month", date(2025, 2, 1), date(2025, 2, 28), StockPrice1Month)
+        for last_day, now in [(20, "2025-02-20 22:00"), (21, "2025-02-21 22:00")]:
+            days = pd.DatetimeIndex(
+                pd.bdate_range("2025-02-01", f"2025-02-{last_day}").drop(
+                    pd.Timestamp("2025-02-17")
+                ),
+                tz="UTC",
+            )
+            StockPrice1D.objects.all().delete()
+            self.store(
+                StockPrice1D,
+                days,
+                (
+                    datetime(2025, 2, 3, 21, tzinfo=timezone.utc),
+                    datetime(2025, 2, last_day, 21, tzinfo=timezone.utc),
+                ),
+            )
+            with patch(
+                "data_ingestion.ohlcv.services.timezone.now",
+                return_value=pd.Timestamp(now, tz="UTC").to_pydatetime(),
+            ):
+                self.assertTrue(derive_missing_data(*args))
+
+            bar = StockPrice1Month.objects.get()
+            self.assertEqual((bar.close, bar.volume), (len(days) + 0.5, 10 * len(days)))
+            self.assertFalse(
+                coverage.is_range_covered(
+                    "SPY",
+                    "1month",
+                    datetime(2025, 2, 1, tzinfo=timezone.utc),
+                    datetime(2025, 2, 1, tzinfo=timezone.utc),
+                )
+            )
+
+    def test_monthly_availability(self):
+        days = pd.bdate_range("2025-01-01", "2025-02-21", tz="UTC")
+        self.store(
+            StockPrice1D,
+            days,
+            (
+                datetime(2025, 1, 2, 21, tzinfo=timezone.utc),
+                datetime(2025, 2, 21, 21, tzinfo=timezone.utc),
+            ),
+        )
+        args = ("SPY", "1month", date(2025, 1, 1), date(2025, 2, 28), StockPrice1Month)
+        now = pd.Timestamp("2025-02-21 22:00", tz="UTC").to_pydatetime()
+        with patch("data_ingestion.ohlcv.services.timezone.now", return_value=now):
+            self.assertFalse(is_all_bars_available(*args))
+            self.assertTrue(derive_missing_data(*args))
+            # January is covered, February matches its daily bars
+            self.assertTrue(is_all_bars_available(*args))
+            version = SeriesState.objects.get(timeframe="1month").version
+            self.assertTrue(derive_missing_data(*args))
+            self.assertEqual(
+                SeriesState.objects.get(timeframe="1month").version, version
+            )
+
+            self.store(
+                StockPrice1D,
+                pd.DatetimeIndex(["2025-02-24"], tz="UTC"),
+                (
+                    datetime(2025, 2, 24, 21, tzinfo=timezone.utc),
+                    datetime(2025, 2, 24, 21, tzinfo=timezone.utc),
+                ),
+            )
+        now = pd.Timestamp("2025-02-24 22:00", tz="UTC").to_pydatetime()
+        with patch("data_ingestion.ohlcv.services.timezone.now", return_value=now):
+            self.assertFalse(is_all_bars_available(*args))
+            self.assertTrue(derive_missing_data(*args))
+            self.assertTrue(is_all_bars_available(*args))
@@ -0,0 +1,88 @@
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from data_ingestion.ohlcv import scheduler as scheduler_module
+from data_ingestion.ohlcv.scheduler import FAILURE_THRESHOLD, ProviderScheduler
+
+
+def fetch_from_a():
+    pass
+
+
+def fetch_from_b():
+    pass
+
+
+def fetch_from_c():
+    pass
+
+
+class ProviderSchedulerTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.scheduler = ProviderScheduler()
+        self.sources = [fetch_from_a, fetch_from_b, fetch_from_c]
+
+    def test_keeps_default_order_until_data_arrives(self):
+        self.assertEqual(self.scheduler.order(self.sources, "1d", "NYSE"), self.sources)
+
+    def test_reorders_by_success_and_latency(self):
+        for _ in range(5):
+            self.scheduler.record("fetch_from_a", "1d", "NYSE", 1.0, "empty")
+            self.scheduler.record("fetch_from_b", "1d", "NYSE", 2.0, "success")
+            self.scheduler.record("fetch_from_c", "1d", "NYSE", 0.5, "success")
+        self.assertEqual(
+            self.scheduler.order(self.sources, "1d", "NYSE"),
+            [fetch_from_c, fetch_from_b, fetch_from_a],
+        )
+        # Stats are kept per (timeframe, exchange)
+        self.assertEqual(
+            self.scheduler.order(self.sources, "5min", "NYSE"), self.sources
+        )
+
+    def test_fast_empty_source_sinks(self):
+        # A stub answering nothing in 10 us against a provider with bars
+        for _ in range(50):
+            self.scheduler.record("fetch_from_a", "1d", "NYSE", 0.00001, "empty")
+            self.scheduler.record("fetch_from_b", "1d", "NYSE", 0.4, "success")
+        self.assertEqual(
+            self.scheduler.order(self.sources, "1d", "NYSE"),
+            [fetch_from_b, fetch_from_c, fetch_from_a],
+        )
+
+    def test_circuit_breaker(self):
+        for _ in range(FAILURE_THRESHOLD):
+            self.scheduler.record("fetch_from_a", "1d", "NYSE", 10.0, "error")
+        self.assertEqual(
+            self.scheduler.order(self.sources, "1d", "NYSE"),
+            [fetch_from_b, fetch_from_c],
+        )
+
+        # Once the cooldown ends a single trial call is let through
+        stats = self.scheduler.stats("fetch_from_a", "1d", "NYSE")
+        with patch.object(
+            scheduler_module.time,
+            "monotonic",
+            return_value=stats.opened_at + stats.cooldown + 1,
+        ):
+            self.assertIn(
+                fetch_from_a, self.scheduler.order(self.sources, "1d", "NYSE")
+            )
+            # Ordering alone doesn't use up the trial, calling does
+            self.assertIn(
+                fetch_from_a, self.scheduler.order(self.sources, "1d", "NYSE")
+            )
+            self.assertTrue(self.scheduler.claim("fetch_from_a", "1d", "NYSE"))
+            self.assertFalse(self.scheduler.claim("fetch_from_a", "1d", "NYSE"))
+            self.assertNotIn(
+                fetch_from_a, self.scheduler.order(self.sources, "1d", "NYSE")
+            )
+            self.scheduler.record("fetch_from_a", "1d", "NYSE", 1.0, "success")
+        self.assertIsNone(stats.opened_at)
+
+    def test_claim_without_open_breaker(self):
+        self.assertTrue(self.scheduler.claim("fetch_from_a", "1d", "NYSE"))
+        self.assertTrue(self.scheduler.claim("fetch_from_a", "1d", "NYSE"))
+        # With every breaker open all sources are tried anyway
+        for _ in range(FAILURE_THRESHOLD):
+            self.scheduler.record("fetch_from_a", "1d", "NYSE", 10.0, "error")
+        self.assertTrue(self.scheduler.claim("fetch_from_a", "1d", "NYSE"))
@@ -0,0 +1,48 @@
+from datetime import date, datetime
+import pandas as pd
+import pandas_market_calendars as mcal
+from django.test import SimpleTestCase
+from data_ingestion.ohlcv import sessions
+
+
+class SessionIndexTestCase(SimpleTestCase):
+
+    def expected(self, timeframe, start, end):
+        schedule = mcal.get_calendar("NYSE").schedule(start_date=start, end_date=end)
+        bars = mcal.date_range(schedule, frequency=timeframe)
+        return pd.DatetimeIndex(bars).as_unit("ns").asi8.tolist()
+
+    def test_matches_calendar(self):
+        for timeframe, start, end in [
+            ("5min", date(2024, 12, 30), date(2025, 1, 3)),
+            ("1h", date(2025, 7, 1), date(2025, 7, 8)),
+            ("1D", date(2024, 11, 20), date(2025, 2, 10)),
+        ]:
+            result = sessions.expected_bar_timestamps("NYSE", timeframe, start, end)
+            self.assertEqual(result.tolist(), self.expected(timeframe, start, end))
+
+    def test_datetime_bounds_and_empty_ranges(self):
+        result = sessions.expected_bar_timestamps(
+            "NYSE", "1D", datetime(2025, 1, 2, 15), datetime(2025, 1, 3, 9)
+        )
+        self.assertEqual(len(result), 2)
+        # Weekend
+        result = sessions.expected_bar_timestamps(
+            "NYSE", "1D", date(2025, 1, 4), date(2025, 1, 5)
+        )
+        self.assertEqual(len(result), 0)
+
+    def test_unsupported_timeframe(self):
+        self.assertIsNone(
+            sessions.expected_bar_timestamps(
+                "NYSE", "1month", date(2025, 1, 1), date(2025, 3, 1)
+            )
+        )
+
+    def test_unknown_exchange_falls_back(self):
+        self.assertEqual(
+            sessions.expected_bar_timestamps(
+                "FOO", "1D", date(2025, 1, 1), date(2025, 1, 10)
+            ).tolist(),
+            self.expected("1D", date(2025, 1, 1), date(2025, 1, 10)),
+        )
@@ -0,0 +1,120 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone as django_timezone
+from data_ingestion.ohlcv import coverage, singleflight
+from data_ingestion.ohlcv.scheduler import scheduler
+from data_ingestion.ohlcv.services import fetch_missing_data
+from market_data.models import FetchLock, Stock, StockPrice1D
+
+
+class FlightTestCase(SimpleTestCase):
+
+    def test_followers_get_leader_result(self):
+        flight, is_leader = singleflight.join("SPY:1d:a:b")
+        self.assertTrue(is_leader)
+        follower, is_leader = singleflight.join("SPY:1d:a:b")
+        self.assertIs(follower, flight)
+        self.assertFalse(is_leader)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(follower.wait(5)))
+        thread.start()
+        singleflight.land(flight, "done")
+        thread.join()
+        self.assertEqual(results, ["done"])
+
+        # Landed flights start over
+        self.assertTrue(singleflight.join("SPY:1d:a:b")[1])
+        singleflight.land(singleflight.join("SPY:1d:a:b")[0])
+
+
+class FetchLockTestCase(TestCase):
+
+    def test_lock_rows(self):
+        self.assertTrue(singleflight.try_lock("key"))
+        self.assertFalse(singleflight.try_lock("key"))
+        singleflight.unlock("key")
+        self.assertTrue(singleflight.try_lock("key"))
+
+        # Abandoned locks are taken over
+        FetchLock.objects.update(expires_at=django_timezone.now() - timedelta(1))
+        self.assertTrue(singleflight.try_lock("key"))
+
+    def test_wait_unlocked(self):
+        self.assertTrue(singleflight.try_lock("b"))
+        with patch.object(singleflight, "_owner", return_value="other"):
+            self.assertEqual(singleflight.wait_unlocked(["a", "b"], 0), {"a"})
+
+    @patch("data_ingestion.ohlcv.services.client")
+    def test_waits_for_other_process(self, mock_client):
+        scheduler.reset()
+        stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        gap = (
+            datetime(2025, 1, 6, 21, tzinfo=timezone.utc),
+            datetime(2025, 1, 6, 21, tzinfo=timezone.utc),
+        )
+        FetchLock.objects.create(
+            key=singleflight.gap_key("SPY", "1D", *gap),
+            owner="other",
+            expires_at=django_timezone.now() + timedelta(minutes=1),
+        )
+
+        def other_process_finishes(keys):
+            coverage.record_coverage(stock, "1d", *gap)
+            return set(keys)
+
+        with patch.object(
+            singleflight, "wait_unlocked", side_effect=other_process_finishes
+        ):
+            report = fetch_missing_data(
+                "SPY", "1D", date(2025, 1, 6), date(2025, 1, 6), StockPrice1D
+            )
+        self.assertTrue(report)
+        self.assertEqual(report.outcomes[0].status, "coalesced")
+        mock_client.fetch_from_yfinance.assert_not_called()
+
+    def leave_two_gaps(self):
+        # Bars of Jan 6th and 8th are missing
+        StockPrice1D.objects.create(
+            stock=Stock.objects.create(symbol="SPY", exchange="NYSE"),
+            timestamp=datetime(2025, 1, 7, 21, tzinfo=timezone.utc),
+            open=1,
+            high=1,
+            low=1,
+            close=1,
+            volume=1,
+        )
+        return ("SPY", "1D", date(2025, 1, 6), date(2025, 1, 8), StockPrice1D)
+
+    def test_remote_gaps_are_waited_together(self):
+        args = self.leave_two_gaps()
+        with patch.object(singleflight, "try_lock", return_value=False), patch.object(
+            singleflight, "wait_unlocked", return_value=set()
+        ) as wait_unlocked, patch(
+            "data_ingestion.ohlcv.services.fetch_gaps", return_value={}
+        ) as fetch_gaps:
+            fetch_missing_data(*args)
+        wait_unlocked.assert_called_once()
+        self.assertEqual(len(wait_unlocked.call_args.args[0]), 2)
+        # The other process failed, both are fetched here
+        self.assertEqual(len(fetch_gaps.call_args.args[3]), 2)
+
+    def test_flights_land_when_fetch_fails(self):
+        args = self.leave_two_gaps()
+        with patch.object(
+            singleflight, "try_lock", side_effect=[True, RuntimeError("db")]
+        ), patch.object(singleflight, "unlock") as unlock:
+            with self.assertRaises(RuntimeError):
+                fetch_missing_data(*args)
+        self.assertEqual(unlock.call_count, 1)
+        self.assertEqual(singleflight._flights, {})
+
+        with patch(
+            "data_ingestion.ohlcv.services.fetch_gaps", side_effect=RuntimeError("api")
+        ):
+            with self.assertRaises(RuntimeError):
+                fetch_missing_data(*args)
+        self.assertEqual(singleflight._flights, {})
+        self.assertFalse(FetchLock.objects.exists())
@@ -0,0 +1,141 @@
+import datetime
+import shutil
+import tempfile
+from unittest import skipIf
+from unittest.mock import patch
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api import cache
+from data_ingestion.ohlcv.services import save_to_db
+from data_ingestion.tests.ingest_test import make_frame
+from market_data import tiers
+from market_data.models import ColdPartition, Stock, StockPrice5Min
+
+URL = "/data/get-ticker/SPY/?timeframe=5min&start=2024-01-01&end=2024-03-01"
+
+
+class ColdTierTestCase(TestCase):
+
+    def setUp(self):
+        self.storage = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage)
+        # npz unless a test picks a format, pyarrow may not be installed
+        settings = override_settings(
+            COLD_STORAGE_DIR=self.storage, COLD_STORAGE_FORMAT="npz"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        tiers.clear()
+        cache.get_cache().clear()
+
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+        save_to_db(
+            make_frame(
+                [
+                    "2024-01-02 09:30",
+                    "2024-01-02 09:35",
+                    "2024-02-01 09:30",
+                    "2024-02-01 09:35",
+                ]
+            ),
+            self.stock,
+            StockPrice5Min,
+        )
+
+    def test_compact_month(self):
+        moved = tiers.compact_month(
+            StockPrice5Min, self.stock, datetime.date(2024, 1, 1)
+        )
+        self.assertEqual(moved, 2)
+        self.assertEqual(StockPrice5Min.objects.count(), 2)
+
+        partition = ColdPartition.objects.get()
+        self.assertEqual(partition.rows, 2)
+        self.assertEqual(
+            partition.path, f"{StockPrice5Min._meta.db_table}/SPY/2024-01.npz"
+        )
+
+        timestamps, values = tiers.read_cold(
+            StockPrice5Min, self.stock.pk, timestamp__gte=datetime.date(2024, 1, 1)
+        )
+        self.assertEqual(len(timestamps), 2)
+        self.assertEqual(values.shape, (2, 5))
+
+    def test_bar_codec_format(self):
+        with override_settings(COLD_STORAGE_FORMAT="bars"):
+            tiers.compact_month(StockPrice5Min, self.stock, datetime.date(2024, 1, 1))
+        self.assertEqual(ColdPartition.objects.get().format, "bars")
+        _, values = tiers.read_cold(StockPrice5Min, self.stock.pk)
+        self.assertEqual(values[:, 3].tolist(), [100.5, 101.5])
+
+    @skipIf(tiers.pq is None, "pyarrow is not installed")
+    def test_parquet_format(self):
+        with override_settings(COLD_STORAGE_FORMAT=""):
+            tiers.compact_month(StockPrice5Min, self.stock, datetime.date(2024, 1, 1))
+        partition = ColdPartition.objects.get()
+        self.assertEqual(partition.format, "parquet")
+        self.assertTrue(partition.path.endswith("/2024-01.parquet"))
+
+        timestamps, values = tiers.read_cold(StockPrice5Min, self.stock.pk)
+        self.assertEqual(timestamps.dtype, "int64")
+        self.assertEqual(
+            pd.to_datetime(timestamps, utc=True).strftime("%H:%M").tolist(),
+            ["14:30", "14:35"],
+        )
+        self.assertEqual(values[:, 3].tolist(), [100.5, 101.5])
+        self.assertEqual(values[:, 4].tolist(), [1000.0, 1010.0])
+
+    def test_compacting_again_merges_the_partition(self):
+        month = datetime.date(2024, 1, 1)
+        tiers.compact_month(StockPrice5Min, self.stock, month)
+        save_to_db(make_frame(["2024-01-03 09:30"]), self.stock, StockPrice5Min)
+        self.assertEqual(tiers.compact_month(StockPrice5Min, self.stock, month), 1)
+        self.assertEqual(ColdPartition.objects.get().rows, 3)
+
+    def test_partitions_outside_the_range_are_skipped(self):
+        tiers.compact_month(StockPrice5Min, self.stock, datetime.date(2024, 1, 1))
+        with patch("market_data.tiers.read_partition") as read_partition:
+            timestamps, _ = tiers.read_cold(
+                StockPrice5Min,
+                self.stock.pk,
+                timestamp__gte=datetime.date(2024, 2, 1),
+                timestamp__lte=datetime.date(2024, 3, 1),
+            )
+        read_partition.assert_not_called()
+        self.assertEqual(len(timestamps), 0)
+
+    def test_merge_rows_prefers_hot_bars(self):
+        cold = [(1, "cold"), (2, "cold"), (4, "cold")]
+        hot = [(2, "hot"), (3, "hot")]
+        self.assertEqual(
+            list(tiers.merge_rows(cold, hot)),
+            [(1, "cold"), (2, "hot"), (3, "hot"), (4, "cold")],
+        )
+
+    @patch("api.views.ensure_data", return_value=True)
+    def test_price_view_reads_both_tiers(self, ensure_data):
+        client = APIClient()
+        before = client.get(URL).json()
+        tiers.compact_month(StockPrice5Min, self.stock, datetime.date(2024, 1, 1))
+        cache.get_cache().clear()
+        self.assertEqual(client.get(URL).json(), before)
+
+        page = client.get(URL + "&limit=3")
+        self.assertEqual(page.json(), before[:3])
+        page = client.get(URL + f"&limit=3&cursor={page['X-Next-Cursor']}")
+        self.assertEqual(page.json(), before[3:])
+
+        streamed = client.get(URL + "&stream=1")
+        self.assertEqual(
+            b"".join(streamed.streaming_content).decode().count("timestamp"), 4
+        )
+
+    def test_compact_bars_command(self):
+        call_command("compact_bars", "--timeframe=5min", "--dry-run")
+        self.assertEqual(StockPrice5Min.objects.count(), 4)
+
+        call_command("compact_bars", "--timeframe=5min", "--older-than-months=1")
+        self.assertEqual(StockPrice5Min.objects.count(), 0)
+        self.assertEqual(ColdPartition.objects.count(), 2)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from django.test import TestCase
+from django.utils import timezone as django_timezone
+from data_ingestion.ohlcv import unobtainable
+from data_ingestion.ohlcv.coverage import to_ns
+from data_ingestion.ohlcv.services import plan_missing_data
+from market_data.models import Stock, StockPrice1D, UnobtainableRange
+
+NO_DATA, ERROR = UnobtainableRange.NO_DATA, UnobtainableRange.ERROR
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class UnobtainableTestCase(TestCase):
+
+    def setUp(self):
+        unobtainable.invalidate()
+        self.stock = Stock.objects.create(symbol="SPY", exchange="NYSE")
+
+    def ranges(self):
+        return [
+            (interval.start.day, interval.end.day, interval.reason)
+            for interval in UnobtainableRange.objects.order_by("start")
+        ]
+
+    def test_record_merges_same_reason(self):
+        record = unobtainable.record_unobtainable
+        record(self.stock, "1D", utc(2025, 1, 2), utc(2025, 1, 3), NO_DATA)
+        record(self.stock, "1D", utc(2025, 1, 7), utc(2025, 1, 8), NO_DATA)
+        self.assertEqual(len(self.ranges()), 2)
+
+        record(self.stock, "1d", utc(2025, 1, 3), utc(2025, 1, 7), NO_DATA)
+        self.assertEqual(self.ranges(), [(2, 8, NO_DATA)])
+
+    def test_record_trims_other_reason(self):
+        record = unobtainable.record_unobtainable
+        record(self.stock, "1d", utc(2025, 1, 2), utc(2025, 1, 10), NO_DATA)
+        record(self.stock, "1d", utc(2025, 1, 5), utc(2025, 1, 6), ERROR)
+        self.assertEqual(
+            self.ranges(),
+            [(2, 4, NO_DATA), (5, 6, ERROR), (6, 10, NO_DATA)],
+        )
+        starts, ends = unobtainable.get_unobtainable(self.stock.pk, "1D")
+        self.assertTrue((starts[1:] > ends[:-1]).all())
+
+    def test_retry_after(self):
+        now = utc(2025, 6, 1)
+        self.assertEqual(
+            unobtainable.retry_after(NO_DATA, utc(2025, 1, 1), now),
+            now + unobtainable.RETRY_AFTER[NO_DATA],
+        )
+        self.assertEqual(
+            unobtainable.retry_after(ERROR, utc(2025, 1, 1), now),
+            now + unobtainable.RETRY_AFTER[ERROR],
+        )
+        # Missing recent bars may still arrive
+        self.assertEqual(
+            unobtainable.retry_after(NO_DATA, now - timedelta(hours=1), now),
+            now + unobtainable.RETRY_AFTER[ERROR],
+        )
+
+    def test_expired_range_is_retried(self):
+        unobtainable.record_unobtainable(
+            self.stock, "1d", utc(2025, 1, 2), utc(2025, 1, 3), ERROR
+        )
+        points = to_ns([utc(2025, 1, 2, 12), utc(2025, 1, 4)])
+        self.assertEqual(
+            unobtainable.is_unobtainable(self.stock.pk, "1d", points).tolist(),
+            [True, False],
+        )
+
+        # Expires from the loaded index, without a reload
+        later = django_timezone.now() + timedelta(minutes=16)
+        with patch.object(unobtainable.timezone, "now", return_value=later):
+            self.assertFalse(
+                unobtainable.is_unobtainable(self.stock.pk, "1d", points).any()
+            )
+            # And an expired row is replaced by a new record
+            unobtainable.record_unobtainable(
+                self.stock, "1d", utc(2025, 1, 3), utc(2025, 1, 4), ERROR
+            )
+        self.assertEqual(self.ranges(), [(3, 4, ERROR)])
+
+    def test_plan_skips_unobtainable(self):
+        args = (self.stock, "1D", utc(2025, 1, 6), utc(2025, 1, 10), StockPrice1D)
+        plan = plan_missing_data(*args, exchange="NYSE")
+        self.assertEqual([(start.day, end.day) for start, end in plan.gaps], [(6, 10)])
+
+        # Session closes of Jan 6th and 7th
+        unobtainable.record_unobtainable(
+            self.stock, "1D", utc(2025, 1, 6), utc(2025, 1, 7, 23), NO_DATA
+        )
+        plan = plan_missing_data(*args, exchange="NYSE")
+        self.assertEqual([(start.day, end.day) for start, end in plan.gaps], [(8, 10)])
+        self.assertIsNone(plan.covered_range)
@@ -4,3 +4,23 @@ from django.apps import AppConfig
 class MarketdataConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "market_data"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from . import barcache, registry, tiers
+        from .models import ColdPartition, Stock
+        from .signals import bars_saved
+
+        post_save.connect(
+            registry.stock_changed, sender=Stock, dispatch_uid="symbol_registry_save"
+        )
+        post_delete.connect(
+            registry.stock_changed, sender=Stock, dispatch_uid="symbol_registry_delete"
+        )
+        post_save.connect(
+            tiers.invalidate, sender=ColdPartition, dispatch_uid="cold_index_save"
+        )
+        post_delete.connect(
+            tiers.invalidate, sender=ColdPartition, dispatch_uid="cold_index_delete"
+        )
+        bars_saved.connect(barcache.append_on_save, dispatch_uid="bar_cache_append")
@@ -0,0 +1,272 @@
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from . import tiers
+
+try:
+    import fcntl
+except ImportError:  # Windows, only writers of the same process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Layout of a cached series file, one record per bar in timestamp order
+BAR_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<i8"),
+    ]
+)
+# Reads of a series in this process before it is written to the cache
+MIN_READS = 3
+# Series kept mapped by this process
+MAPPED_SERIES = 256
+
+_lock = threading.Lock()
+# Writers of this process, flock alone doesn't cover Windows
+_write_lock = threading.Lock()
+# {path: (inode, size, memmap)}
+_mapped: OrderedDict = OrderedDict()
+_reads: defaultdict = defaultdict(int)
+
+
+def enabled() -> bool:
+    return bool(settings.BAR_CACHE_DIR)
+
+
+def series_path(PriceModel, stock_id: int) -> Path:
+    return Path(settings.BAR_CACHE_DIR) / PriceModel._meta.db_table / f"{stock_id}.bars"
+
+
+@contextlib.contextmanager
+def _writing(path: Path):
+    """
+    Hold the write lock of a series file, across processes where flock is
+    available.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _write_lock, open(path.with_suffix(".lock"), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load(PriceModel, stock_id: int) -> np.ndarray | None:
+    """
+    Map the cached series of a stock read-only. Processes mapping the same
+    file share its pages, the map is renewed when the file grows or is
+    replaced.
+
+    Returns None if the series isn't cached.
+    """
+    path = series_path(PriceModel, stock_id)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    key = str(path)
+    with _lock:
+        entry = _mapped.get(key)
+        if entry is not None and entry[:2] == (stat.st_ino, stat.st_size):
+            _mapped.move_to_end(key)
+            return entry[2]
+
+    # An append in progress may have left a partial record
+    count = stat.st_size // BAR_DTYPE.itemsize
+    if count:
+        bars = np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+    else:
+        bars = np.empty(0, dtype=BAR_DTYPE)
+    with _lock:
+        _mapped[key] = (stat.st_ino, stat.st_size, bars)
+        _mapped.move_to_end(key)
+        while len(_mapped) > MAPPED_SERIES:
+            _mapped.popitem(last=False)
+    return bars
+
+
+def clear():
+    with _lock:
+        _mapped.clear()
+        _reads.clear()
+
+
+def drop(PriceModel, stock_id: int):
+    """
+    Delete the cached series of a stock, for writes that change stored bars
+    instead of adding new ones.
+    """
+    if not enabled():
+        return
+    path = series_path(PriceModel, stock_id)
+    with _writing(path):
+        path.unlink(missing_ok=True)
+    logger.info(f"Dropped cached {PriceModel.__name__} bars of {stock_id}")
+
+
+def build(PriceModel, stock_id: int) -> np.ndarray:
+    """
+    Write every stored bar of a series, from both storage tiers, to its
+    cache file.
+
+    Returns the mapped series.
+    """
+    path = series_path(PriceModel, stock_id)
+    # Locked before reading, so an ingest committing meanwhile appends
+    # after the file exists
+    with _writing(path):
+        rows = list(
+            PriceModel.objects.filter(stock_id=stock_id)
+            .order_by("timestamp")
+            .values_list(*tiers.COLUMNS)
+        )
+        timestamps, values = tiers.merge_arrays(
+            tiers.read_cold(PriceModel, stock_id),
+            (
+                pd.to_datetime([row[0] for row in rows], utc=True).as_unit("ns").asi8,
+                np.array([row[1:] for row in rows], dtype=np.float64),
+            ),
+        )
+        fd, temp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(to_records(timestamps, values).tobytes())
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+    logger.info(f"Cached {len(timestamps)} {PriceModel.__name__} bars of {stock_id}")
+    return load(PriceModel, stock_id)
+
+
+def get_series(PriceModel, stock_id: int | None) -> np.ndarray | None:
+    """
+    Get the cached series of a stock, caching it once it was read MIN_READS
+    times by this process.
+
+    Returns None if the series isn't cached (yet).
+    """
+    if not enabled() or stock_id is None:
+        return None
+    bars = load(PriceModel, stock_id)
+    if bars is not None:
+        return bars
+
+    key = (PriceModel._meta.db_table, stock_id)
+    with _lock:
+        _reads[key] += 1
+        if _reads[key] < MIN_READS:
+            return None
+        del _reads[key]
+    return build(PriceModel, stock_id)
+
+
+def read(PriceModel, stock_id: int | None, **filters) -> np.ndarray | None:
+    """
+    Binary-search the cached bars matching timestamp__gt/gte/lt/lte/range
+    filters.
+
+    Returns a view of the cached series, None if it isn't cached.
+    """
+    bars = get_series(PriceModel, stock_id)
+    if bars is None:
+        return None
+    low, high = tiers.lookup_bounds(filters)
+    timestamps = bars["timestamp"]
+    return bars[
+        np.searchsorted(timestamps, low, side="left") : np.searchsorted(
+            timestamps, high, side="right"
+        )
+    ]
+
+
+def to_records(timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Pack (timestamps, OHLCV matrix) into BAR_DTYPE records.
+    """
+    values = np.reshape(values, (-1, 5))
+    records = np.empty(len(timestamps), dtype=BAR_DTYPE)
+    records["timestamp"] = timestamps
+    for position, field in enumerate(tiers.COLUMNS[1:5]):
+        records[field] = values[:, position]
+    records["volume"] = np.rint(values[:, 4])
+    return records
+
+
+def to_rows(bars: np.ndarray) -> list[tuple]:
+    """
+    Cached bars as the tuples of values_list(*tiers.COLUMNS).
+    """
+    index = pd.to_datetime(bars["timestamp"], unit="ns", utc=True).to_pydatetime()
+    fields = [bars[field].tolist() for field in tiers.COLUMNS[1:]]
+    return list(zip(index, *fields))
+
+
+def iter_rows(bars: np.ndarray, chunk_size: int) -> Iterator[tuple]:
+    for offset in range(0, len(bars), chunk_size):
+        yield from to_rows(bars[offset : offset + chunk_size])
+
+
+def append_on_save(sender, stock, start, end, **kwargs):
+    """
+    bars_saved receiver, appends the new bars to the cached series. A series
+    that got bars before its last cached one is dropped instead.
+    """
+    if not enabled():
+        return
+    path = series_path(sender, stock.pk)
+    if not path.exists():
+        return
+
+    with _writing(path):
+        bars = load(sender, stock.pk)
+        if bars is None:
+            return
+        timestamps = bars["timestamp"]
+        hot = sender.objects.filter(stock=stock)
+        if len(timestamps) and tiers.to_ns(start) <= timestamps[-1]:
+            # Same number of bars in the DB and the cache where the saved
+            # range overlaps, else some were inserted in between. Compacted
+            # bars also mismatch, the cache is then just rebuilt
+            last = pd.Timestamp(timestamps[-1], tz="UTC").to_pydatetime()
+            stored = hot.filter(timestamp__gte=start, timestamp__lte=last).count()
+            cached = len(timestamps) - np.searchsorted(timestamps, tiers.to_ns(start))
+            if stored != cached:
+                path.unlink()
+                logger.info(f"Dropped cached {sender.__name__} bars of {stock.pk}")
+                return
+            hot = hot.filter(timestamp__gt=last)
+
+        rows = list(
+            hot.filter(timestamp__lte=end)
+            .order_by("timestamp")
+            .values_list(*tiers.COLUMNS)
+        )
+        if not rows:
+            return
+        records = to_records(
+            pd.to_datetime([row[0] for row in rows], utc=True).as_unit("ns").asi8,
+            np.array([row[1:] for row in rows], dtype=np.float64),
+        )
+        with open(path, "r+b") as file:
+            # Cut a partial record left by an interrupted append
+            file.seek(len(bars) * BAR_DTYPE.itemsize)
+            file.truncate()
+            file.write(records.tobytes())
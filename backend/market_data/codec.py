@@ -0,0 +1,190 @@
+import struct
+import numpy as np
+
+# A payload is a fixed header followed by one stream of LEB128 varints,
+# zig-zag mapped so small negative numbers stay short:
+#   timestamps     delta of delta, in units of 10**exponent ns
+#   close          delta from the previous close, in ticks of 10**-decimals
+#   open/high/low  difference from the close of the same bar, in ticks
+#   volume
+# Regular bars cost a byte for the timestamp and 1-3 bytes per price.
+# Bars whose prices or volumes aren't exact in ticks are encoded losslessly:
+# the prices and the volume are the float64 bit patterns, the volume as a
+# delta from the previous one, at 3-9 bytes per value
+MAGIC = b"BARS"
+VERSION = 2
+# Versions decode reads, 1 is always in ticks
+VERSIONS = (1, 2)
+# Magic, version, decimals, time exponent, number of bars
+HEADER = struct.Struct("<4sBBBI")
+# Finest tick, encode rounds to it only when asked to
+MAX_DECIMALS = 6
+# Decimals of a payload holding float64 bit patterns instead of ticks
+EXACT = 255
+# Largest rounding error (in price units) for a tick size to count as exact
+TICK_TOLERANCE = 1e-9
+# Varint bytes needed for a full uint64
+MAX_VARINT_BYTES = 10
+
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def unzigzag(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.uint64)
+    sign = -(values & np.uint64(1)).view(np.int64)
+    return (values >> np.uint64(1)).view(np.int64) ^ sign
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """
+    LEB128-encode unsigned integers, vectorized over the byte positions.
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    for position in range(1, MAX_VARINT_BYTES):
+        sizes += values >= np.uint64(1) << np.uint64(7 * position)
+    offsets = np.cumsum(sizes) - sizes
+
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for position in range(int(sizes.max(initial=0))):
+        has = sizes > position
+        chunk = (values[has] >> np.uint64(7 * position)) & np.uint64(0x7F)
+        more = (sizes[has] > position + 1).astype(np.uint64) << np.uint64(7)
+        out[offsets[has] + position] = chunk | more
+    return out.tobytes()
+
+
+def decode_varints(data: bytes, count: int) -> np.ndarray:
+    """
+    Decode `count` LEB128 varints.
+
+    Raises ValueError if the data holds a different number of varints.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    last = (raw & 0x80) == 0
+    if int(last.sum()) != count or (len(raw) and not last[-1]):
+        raise ValueError("Corrupt bar payload")
+    if not count:
+        return np.empty(0, dtype=np.uint64)
+
+    starts = np.concatenate(([0], np.flatnonzero(last)[:-1] + 1))
+    owner = np.cumsum(last) - last
+    position = np.arange(len(raw)) - starts[owner]
+    if position.max() >= MAX_VARINT_BYTES:
+        raise ValueError("Corrupt bar payload")
+    parts = (raw & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.bitwise_or.reduceat(parts, starts)
+
+
+def tick_decimals(values: np.ndarray) -> int:
+    """
+    Get the fewest decimals representing every price within TICK_TOLERANCE,
+    MAX_DECIMALS if none do.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    for decimals in range(MAX_DECIMALS):
+        scale = 10.0**decimals
+        if np.all(np.abs(np.rint(values * scale) / scale - values) <= TICK_TOLERANCE):
+            return decimals
+    return MAX_DECIMALS
+
+
+def time_exponent(timestamps: np.ndarray) -> int:
+    """
+    Get the coarsest power of ten (up to seconds) dividing every timestamp.
+    """
+    for exponent in (9, 6, 3):
+        if not np.any(timestamps % 10**exponent):
+            return exponent
+    return 0
+
+
+def is_exact(values: np.ndarray, decimals: int) -> bool:
+    """
+    Check if an OHLCV matrix decodes bit for bit from ticks of `decimals`.
+    """
+    scale = 10.0**decimals
+    prices = values[:, :4]
+    return np.array_equal(np.rint(prices * scale) / scale, prices) and np.array_equal(
+        np.rint(values[:, 4]), values[:, 4]
+    )
+
+
+def encode(
+    timestamps: np.ndarray, values: np.ndarray, decimals: int | None = None
+) -> bytes:
+    """
+    Encode bars given as UTC int64 ns timestamps and an OHLCV matrix. When
+    `decimals` is None the encoding is lossless, in ticks if they are exact
+    else as float64 bit patterns. Given `decimals` prices are rounded to it.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.reshape(np.asarray(values, dtype=np.float64), (-1, 5))
+    if decimals is None:
+        decimals = tick_decimals(values[:, :4])
+        if not is_exact(values, decimals):
+            decimals = EXACT
+    elif not 0 <= decimals <= MAX_DECIMALS:
+        raise ValueError(f"decimals must be from 0 to {MAX_DECIMALS}")
+    exponent = time_exponent(timestamps)
+
+    times = timestamps // 10**exponent
+    if decimals == EXACT:
+        # Close prices are near each other, so are their bit patterns
+        ticks = values[:, :4].view(np.int64)
+        volume = np.diff(values[:, 4].view(np.int64), prepend=0)
+    else:
+        ticks = np.rint(values[:, :4] * 10.0**decimals).astype(np.int64)
+        volume = np.rint(values[:, 4]).astype(np.int64)
+    close = ticks[:, 3]
+    streams = [
+        np.diff(np.diff(times, prepend=0), prepend=0),
+        np.diff(close, prepend=0),
+        ticks[:, 0] - close,
+        ticks[:, 1] - close,
+        ticks[:, 2] - close,
+        volume,
+    ]
+    header = HEADER.pack(MAGIC, VERSION, decimals, exponent, len(timestamps))
+    return header + encode_varints(zigzag(np.concatenate(streams)))
+
+
+def decode(payload: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a payload of encode.
+
+    Returns (UTC int64 ns timestamps, OHLCV float matrix).
+    Raises ValueError if it isn't a bar payload.
+    """
+    if len(payload) < HEADER.size:
+        raise ValueError("Corrupt bar payload")
+    magic, version, decimals, exponent, count = HEADER.unpack_from(payload)
+    if magic != MAGIC or version not in VERSIONS:
+        raise ValueError("Not a bar payload")
+    if decimals > MAX_DECIMALS and (version == 1 or decimals != EXACT):
+        raise ValueError("Corrupt bar payload")
+
+    streams = unzigzag(decode_varints(payload[HEADER.size :], 6 * count))
+    streams = streams.reshape(6, count)
+    timestamps = np.cumsum(np.cumsum(streams[0])) * 10**exponent
+    close = np.cumsum(streams[1])
+
+    values = np.empty((count, 5), dtype=np.float64)
+    if decimals == EXACT:
+        # Wrapping int64 sums undo the differences of the bit patterns
+        for position in range(3):
+            values[:, position] = (streams[position + 2] + close).view(np.float64)
+        values[:, 3] = close.view(np.float64)
+        values[:, 4] = np.cumsum(streams[5]).view(np.float64)
+        return timestamps, values
+
+    scale = 10.0**decimals
+    values[:, 0] = (streams[2] + close) / scale
+    values[:, 1] = (streams[3] + close) / scale
+    values[:, 2] = (streams[4] + close) / scale
+    values[:, 3] = close / scale
+    values[:, 4] = streams[5]
+    return timestamps, values
@@ -0,0 +1,74 @@
+import datetime
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from data_ingestion.ohlcv.services import TIMEFRAME_CONFIG, get_timeframe
+from market_data import tiers
+from market_data.models import Stock
+
+
+class Command(BaseCommand):
+    help = "Move closed months of bars from the price tables to cold storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeframe",
+            action="append",
+            help="Timeframe to compact, repeatable (default: all)",
+        )
+        parser.add_argument(
+            "--symbol", action="append", help="Symbol to compact, repeatable"
+        )
+        parser.add_argument(
+            "--older-than-months",
+            type=int,
+            default=settings.COLD_TIER_AFTER_MONTHS,
+            help="Only compact months ending at least this many months ago",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="List the months without moving them"
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than_months"] < 1:
+            raise CommandError("--older-than-months must be at least 1")
+        # Months before this one are closed and old enough
+        cutoff = (
+            pd.Timestamp(timezone.now().date()).to_period("M")
+            - options["older_than_months"]
+        ).start_time
+        cutoff = cutoff.tz_localize("UTC").to_pydatetime()
+
+        stocks = Stock.objects.order_by("symbol")
+        if options["symbol"]:
+            stocks = stocks.filter(symbol__in=[s.upper() for s in options["symbol"]])
+
+        total = 0
+        for timeframe in options["timeframe"] or list(TIMEFRAME_CONFIG):
+            try:
+                PriceModel = get_timeframe(timeframe, "model")
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            for stock in stocks:
+                months = PriceModel.objects.filter(
+                    stock=stock, timestamp__lt=cutoff
+                ).datetimes("timestamp", "month", tzinfo=datetime.timezone.utc)
+                for month in months:
+                    month = month.date()
+                    if options["dry_run"]:
+                        self.stdout.write(
+                            f"Would compact {stock.symbol} {timeframe} {month:%Y-%m}"
+                        )
+                        continue
+                    moved = tiers.compact_month(PriceModel, stock, month)
+                    total += moved
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"Compacted {moved} bars: {stock.symbol} {timeframe} {month:%Y-%m}"
+                        )
+                    )
+
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"Moved {total} bars to cold storage"))
@@ -0,0 +1,68 @@
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from data_ingestion.ohlcv.services import TIMEFRAME_CONFIG, get_timeframe
+from market_data import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming partitions of the price tables and detach old ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeframe",
+            action="append",
+            help="Timeframe to maintain, repeatable (default: all)",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=partitions.SPANS_AHEAD,
+            help="Partitions to create after the current one",
+        )
+        parser.add_argument(
+            "--detach-older-than-months",
+            type=int,
+            help="Detach partitions ending this many months ago, their bars "
+            "are no longer served (run compact_bars first to keep them)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the changes without making them",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioned price tables need PostgreSQL")
+
+        today = timezone.now().date()
+        detach_before = None
+        if options["detach_older_than_months"] is not None:
+            detach_before = (
+                pd.Timestamp(today).to_period("M") - options["detach_older_than_months"]
+            ).start_time.date()
+
+        for timeframe in options["timeframe"] or list(TIMEFRAME_CONFIG):
+            try:
+                table = get_timeframe(timeframe, "model")._meta.db_table
+                created, detached = partitions.maintain(
+                    table,
+                    today,
+                    ahead=options["ahead"],
+                    detach_before=detach_before,
+                    dry_run=options["dry_run"],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            prefix = "Would " if options["dry_run"] else ""
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f"{prefix}Create {name}"))
+            for name, archive in detached:
+                self.stdout.write(
+                    self.style.WARNING(f"{prefix}Detach {name} as {archive}")
+                )
+            if not created and not detached:
+                self.stdout.write(f"{timeframe}: up to date")
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_data", "0004_fetchjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeriesState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timeframe", models.CharField(max_length=10)),
+                ("version", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="market_data.stock",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("stock", "timeframe")},
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_data", "0005_seriesstate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stockprice15min",
+            name="seq",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="stockprice1d",
+            name="seq",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="stockprice1h",
+            name="seq",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="stockprice1month",
+            name="seq",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="stockprice5min",
+            name="seq",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="stockprice15min",
+            index=models.Index(
+                fields=["stock", "seq"], name="market_data_stock_i_8bbb7e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockprice1d",
+            index=models.Index(
+                fields=["stock", "seq"], name="market_data_stock_i_57f7f3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockprice1h",
+            index=models.Index(
+                fields=["stock", "seq"], name="market_data_stock_i_c2ff05_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockprice1month",
+            index=models.Index(
+                fields=["stock", "seq"], name="market_data_stock_i_4bdb91_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockprice5min",
+            index=models.Index(
+                fields=["stock", "seq"], name="market_data_stock_i_d25c3b_idx"
+            ),
+        ),
+    ]
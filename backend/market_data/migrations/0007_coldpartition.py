@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_data", "0006_bar_seq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ColdPartition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("table", models.CharField(max_length=100)),
+                ("month", models.DateField()),
+                ("start", models.DateTimeField()),
+                ("end", models.DateTimeField()),
+                ("rows", models.IntegerField()),
+                ("path", models.CharField(max_length=255)),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("parquet", "Parquet"), ("npz", "NumPy npz")],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="market_data.stock",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("table", "stock", "month")},
+            },
+        ),
+    ]
@@ -0,0 +1,146 @@
+import datetime
+from django.db import migrations
+
+# Frozen copy of market_data.partitions as of this migration, later changes
+# to the runtime module must not change what it did
+
+# Time span of one partition per price table
+SPANS = {
+    "market_data_stockprice5min": "month",
+    "market_data_stockprice15min": "month",
+    "market_data_stockprice1h": "year",
+    "market_data_stockprice1d": "year",
+    "market_data_stockprice1month": "year",
+}
+# Spans created ahead of the current one
+SPANS_AHEAD = 3
+
+
+def next_span(span, start):
+    if span == "year":
+        return datetime.date(start.year + 1, 1, 1)
+    return datetime.date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(table, span, start):
+    return f"{table}_p{start:%Y%m}" if span == "month" else f"{table}_p{start:%Y}"
+
+
+def bound(day):
+    return f"'{day.isoformat()} 00:00:00+00'"
+
+
+def partition_table(connection, table, span, today):
+    """
+    Turn a price table into one range-partitioned by timestamp, with a
+    default partition, a partition per span holding bars and SPANS_AHEAD
+    future ones, keeping its rows, constraints and index names.
+    """
+    quote = connection.ops.quote_name
+    timestamp = quote("timestamp")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c "
+            "ON c.oid = p.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        if cursor.fetchone() is not None:
+            return
+
+        # NOT NULL constraints (PostgreSQL 18) come along with LIKE
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype <> 'n'",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+            "AND indexname NOT IN "
+            "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [table, table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('{span}', {timestamp} "
+            f"AT TIME ZONE 'UTC')::date FROM {quote(table)}"
+        )
+        starts = {row[0] for row in cursor.fetchall()}
+        if span == "month":
+            start = datetime.date(today.year, today.month, 1)
+        else:
+            start = datetime.date(today.year, 1, 1)
+        for _ in range(SPANS_AHEAD + 1):
+            starts.add(start)
+            start = next_span(span, start)
+
+        old = f"{table}_unpartitioned"
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        # The identity of the id column is replaced by a sequence, identity
+        # columns need PostgreSQL 17 on partitioned tables
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({timestamp})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {quote(f'{table}_default')} "
+            f"PARTITION OF {quote(table)} DEFAULT"
+        )
+        # The default partition is still empty, no rows to move
+        for start in sorted(starts):
+            cursor.execute(
+                f"CREATE TABLE {quote(partition_name(table, span, start))} "
+                f"PARTITION OF {quote(table)} FOR VALUES "
+                f"FROM ({bound(start)}) TO ({bound(next_span(span, start))})"
+            )
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        cursor.execute(f"DROP TABLE {quote(old)}")
+
+        sequence = quote(f"{table}_id_seq")
+        cursor.execute(
+            f"CREATE SEQUENCE {sequence} OWNED BY {quote(table)}.{quote('id')}"
+        )
+        cursor.execute(
+            f"SELECT setval('{sequence}', COALESCE(MAX({quote('id')}), 0) + 1, false) "
+            f"FROM {quote(table)}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN {quote('id')} "
+            f"SET DEFAULT nextval('{sequence}')"
+        )
+
+        for name, type, definition in constraints:
+            if type == "p":
+                definition = f"PRIMARY KEY ({quote('id')}, {timestamp})"
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+        for name, definition in indexes:
+            cursor.execute(definition)
+        # Bars are inserted roughly in time order, so block ranges summarize
+        # each partition in a few pages
+        cursor.execute(
+            f"CREATE INDEX {quote(f'{table}_timestamp_brin')} ON {quote(table)} "
+            f"USING brin ({timestamp})"
+        )
+
+
+def partition_price_tables(apps, schema_editor):
+    # SQLite keeps plain tables
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, span in SPANS.items():
+        partition_table(schema_editor.connection, table, span, datetime.date.today())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_data", "0007_coldpartition"),
+    ]
+
+    operations = [
+        # Partitioned tables keep working unchanged for the ORM, nothing
+        # to undo on the way back
+        migrations.RunPython(partition_price_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_data", "0008_partition_price_tables"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="coldpartition",
+            name="format",
+            field=models.CharField(
+                choices=[
+                    ("parquet", "Parquet"),
+                    ("npz", "NumPy npz"),
+                    ("bars", "Bar codec"),
+                ],
+                max_length=10,
+            ),
+        ),
+    ]
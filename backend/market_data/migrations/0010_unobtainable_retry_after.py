@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market_data", "0009_coldpartition_bars_format"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="unobtainablerange",
+            name="retry_after",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,4 +1,6 @@
+import uuid
 from django.db import models
+from django.utils import timezone
 
 
 class Stock(models.Model):
@@ -23,12 +25,23 @@ class StockMetadata(models.Model):
 
 
 class UnobtainableRange(models.Model):
+    """
+    A merged [start, end] interval no provider could deliver, skipped by
+    fetches until `retry_after`.
+    """
+
+    # Every provider answered without bars, e.g. a holiday or before listing
+    NO_DATA = "no_data"
+    # A provider failed, e.g. an outage or rate limit
+    ERROR = "error"
+
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
     timeframe = models.CharField(max_length=10)
     start = models.DateTimeField()
     end = models.DateTimeField()
     reason = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    retry_after = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ["stock", "timeframe", "start", "end"]
@@ -37,6 +50,112 @@ class UnobtainableRange(models.Model):
         ]
 
 
+class BarCoverage(models.Model):
+    """
+    A merged [start, end] interval of bars known to be stored.
+    """
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
+    timeframe = models.CharField(max_length=10)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["stock", "timeframe", "start", "end"]),
+        ]
+
+
+class SeriesState(models.Model):
+    """
+    Write counter of a (stock, timeframe) series, bumped by every ingest
+    that inserts bars. Clients see it as the ETag of price responses.
+    """
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
+    timeframe = models.CharField(max_length=10)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("stock", "timeframe")
+
+
+class FetchLock(models.Model):
+    """
+    Cross-process lock held while a gap is being fetched.
+    """
+
+    key = models.CharField(max_length=200, unique=True)
+    owner = models.CharField(max_length=100)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class FetchJob(models.Model):
+    """
+    Background fill of the bars a request found missing.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    # Handed to clients, not guessable like an auto id
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    symbol = models.CharField(max_length=10)
+    timeframe = models.CharField(max_length=10)
+    start = models.DateField()
+    end = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["symbol", "timeframe", "start", "end", "status"]),
+        ]
+
+
+class ColdPartition(models.Model):
+    """
+    A closed month of a stock's bars compacted out of a price table into a
+    columnar file under COLD_STORAGE_DIR.
+    """
+
+    PARQUET = "parquet"
+    NPZ = "npz"
+    BARS = "bars"
+    FORMAT_CHOICES = [(PARQUET, "Parquet"), (NPZ, "NumPy npz"), (BARS, "Bar codec")]
+
+    # db_table of the price model the bars came from
+    table = models.CharField(max_length=100)
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
+    month = models.DateField()
+    # First and last bar in the file, reads skip partitions outside the range
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    rows = models.IntegerField()
+    # Relative to COLD_STORAGE_DIR
+    path = models.CharField(max_length=255)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("table", "stock", "month")
+
+
 class BasePrice(models.Model):
     stock = models.ForeignKey(Stock, on_delete=models.CASCADE)
     timestamp = models.DateTimeField()
@@ -45,12 +164,15 @@ class BasePrice(models.Model):
     low = models.FloatField()
     close = models.FloatField()
     volume = models.BigIntegerField()
+    # Version of the series (SeriesState) whose ingest inserted the bar
+    seq = models.BigIntegerField(default=0)
 
     class Meta:
         abstract = True
         unique_together = ("stock", "timestamp")
         indexes = [
             models.Index(fields=["stock", "timestamp"]),
+            models.Index(fields=["stock", "seq"]),
         ]
 
 
@@ -0,0 +1,325 @@
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from django.db import connection as default_connection, transaction
+from .models import (
+    BarCoverage,
+    StockPrice5Min,
+    StockPrice15Min,
+    StockPrice1H,
+    StockPrice1D,
+    StockPrice1Month,
+)
+
+logger = logging.getLogger(__name__)
+
+# Time span of one partition per price table on PostgreSQL, the finer
+# timeframes hold far more rows per span
+SPANS = {
+    StockPrice5Min._meta.db_table: "month",
+    StockPrice15Min._meta.db_table: "month",
+    StockPrice1H._meta.db_table: "year",
+    StockPrice1D._meta.db_table: "year",
+    StockPrice1Month._meta.db_table: "year",
+}
+# BarCoverage timeframe of each price table
+TIMEFRAMES = {
+    StockPrice5Min._meta.db_table: "5min",
+    StockPrice15Min._meta.db_table: "15min",
+    StockPrice1H._meta.db_table: "1h",
+    StockPrice1D._meta.db_table: "1d",
+    StockPrice1Month._meta.db_table: "1month",
+}
+# Spans created ahead of the current one
+SPANS_AHEAD = 3
+
+
+def span_start(span: str, day: date) -> date:
+    return date(day.year, day.month, 1) if span == "month" else date(day.year, 1, 1)
+
+
+def next_span(span: str, start: date) -> date:
+    if span == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(table: str, span: str, start: date) -> str:
+    return f"{table}_p{start:%Y%m}" if span == "month" else f"{table}_p{start:%Y}"
+
+
+def default_partition(table: str) -> str:
+    # Catches bars of spans without a partition, e.g. old history backfills
+    return f"{table}_default"
+
+
+def archive_name(cursor, name: str, today: date) -> str:
+    """
+    Get a free name for a partition detached `today`, so that its span can
+    be created again under the partition name.
+    """
+    base = f"{name}_d{today:%Y%m%d}"
+    cursor.execute(
+        "SELECT relname FROM pg_class WHERE relname LIKE %s",
+        [base.replace("_", r"\_") + "%"],
+    )
+    taken = {row[0] for row in cursor.fetchall()}
+    archive, suffix = base, 1
+    while archive in taken:
+        suffix += 1
+        archive = f"{base}_{suffix}"
+    return archive
+
+
+def trim_coverage(table: str, start: date, end: date, using: str = "default"):
+    """
+    Cut [start, end) out of the BarCoverage intervals of a table's
+    timeframe, its bars are no longer stored once the span is detached.
+    """
+    low = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    high = datetime(end.year, end.month, end.day, tzinfo=timezone.utc)
+    intervals = BarCoverage.objects.using(using).select_for_update()
+    for interval in intervals.filter(
+        timeframe=TIMEFRAMES[table], start__lt=high, end__gte=low
+    ):
+        # Interval ends are inclusive, down to the microsecond
+        pieces = []
+        if interval.start < low:
+            pieces.append((interval.start, low - timedelta(microseconds=1)))
+        if interval.end >= high:
+            pieces.append((high, interval.end))
+        interval.delete()
+        BarCoverage.objects.using(using).bulk_create(
+            BarCoverage(
+                stock_id=interval.stock_id,
+                timeframe=interval.timeframe,
+                start=piece_start,
+                end=piece_end,
+            )
+            for piece_start, piece_end in pieces
+        )
+
+
+def parse_partition(table: str, name: str) -> date | None:
+    """
+    Get the span start of a partition created by this module.
+    """
+    match = re.fullmatch(re.escape(table) + r"_p(\d{4})(\d{2})?", name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2] or 1), 1)
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = %s",
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def list_partitions(cursor, table: str) -> dict[date, str]:
+    """
+    Get the span partitions of a table by span start, the default partition
+    excluded.
+    """
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+        [table],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        start = parse_partition(table, name)
+        if start is not None:
+            partitions[start] = name
+    return partitions
+
+
+def _bound(day: date) -> str:
+    return f"'{day.isoformat()} 00:00:00+00'"
+
+
+def create_partition(cursor, quote, table: str, span: str, start: date) -> bool:
+    """
+    Create the partition of a span, moving its bars out of the default
+    partition. Must run inside a transaction.
+
+    Returns true if it was created.
+    """
+    name = partition_name(table, span, start)
+    if start in list_partitions(cursor, table):
+        return False
+
+    timestamp = quote("timestamp")
+    bounds = (
+        f"{timestamp} >= {_bound(start)} AND "
+        f"{timestamp} < {_bound(next_span(span, start))}"
+    )
+    default = quote(default_partition(table))
+    create = (
+        f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES "
+        f"FROM ({_bound(start)}) TO ({_bound(next_span(span, start))})"
+    )
+    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {bounds})")
+    if not cursor.fetchone()[0]:
+        cursor.execute(create)
+        return True
+
+    # The span would overlap rows of the default partition, take it out
+    # while they are moved
+    cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {default}")
+    cursor.execute(create)
+    cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {default} WHERE {bounds}")
+    cursor.execute(f"DELETE FROM {default} WHERE {bounds}")
+    cursor.execute(f"ALTER TABLE {quote(table)} ATTACH PARTITION {default} DEFAULT")
+    return True
+
+
+def partition_table(connection, table: str, span: str, today: date):
+    """
+    Turn a price table into one range-partitioned by timestamp, with a
+    partition per span holding bars and SPANS_AHEAD future ones, keeping
+    its rows, constraints and index names. Must run inside a transaction.
+
+    The primary key becomes (id, timestamp) since every unique key of a
+    partitioned table has to include the partition key, a BRIN index on
+    timestamp is added.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            return
+
+        # NOT NULL constraints (PostgreSQL 18) come along with LIKE
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype <> 'n'",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+            "AND indexname NOT IN "
+            "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [table, table],
+        )
+        indexes = cursor.fetchall()
+        trunc = "month" if span == "month" else "year"
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('{trunc}', {quote('timestamp')} "
+            f"AT TIME ZONE 'UTC')::date FROM {quote(table)}"
+        )
+        starts = {row[0] for row in cursor.fetchall()}
+        start = span_start(span, today)
+        for _ in range(SPANS_AHEAD + 1):
+            starts.add(start)
+            start = next_span(span, start)
+
+        old = f"{table}_unpartitioned"
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        # The identity of the id column is replaced by a sequence, identity
+        # columns need PostgreSQL 17 on partitioned tables
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({quote('timestamp')})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {quote(default_partition(table))} "
+            f"PARTITION OF {quote(table)} DEFAULT"
+        )
+        for start in sorted(starts):
+            create_partition(cursor, quote, table, span, start)
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        cursor.execute(f"DROP TABLE {quote(old)}")
+
+        sequence = quote(f"{table}_id_seq")
+        cursor.execute(
+            f"CREATE SEQUENCE {sequence} OWNED BY {quote(table)}.{quote('id')}"
+        )
+        cursor.execute(
+            f"SELECT setval('{sequence}', COALESCE(MAX({quote('id')}), 0) + 1, false) "
+            f"FROM {quote(table)}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN {quote('id')} "
+            f"SET DEFAULT nextval('{sequence}')"
+        )
+
+        for name, type, definition in constraints:
+            if type == "p":
+                definition = f"PRIMARY KEY ({quote('id')}, {quote('timestamp')})"
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+        for name, definition in indexes:
+            cursor.execute(definition)
+        # Bars are inserted roughly in time order, so block ranges summarize
+        # each partition in a few pages
+        cursor.execute(
+            f"CREATE INDEX {quote(f'{table}_timestamp_brin')} ON {quote(table)} "
+            f"USING brin ({quote('timestamp')})"
+        )
+    logger.info(f"Partitioned {table} by {span}")
+
+
+def maintain(
+    table: str,
+    today: date,
+    ahead: int = SPANS_AHEAD,
+    detach_before: date | None = None,
+    dry_run: bool = False,
+    connection=default_connection,
+) -> tuple[list[str], list[tuple[str, str]]]:
+    """
+    Create the partitions of the coming spans and of the spans found in the
+    default partition, detach the ones ending before `detach_before`.
+    Detached partitions are renamed to a free archive name and their spans
+    are cut out of the bar coverage.
+
+    Returns the names of the created partitions and the (partition,
+    archive) names of the detached ones.
+    """
+    span = SPANS[table]
+    quote = connection.ops.quote_name
+    created, detached = [], []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            raise ValueError(f"{table} is not partitioned")
+
+        trunc = "month" if span == "month" else "year"
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('{trunc}', {quote('timestamp')} "
+            f"AT TIME ZONE 'UTC')::date FROM {quote(default_partition(table))}"
+        )
+        starts = {row[0] for row in cursor.fetchall()}
+        start = span_start(span, today)
+        for _ in range(ahead + 1):
+            starts.add(start)
+            start = next_span(span, start)
+
+        existing = list_partitions(cursor, table)
+        for start in sorted(starts - set(existing)):
+            created.append(partition_name(table, span, start))
+            if not dry_run:
+                create_partition(cursor, quote, table, span, start)
+
+        if detach_before is not None:
+            for start, name in sorted(existing.items()):
+                if next_span(span, start) > detach_before:
+                    break
+                archive = archive_name(cursor, name, today)
+                detached.append((name, archive))
+                if dry_run:
+                    continue
+                # Left as a standalone table to archive or drop
+                cursor.execute(
+                    f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}"
+                )
+                cursor.execute(f"ALTER TABLE {quote(name)} RENAME TO {quote(archive)}")
+                trim_coverage(
+                    table, start, next_span(span, start), using=connection.alias
+                )
+    return created, detached
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from typing import NamedTuple
+from .models import Stock
+
+logger = logging.getLogger(__name__)
+
+# Seconds an entry is trusted, bounds staleness from other processes'
+# writes since the signals only reach this one
+REGISTRY_TTL = 5 * 60
+
+
+class SymbolInfo(NamedTuple):
+    id: int
+    symbol: str
+    exchange: str | None
+
+
+_lock = threading.Lock()
+_entries: dict[str, tuple[SymbolInfo, float]] = {}
+_warmed = False
+
+
+def normalize(symbol: str) -> str:
+    return symbol.strip().upper()
+
+
+def resolve(symbol: str) -> SymbolInfo | None:
+    """
+    Resolve a symbol to its stock id and exchange, from memory when
+    possible. The first call loads every stock.
+
+    Returns None for unknown symbols.
+    """
+    global _warmed
+    key = normalize(symbol)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and now - entry[1] < REGISTRY_TTL:
+            return entry[0]
+        warm = not _warmed
+
+    if warm:
+        rows = list(Stock.objects.values_list("id", "symbol", "exchange"))
+        with _lock:
+            for row in rows:
+                info = SymbolInfo(*row)
+                _entries[normalize(info.symbol)] = (info, now)
+            _warmed = True
+            entry = _entries.get(key)
+        logger.debug(f"Symbol registry warmed with {len(rows)} stocks")
+        if entry is not None:
+            return entry[0]
+
+    row = (
+        Stock.objects.filter(symbol__iexact=key)
+        .values_list("id", "symbol", "exchange")
+        .first()
+    )
+    if row is None:
+        # Not cached, the stock may be created by the next metadata fetch
+        return None
+    info = SymbolInfo(*row)
+    with _lock:
+        _entries[key] = (info, now)
+    return info
+
+
+def resolve_id(symbol: str) -> int | None:
+    info = resolve(symbol)
+    return info.id if info else None
+
+
+def invalidate(stock_id: int | None = None, symbol: str | None = None):
+    """
+    Drop the entries of a stock.
+    """
+    with _lock:
+        if symbol is not None:
+            _entries.pop(normalize(symbol), None)
+        if stock_id is not None:
+            for key in [k for k, (info, _) in _entries.items() if info.id == stock_id]:
+                del _entries[key]
+
+
+def clear():
+    global _warmed
+    with _lock:
+        _entries.clear()
+        _warmed = False
+
+
+def stock_changed(sender, instance, **kwargs):
+    """
+    post_save / post_delete receiver of Stock.
+    """
+    invalidate(instance.pk, instance.symbol)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by the ingest path once new bars are committed, with the `stock`,
+# `timeframe`, `start` and `end` (datetimes) of the saved bars and the number
+# of rows `inserted`. The sender is the price model.
+bars_saved = Signal()
@@ -0,0 +1,346 @@
+import heapq
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from . import codec
+from .models import ColdPartition
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional, partitions are written as compressed .npz
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Columns of a partition, same order as the price API rows
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+# Seconds the partition index is trusted, bounds staleness from compactions
+# run by other processes since the signals only reach this one
+INDEX_TTL = 60
+# Decoded partitions kept in memory
+LOADED_PARTITIONS = 64
+
+
+class Partition(NamedTuple):
+    start: int
+    end: int
+    path: str
+    format: str
+
+
+_lock = threading.Lock()
+# {table: ({stock_id: [Partition]}, loaded at)}
+_index: dict[str, tuple[dict[int, list[Partition]], float]] = {}
+# {(path, mtime_ns): (timestamps, values)}
+_loaded: OrderedDict = OrderedDict()
+
+
+def storage_dir() -> Path:
+    return Path(settings.COLD_STORAGE_DIR)
+
+
+def to_ns(value) -> int:
+    """
+    Convert a date or datetime lookup value to UTC int64 ns, dates are
+    midnight UTC like in the ORM.
+    """
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    stamp = pd.Timestamp(value)
+    stamp = stamp.tz_localize("UTC") if stamp.tz is None else stamp.tz_convert("UTC")
+    return stamp.as_unit("ns").value
+
+
+def lookup_bounds(filters: dict) -> tuple[int, int]:
+    """
+    Turn timestamp__gt/gte/lt/lte/range lookups into inclusive UTC int64 ns
+    bounds, a strict bound is moved by 1 ns.
+    """
+    low, high = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+    for lookup, value in filters.items():
+        if lookup == "timestamp__range":
+            low, high = max(low, to_ns(value[0])), min(high, to_ns(value[1]))
+        elif lookup == "timestamp__gte":
+            low = max(low, to_ns(value))
+        elif lookup == "timestamp__gt":
+            low = max(low, to_ns(value) + 1)
+        elif lookup == "timestamp__lte":
+            high = min(high, to_ns(value))
+        elif lookup == "timestamp__lt":
+            high = min(high, to_ns(value) - 1)
+        else:
+            raise ValueError(f"Unsupported timestamp filter '{lookup}'")
+    return low, high
+
+
+def get_partitions(PriceModel, stock_id: int) -> list[Partition]:
+    """
+    Get the cold partitions of a stock in a price table, oldest first. The
+    index of the table is loaded in one query and kept for INDEX_TTL.
+    """
+    table = PriceModel._meta.db_table
+    now = time.monotonic()
+    with _lock:
+        entry = _index.get(table)
+        if entry is not None and now - entry[1] < INDEX_TTL:
+            return entry[0].get(stock_id, [])
+
+    index = {}
+    rows = (
+        ColdPartition.objects.filter(table=table)
+        .order_by("start")
+        .values_list("stock_id", "start", "end", "path", "format")
+    )
+    for row_stock, start, end, path, format in rows:
+        index.setdefault(row_stock, []).append(
+            Partition(to_ns(start), to_ns(end), path, format)
+        )
+    with _lock:
+        _index[table] = (index, now)
+    return index.get(stock_id, [])
+
+
+def invalidate(sender=None, instance=None, **kwargs):
+    """
+    Drop the partition index, also the post_save / post_delete receiver of
+    ColdPartition.
+    """
+    with _lock:
+        if instance is not None:
+            _index.pop(instance.table, None)
+        else:
+            _index.clear()
+
+
+def clear():
+    with _lock:
+        _index.clear()
+        _loaded.clear()
+
+
+def write_partition(
+    path: str, timestamps: np.ndarray, values: np.ndarray
+) -> tuple[str, str]:
+    """
+    Write bars to a partition file in the COLD_STORAGE_FORMAT, by default
+    Parquet, or npz when pyarrow is missing. `path` has no extension. The file is
+    replaced atomically.
+
+    Returns (path with extension, format).
+    """
+    format = settings.COLD_STORAGE_FORMAT
+    if not format and pq is None:
+        logger.warning(
+            "pyarrow is not installed, writing cold partitions as npz. "
+            "Install requirements.txt or set COLD_STORAGE_FORMAT."
+        )
+        format = ColdPartition.NPZ
+    elif not format:
+        format = ColdPartition.PARQUET
+    if format not in dict(ColdPartition.FORMAT_CHOICES):
+        raise ValueError(f"Unknown cold storage format '{format}'")
+    if format == ColdPartition.PARQUET and pq is None:
+        raise RuntimeError("pyarrow is required to write Parquet partitions")
+    path = f"{path}.{format}"
+    target = storage_dir() / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    fd, temp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            if format == ColdPartition.PARQUET:
+                # Row group statistics keep the min/max timestamp in the footer
+                columns = {
+                    "timestamp": pa.array(timestamps, type=pa.timestamp("ns", "UTC"))
+                }
+                for position, field in enumerate(COLUMNS[1:5]):
+                    columns[field] = pa.array(values[:, position])
+                columns["volume"] = pa.array(np.rint(values[:, 4]).astype(np.int64))
+                pq.write_table(pa.table(columns), file, compression="zstd")
+            elif format == ColdPartition.BARS:
+                file.write(codec.encode(timestamps, values))
+            else:
+                np.savez_compressed(file, timestamp=timestamps, values=values)
+        os.replace(temp, target)
+    except BaseException:
+        os.unlink(temp)
+        raise
+    return path, format
+
+
+def read_partition(partition: Partition) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Read a partition file, from memory when it was read recently.
+
+    Returns (UTC int64 ns timestamps, OHLCV float matrix).
+    """
+    target = storage_dir() / partition.path
+    key = (partition.path, target.stat().st_mtime_ns)
+    with _lock:
+        if key in _loaded:
+            _loaded.move_to_end(key)
+            return _loaded[key]
+
+    if partition.format == ColdPartition.PARQUET:
+        if pq is None:
+            raise RuntimeError(f"pyarrow is required to read {partition.path}")
+        table = pq.read_table(target)
+        timestamps = table.column("timestamp").cast(pa.int64()).to_numpy()
+        values = np.column_stack(
+            [table.column(field).to_numpy().astype(np.float64) for field in COLUMNS[1:]]
+        )
+    elif partition.format == ColdPartition.BARS:
+        timestamps, values = codec.decode(target.read_bytes())
+    else:
+        with np.load(target) as file:
+            timestamps, values = file["timestamp"], file["values"]
+
+    with _lock:
+        _loaded[key] = (timestamps, values)
+        while len(_loaded) > LOADED_PARTITIONS:
+            _loaded.popitem(last=False)
+    return timestamps, values
+
+
+def read_cold(PriceModel, stock_id: int, **filters) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Read the cold bars of a stock matching timestamp__gt/gte/lt/lte/range
+    filters, skipping the partitions outside them.
+
+    Returns (UTC int64 ns timestamps, OHLCV float matrix) in timestamp order.
+    """
+    low, high = lookup_bounds(filters)
+    pieces = [
+        read_partition(partition)
+        for partition in get_partitions(PriceModel, stock_id)
+        if partition.end >= low and partition.start <= high
+    ]
+    if not pieces:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5))
+
+    timestamps = np.concatenate([piece[0] for piece in pieces])
+    values = np.concatenate([piece[1] for piece in pieces])
+    keep = (timestamps >= low) & (timestamps <= high)
+    return timestamps[keep], values[keep]
+
+
+def to_rows(timestamps: np.ndarray, values: np.ndarray) -> list[tuple]:
+    """
+    Cold bars as the tuples of values_list(*COLUMNS).
+    """
+    index = pd.to_datetime(timestamps, unit="ns", utc=True).to_pydatetime()
+    return [
+        (timestamp, *row[:4], int(round(row[4])))
+        for timestamp, row in zip(index, values.tolist())
+    ]
+
+
+def merge_rows(cold: Iterable[tuple], hot: Iterable[tuple]) -> Iterator[tuple]:
+    """
+    Merge two timestamp-ordered row iterables, the hot row wins when both
+    tiers hold a bar.
+    """
+    merged = heapq.merge(
+        ((row[0], 0, row) for row in hot), ((row[0], 1, row) for row in cold)
+    )
+    last = None
+    for timestamp, _, row in merged:
+        if timestamp != last:
+            last = timestamp
+            yield row
+
+
+def merge_arrays(
+    cold: tuple[np.ndarray, np.ndarray], hot: tuple[np.ndarray, np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge (timestamps, values) of both tiers in timestamp order, the hot bar
+    wins when both tiers hold a bar.
+    """
+    if not len(cold[0]):
+        return hot
+    timestamps = np.concatenate([hot[0], cold[0]])
+    values = np.concatenate([np.reshape(hot[1], (-1, 5)), cold[1]])
+    # np.unique keeps the first occurrence, a hot bar
+    timestamps, first = np.unique(timestamps, return_index=True)
+    return timestamps, values[first]
+
+
+def partition_path(PriceModel, symbol: str, month: date) -> str:
+    return f"{PriceModel._meta.db_table}/{symbol.upper()}/{month:%Y-%m}"
+
+
+def compact_month(PriceModel, stock, month: date) -> int:
+    """
+    Move a closed month of a stock's bars from the price table into its
+    partition, merged with the bars already compacted.
+
+    Returns the number of rows moved.
+    """
+    start = pd.Timestamp(month, tz="UTC")
+    end = start + pd.offsets.MonthBegin(1)
+    hot = PriceModel.objects.filter(
+        stock=stock,
+        timestamp__gte=start.to_pydatetime(),
+        timestamp__lt=end.to_pydatetime(),
+    )
+    rows = list(hot.order_by("timestamp").values_list("pk", *COLUMNS))
+    if not rows:
+        return 0
+
+    pks = [row[0] for row in rows]
+    timestamps = pd.to_datetime([row[1] for row in rows], utc=True).as_unit("ns").asi8
+    values = np.array([row[2:] for row in rows], dtype=np.float64)
+    table = PriceModel._meta.db_table
+    existing = ColdPartition.objects.filter(
+        table=table, stock=stock, month=month
+    ).first()
+    if existing is not None:
+        cold = read_partition(
+            Partition(
+                to_ns(existing.start),
+                to_ns(existing.end),
+                existing.path,
+                existing.format,
+            )
+        )
+        timestamps, values = merge_arrays(cold, (timestamps, values))
+
+    # Written before the rows are deleted, if the transaction fails the file
+    # only adds bars that are still hot, and hot bars win on reads
+    path, format = write_partition(
+        partition_path(PriceModel, stock.symbol, month), timestamps, values
+    )
+    with transaction.atomic():
+        ColdPartition.objects.update_or_create(
+            table=table,
+            stock=stock,
+            month=month,
+            defaults={
+                "start": pd.Timestamp(timestamps[0], tz="UTC").to_pydatetime(),
+                "end": pd.Timestamp(timestamps[-1], tz="UTC").to_pydatetime(),
+                "rows": len(timestamps),
+                "path": path,
+                "format": format,
+            },
+        )
+        # Only the rows written, bars ingested meanwhile stay hot
+        hot.filter(pk__in=pks).delete()
+
+    if existing is not None and existing.path != path:
+        (storage_dir() / existing.path).unlink(missing_ok=True)
+    logger.info(f"Compacted {len(pks)} {table} bars of {stock.symbol} {month:%Y-%m}")
+    return len(pks)
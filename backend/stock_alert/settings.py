@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     "market_data.apps.MarketdataConfig",
     "strategies.apps.StrategiesConfig",
     "users.apps.UsersConfig",
+    "api.apps.ApiConfig",
     "crispy_forms",
     "crispy_bootstrap5",
     "rest_framework",
@@ -98,6 +99,18 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+# Production profile, the price tables are partitioned by time there
+# (market_data migration 0008, manage.py partition_bars)
+if os.environ.get("POSTGRES_DB"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("POSTGRES_DB"),
+        "USER": os.environ.get("POSTGRES_USER", ""),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "HOST": os.environ.get("POSTGRES_HOST", ""),
+        "PORT": os.environ.get("POSTGRES_PORT", ""),
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
+    }
 
 
 # Password validation
@@ -150,6 +163,33 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 LOGIN_REDIRECT_URL = "strategies-home"
 LOGIN_URL = "login"
 
+# Gaps downloaded concurrently by a single ensure_data call
+OHLCV_FETCH_CONCURRENCY = int(os.environ.get("OHLCV_FETCH_CONCURRENCY", 4))
+# Threads running provider fetches for the async price endpoint, requests
+# beyond that wait on the event loop without holding a worker
+OHLCV_ASYNC_FETCH_WORKERS = int(os.environ.get("OHLCV_ASYNC_FETCH_WORKERS", 32))
+# Threads running background fetch jobs of ?wait=false requests
+OHLCV_JOB_WORKERS = int(os.environ.get("OHLCV_JOB_WORKERS", 4))
+
+# Price API responses are cached in their own alias so they can be moved to a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "prices": {
+        "BACKEND": os.environ.get(
+            "PRICE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("PRICE_CACHE_LOCATION", "prices"),
+        "TIMEOUT": int(os.environ.get("PRICE_CACHE_TIMEOUT", 60 * 60)),
+    },
+}
+# Seconds to cache responses whose range reaches today. Entries are versioned
+# by the series' SeriesState, so ingests retire them in every process, this
+# only bounds how stale a range reaching today gets before it is fetched again
+PRICE_CACHE_LIVE_TIMEOUT = int(os.environ.get("PRICE_CACHE_LIVE_TIMEOUT", 60))
+
 
 LOGGING = {
     "version": 1,
@@ -171,3 +211,15 @@ LOGGING = {
         },
     },
 }
+
+# Closed months of bars compacted out of the price tables (manage.py
+# compact_bars) are stored here as Parquet, pyarrow is in requirements.txt
+COLD_STORAGE_DIR = Path(os.environ.get("COLD_STORAGE_DIR", BASE_DIR / "cold_storage"))
+# parquet, npz or bars (market_data.codec, lossless), empty picks parquet,
+# or npz with a warning if pyarrow is missing
+COLD_STORAGE_FORMAT = os.environ.get("COLD_STORAGE_FORMAT", "")
+# Months a bar stays in the database before it can be compacted
+COLD_TIER_AFTER_MONTHS = int(os.environ.get("COLD_TIER_AFTER_MONTHS", 12))
+# Read-heavy series are cached here as memory-mapped NumPy files shared by
+# every worker process on the host, unset to disable
+BAR_CACHE_DIR = os.environ.get("BAR_CACHE_DIR", "")